@@ -1,5 +1,16 @@
+import time
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
-from modules import welcome, pace_calculator, metrics_analyzer
+from modules import page_registry
+
+# Pages by navigation label: (module, page function). Modules are imported on first visit
+PAGES = {
+    "Welcome": ("modules.welcome", "show_welcome"),
+    "Pace Calculator": ("modules.pace_calculator", "show_pace_calculator"),
+    "Metrics Analyzer": ("modules.metrics_analyzer", "show_metrics_analyzer"),
+    "About": ("modules.welcome", "show_about")
+}
 
 # Set up Streamlit configuration - must be the first Streamlit command
 st.set_page_config(
@@ -68,22 +79,18 @@ st.sidebar.title("Runner Metrics Calculator")
 
 page = st.sidebar.radio(
     "Navigation",
-    ["Welcome", "Pace Calculator", "Metrics Analyzer", "About"]
+    list(PAGES)
 )
 
 # Display the selected page
-if page == "Welcome":
-    welcome.show_welcome()
-elif page == "Pace Calculator":
-    pace_calculator.show_pace_calculator()
-elif page == "Metrics Analyzer":
-    metrics_analyzer.show_metrics_analyzer()
-elif page == "About":
-    welcome.show_about()
+page_registry.render_page(*PAGES[page])
 
 # Footer
 st.markdown("""
 <footer>
 © 2025 Runner Metrics Calculator | Developed with ❤️ for runners everywhere
 </footer>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if page_registry.profiling_enabled():
+    page_registry.show_import_report(st, time.perf_counter() - SCRIPT_START)
\ No newline at end of file
@@ -0,0 +1,423 @@
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# GPS preprocessing and the stream metrics live in the calculator app's utils package, so both apps
+# derive distance, speed and grade the same way
+CALCULATOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'runner-metrics-calculator', 'runner-metrics-calculator')
+if CALCULATOR_DIR not in sys.path:
+    sys.path.append(CALCULATOR_DIR)
+
+from utils import gps, streams as stream_metrics
+
+ACTIVITY_EXTENSIONS = ('.gpx', '.tcx', '.fit')
+
+# Per-sample fields emitted for every activity; missing values are NaN
+STREAM_FIELDS = ['timestamp', 'lat', 'lon', 'elevation', 'distance', 'heart_rate', 'cadence', 'power']
+
+# Fields kept as float32 to halve the memory of long recordings
+COMPACT_FIELDS = ['elevation', 'heart_rate', 'cadence', 'power']
+
+# Summary columns that only some recordings can fill; dropped when no activity has them
+OPTIONAL_SUMMARY_COLUMNS = ['HeartRate', 'GAP', 'NGP', 'NormalizedPower']
+
+# XML timestamps are converted in batches of this many samples
+TIMESTAMP_BATCH = 4096
+
+# FIT epoch (1989-12-31 00:00:00 UTC) in Unix seconds
+FIT_EPOCH = 631065600
+FIT_RECORD_MESSAGE = 20
+FIT_TIMESTAMP_FIELD = 253
+
+# FIT base types: struct code and invalid value
+FIT_BASE_TYPES = {
+    0x00: ('B', 0xFF), 0x01: ('b', 0x7F), 0x02: ('B', 0xFF),
+    0x83: ('h', 0x7FFF), 0x84: ('H', 0xFFFF), 0x85: ('i', 0x7FFFFFFF),
+    0x86: ('I', 0xFFFFFFFF), 0x88: ('f', None), 0x89: ('d', None),
+    0x0A: ('B', 0x00), 0x8B: ('H', 0x0000), 0x8C: ('I', 0x00000000),
+    0x8E: ('q', 0x7FFFFFFFFFFFFFFF), 0x8F: ('Q', 0xFFFFFFFFFFFFFFFF), 0x90: ('Q', 0)
+}
+
+# FIT record message fields: number -> (stream field, scale, offset)
+FIT_RECORD_FIELDS = {
+    0: ('lat', 2 ** 31 / 180, 0),
+    1: ('lon', 2 ** 31 / 180, 0),
+    2: ('elevation', 5, 500),
+    3: ('heart_rate', 1, 0),
+    4: ('cadence', 1, 0),
+    5: ('distance', 100, 0),
+    7: ('power', 1, 0),
+    78: ('elevation', 5, 500)
+}
+
+def is_activity_file(filename):
+    """
+    Check whether a file name is a GPX, TCX or FIT activity recording
+    """
+    return filename.lower().endswith(ACTIVITY_EXTENSIONS)
+
+def read_activity(uploaded_file):
+    """
+    Parse an uploaded GPX, TCX or FIT file into per-sample NumPy arrays. distance holds what the
+    device recorded (NaN for GPX); activity_track derives clean distance, speed and grade
+    """
+    uploaded_file.seek(0)
+    name = uploaded_file.name.lower()
+
+    if name.endswith('.gpx'):
+        return parse_gpx(uploaded_file)
+    elif name.endswith('.tcx'):
+        return parse_tcx(uploaded_file)
+    elif name.endswith('.fit'):
+        return parse_fit(uploaded_file)
+    else:
+        raise ValueError(f"Unsupported activity file: {uploaded_file.name}")
+
+class _StreamBuffer:
+    """
+    Growable typed buffers that collect samples without holding parsed XML or Python objects
+    """
+
+    def __init__(self):
+        self.columns = {field: array('d') for field in STREAM_FIELDS}
+        self.pending_times = []
+
+    def append(self, timestamp, **values):
+        """
+        Add one sample; timestamp is Unix seconds (None if missing) or an ISO 8601 string ('' if missing)
+        """
+        if isinstance(timestamp, str):
+            self.pending_times.append(timestamp)
+            if len(self.pending_times) >= TIMESTAMP_BATCH:
+                self._flush_times()
+        else:
+            self.columns['timestamp'].append(np.nan if timestamp is None else timestamp)
+
+        for field in STREAM_FIELDS[1:]:
+            value = values.get(field)
+            self.columns[field].append(np.nan if value is None else value)
+
+    def _flush_times(self):
+        if self.pending_times:
+            times = pd.to_datetime(pd.Series(self.pending_times), utc=True, errors='coerce')
+            seconds = times.dt.tz_localize(None).to_numpy(dtype='datetime64[ms]').astype('int64') / 1000.0
+            seconds[times.isna().to_numpy()] = np.nan
+            self.columns['timestamp'].extend(seconds)
+            self.pending_times = []
+
+    def to_streams(self):
+        """
+        Convert the buffers to the stream dictionary returned by the parsers
+        """
+        self._flush_times()
+
+        streams = {field: np.frombuffer(values, dtype=np.float64) for field, values in self.columns.items()}
+
+        seconds = streams['timestamp']
+        timestamps = np.full(len(seconds), np.datetime64('NaT'), dtype='datetime64[ms]')
+        valid = ~np.isnan(seconds)
+        timestamps[valid] = np.round(seconds[valid] * 1000).astype('int64').astype('datetime64[ms]')
+        streams['timestamp'] = timestamps
+
+        for field in COMPACT_FIELDS:
+            streams[field] = streams[field].astype(np.float32)
+
+        return streams
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+def _iter_points(source, point_tag, container_tags):
+    """
+    Incrementally parse an XML file and yield each sample element, discarding it afterwards
+    """
+    container = None
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        tag = _local_name(elem.tag)
+
+        if event == 'start':
+            if tag in container_tags:
+                container = elem
+            continue
+
+        if tag == point_tag:
+            yield elem
+
+            # Drop the processed sample so memory stays bounded by one element
+            elem.clear()
+            if container is not None:
+                try:
+                    container.remove(elem)
+                except ValueError:
+                    pass
+
+def parse_gpx(source):
+    """
+    Parse a GPX track into per-sample arrays
+    """
+    buffer = _StreamBuffer()
+
+    for point in _iter_points(source, 'trkpt', ('trkseg',)):
+        values = {
+            'lat': _to_float(point.get('lat')),
+            'lon': _to_float(point.get('lon'))
+        }
+        timestamp = ''
+
+        for child in point.iter():
+            tag = _local_name(child.tag)
+            if tag == 'time':
+                timestamp = child.text
+            elif tag == 'ele':
+                values['elevation'] = _to_float(child.text)
+            elif tag == 'hr':
+                values['heart_rate'] = _to_float(child.text)
+            elif tag == 'cad':
+                values['cadence'] = _to_float(child.text)
+            elif tag in ('power', 'watts', 'PowerInWatts'):
+                values['power'] = _to_float(child.text)
+
+        buffer.append(timestamp, **values)
+
+    return buffer.to_streams()
+
+def parse_tcx(source):
+    """
+    Parse a TCX activity into per-sample arrays
+    """
+    buffer = _StreamBuffer()
+
+    for point in _iter_points(source, 'Trackpoint', ('Track',)):
+        values = {}
+        timestamp = ''
+
+        for child in point.iter():
+            tag = _local_name(child.tag)
+            if tag == 'Time':
+                timestamp = child.text
+            elif tag == 'LatitudeDegrees':
+                values['lat'] = _to_float(child.text)
+            elif tag == 'LongitudeDegrees':
+                values['lon'] = _to_float(child.text)
+            elif tag == 'AltitudeMeters':
+                values['elevation'] = _to_float(child.text)
+            elif tag == 'DistanceMeters':
+                values['distance'] = _to_float(child.text)
+            elif tag == 'HeartRateBpm':
+                values['heart_rate'] = _to_float(child.findtext('{*}Value'))
+            elif tag in ('Cadence', 'RunCadence'):
+                values['cadence'] = _to_float(child.text)
+            elif tag == 'Watts':
+                values['power'] = _to_float(child.text)
+
+        buffer.append(timestamp, **values)
+
+    return buffer.to_streams()
+
+def _read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated FIT file")
+    return data
+
+def parse_fit(source):
+    """
+    Parse the record messages of a FIT file into per-sample arrays, reading one message at a time
+    """
+    header = _read_exact(source, 1)
+    header_size = header[0]
+    header += _read_exact(source, header_size - 1)
+
+    if header_size < 12 or header[8:12] != b'.FIT':
+        raise ValueError("Not a FIT file")
+
+    data_size = struct.unpack('<I', header[4:8])[0]
+
+    buffer = _StreamBuffer()
+    definitions = {}
+    last_timestamp = None
+    consumed = 0
+
+    while consumed < data_size:
+        record_header = _read_exact(source, 1)[0]
+        consumed += 1
+
+        if record_header & 0x80:
+            # Compressed timestamp header: 5-bit offset from the previous timestamp
+            local_type = (record_header >> 5) & 0x03
+            time_offset = record_header & 0x1F
+            if last_timestamp is not None:
+                last_timestamp += (time_offset - (last_timestamp & 0x1F)) & 0x1F
+            compressed_time = last_timestamp
+        elif record_header & 0x40:
+            # Definition message
+            local_type = record_header & 0x0F
+            fixed = _read_exact(source, 5)
+            endian = '>' if fixed[1] else '<'
+            global_type = struct.unpack(endian + 'H', fixed[2:4])[0]
+            fields = _read_exact(source, fixed[4] * 3)
+            consumed += 5 + len(fields)
+
+            dev_size = 0
+            if record_header & 0x20:
+                dev_count = _read_exact(source, 1)[0]
+                dev_fields = _read_exact(source, dev_count * 3)
+                dev_size = sum(dev_fields[i + 1] for i in range(0, len(dev_fields), 3))
+                consumed += 1 + len(dev_fields)
+
+            definitions[local_type] = _compile_fit_definition(global_type, endian, fields, dev_size)
+            continue
+        else:
+            local_type = record_header & 0x0F
+            compressed_time = None
+
+        if local_type not in definitions:
+            raise ValueError("FIT data message without a definition")
+
+        global_type, layout, field_info, size = definitions[local_type]
+        raw = _read_exact(source, size)
+        consumed += size
+        values = layout.unpack(raw)
+
+        message = {}
+        for (number, invalid), value in zip(field_info, values):
+            if number is not None and value != invalid:
+                message[number] = value
+
+        if FIT_TIMESTAMP_FIELD in message:
+            last_timestamp = message[FIT_TIMESTAMP_FIELD]
+        elif compressed_time is not None:
+            message[FIT_TIMESTAMP_FIELD] = compressed_time
+
+        if global_type == FIT_RECORD_MESSAGE:
+            sample = {}
+            for number, (field, scale, offset) in FIT_RECORD_FIELDS.items():
+                if number in message:
+                    sample[field] = message[number] / scale - offset
+
+            timestamp = message.get(FIT_TIMESTAMP_FIELD)
+            buffer.append(None if timestamp is None else timestamp + FIT_EPOCH, **sample)
+
+    return buffer.to_streams()
+
+def _compile_fit_definition(global_type, endian, fields, dev_size):
+    """
+    Build a struct layout for a FIT definition; fields that aren't single numeric values are skipped
+    """
+    codes = []
+    field_info = []
+
+    for i in range(0, len(fields), 3):
+        number, size, base_type = fields[i], fields[i + 1], fields[i + 2]
+        code, invalid = FIT_BASE_TYPES.get(base_type, (None, None))
+
+        if code is not None and struct.calcsize(code) == size:
+            codes.append(code)
+            field_info.append((number, invalid))
+        else:
+            codes.append(f'{size}x')
+
+    if dev_size:
+        codes.append(f'{dev_size}x')
+
+    layout = struct.Struct(endian + ''.join(codes))
+    return global_type, layout, field_info, layout.size
+
+def activity_track(streams):
+    """
+    Clean 1 Hz distance, speed, grade and power of an activity from the shared GPS preprocessing
+    (utils.gps.preprocess_track), or None when it has neither positions nor recorded distance
+    """
+    has_distance = (~np.isnan(streams['distance'])).any()
+    has_position = (~(np.isnan(streams['lat']) | np.isnan(streams['lon']))).any()
+    if not (has_distance or has_position):
+        return None
+
+    elevation = streams['elevation'] if (~np.isnan(streams['elevation'])).any() else None
+
+    try:
+        return gps.preprocess_track(
+            streams['timestamp'], streams['lat'], streams['lon'], elevation,
+            distance=streams['distance'] if has_distance else None,
+            power=streams['power']
+        )
+    except ValueError:
+        # No sample has both a timestamp and a position or distance
+        return None
+
+def intensity_summary(track):
+    """
+    Grade-adjusted pace (GAP), Normalized Graded Pace (NGP) in min/km and Normalized Power in watts
+    from an activity_track, using the calculator's stream metrics (utils.streams)
+    """
+    summary = {'GAP': np.nan, 'NGP': np.nan, 'NormalizedPower': np.nan}
+    if track is None or len(track['speed']) < 2:
+        return summary
+
+    # One-second samples; paused seconds don't count towards the paces
+    moving = track['moving']
+    if moving.any():
+        speed = np.where(moving, track['speed'].astype(np.float64), np.nan)
+        grade = track['grade'] if 'grade' in track else 0
+        graded = stream_metrics.calculate_normalized_graded_pace(speed, grade)
+        summary['GAP'] = graded['gap']
+        summary['NGP'] = graded['ngp']
+
+    power = np.where(track['recorded'], track['power'].astype(np.float64), np.nan)
+    if (~np.isnan(power)).any():
+        summary['NormalizedPower'] = stream_metrics.calculate_normalized(power)
+
+    return summary
+
+def summarize_activity(streams):
+    """
+    Derive the canonical summary row (Date, Distance, TimeMinutes, Pace, HeartRate) from activity
+    streams, plus GAP, NGP and NormalizedPower where the recording allows
+    """
+    timestamps = streams['timestamp'][~np.isnat(streams['timestamp'])]
+    if len(timestamps) == 0:
+        raise ValueError("The activity has no timestamps")
+
+    track = activity_track(streams)
+    distance_km = float(track['distance'][-1]) / 1000 if track is not None else np.nan
+
+    time_minutes = float((timestamps.max() - timestamps.min()) / np.timedelta64(1, 's')) / 60
+
+    heart_rate = streams['heart_rate']
+
+    return {
+        'Date': pd.Timestamp(timestamps.min()),
+        'Distance': distance_km,
+        'TimeMinutes': time_minutes,
+        'Pace': time_minutes / distance_km if distance_km else np.nan,
+        'HeartRate': float(np.nanmean(heart_rate)) if (~np.isnan(heart_rate)).any() else np.nan,
+        **intensity_summary(track)
+    }
+
+def summary_frame(summaries):
+    """
+    Build a canonical analyzer frame from activity summary rows
+    """
+    df = pd.DataFrame(summaries, columns=['Date', 'Distance', 'TimeMinutes', 'Pace'] + OPTIONAL_SUMMARY_COLUMNS)
+
+    return drop_empty_optional_columns(df).sort_values('Date').reset_index(drop=True)
+
+def drop_empty_optional_columns(df):
+    """
+    Drop optional summary columns that no activity recorded, matching what CSV uploads provide
+    """
+    empty = [col for col in OPTIONAL_SUMMARY_COLUMNS if col in df.columns and df[col].isna().all()]
+    return df.drop(columns=empty)
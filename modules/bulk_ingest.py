@@ -0,0 +1,145 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from modules import activity_files
+
+# Activities starting this close together with similar distances are treated as the same run
+DEDUP_WINDOW_MINUTES = 5
+DEDUP_DISTANCE_TOLERANCE = 0.05
+
+# Below this many files the pool start-up costs more than it saves
+MIN_FILES_FOR_POOL = 4
+
+class _NamedBytes(io.BytesIO):
+    """
+    In-memory file with the name and size attributes of a Streamlit upload
+    """
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+def ingest_file(name, data):
+    """
+    Parse one uploaded file into canonical analyzer rows; runs in a worker process.
+
+    Returns a dict with the file name, the canonical frame, the activity streams (for GPX/TCX/FIT
+    files) and an error message, exactly one of frame and error being set.
+    """
+    # Imported here because the analyzer page imports this module
+    from modules import metrics_analyzer
+
+    result = {'name': name, 'frame': None, 'streams': None, 'error': None}
+    upload = _NamedBytes(name, data)
+
+    try:
+        if activity_files.is_activity_file(name):
+            streams = activity_files.read_activity(upload)
+            result['streams'] = streams
+            result['frame'] = pd.DataFrame([activity_files.summarize_activity(streams)])
+        else:
+            df = metrics_analyzer.read_upload(upload)
+            data_format = metrics_analyzer.detect_data_format(df)
+
+            if data_format == "unknown":
+                raise ValueError("Unable to detect the data format")
+
+            frame = metrics_analyzer.normalize_columns(df, data_format)
+
+            # Activity files carry naive UTC times, so align time-zone aware exports with them
+            if isinstance(frame['Date'].dtype, pd.DatetimeTZDtype):
+                frame['Date'] = frame['Date'].dt.tz_convert('UTC').dt.tz_localize(None)
+
+            result['frame'] = frame
+    except Exception as e:
+        result['error'] = str(e) or type(e).__name__
+
+    return result
+
+def ingest_files(files, max_workers=None, progress_callback=None):
+    """
+    Parse many uploaded files in parallel and merge them into one sorted, de-duplicated frame.
+
+    files is a list of (name, bytes) pairs. Identical files are parsed once. progress_callback, if
+    given, is called with the number of files finished and the total after each file. Returns a dict
+    with the merged frame ('data'), per-file errors as (name, message) pairs ('errors'), activity
+    streams keyed by file name ('streams') and the number of duplicate activities dropped ('duplicates').
+    """
+    unique_files = {}
+    for name, data in files:
+        unique_files.setdefault(hashlib.blake2b(data, digest_size=20).hexdigest(), (name, data))
+
+    jobs = list(unique_files.values())
+    results = []
+
+    if len(jobs) < MIN_FILES_FOR_POOL or max_workers == 1:
+        for name, data in jobs:
+            results.append(ingest_file(name, data))
+            if progress_callback is not None:
+                progress_callback(len(results), len(jobs))
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(ingest_file, name, data) for name, data in jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress_callback is not None:
+                    progress_callback(len(results), len(jobs))
+
+    frames = [r['frame'] for r in results if r['frame'] is not None and len(r['frame'])]
+    errors = sorted((r['name'], r['error']) for r in results if r['error'] is not None)
+    streams = {r['name']: r['streams'] for r in results if r['streams'] is not None}
+
+    if frames:
+        merged = pd.concat(frames, ignore_index=True)
+    else:
+        merged = pd.DataFrame(columns=['Date', 'Distance', 'TimeMinutes', 'Pace'])
+
+    # As with single uploads, only keep heart rate, GAP, NGP and power if some activity recorded them
+    merged = activity_files.drop_empty_optional_columns(merged)
+
+    deduplicated = deduplicate_activities(merged)
+
+    return {
+        'data': deduplicated,
+        'errors': errors,
+        'streams': streams,
+        'duplicates': len(merged) - len(deduplicated)
+    }
+
+def deduplicate_activities(df, window_minutes=DEDUP_WINDOW_MINUTES, distance_tolerance=DEDUP_DISTANCE_TOLERANCE):
+    """
+    Sort activities by date and drop overlapping ones, e.g. the same run in a CSV export and a FIT file.
+
+    An activity is a duplicate of the one before it if it starts within window_minutes and its
+    distance differs by at most distance_tolerance. Of each duplicate group the row with heart rate
+    data is preferred.
+    """
+    if df.empty:
+        return df.reset_index(drop=True)
+
+    df = df.copy()
+    df['_has_hr'] = df['HeartRate'].notna() if 'HeartRate' in df.columns else False
+    df = df.sort_values('Date', kind='mergesort').reset_index(drop=True)
+
+    dates = df['Date'].to_numpy(dtype='datetime64[ns]')
+    distances = df['Distance'].to_numpy(dtype=float)
+
+    close_start = np.diff(dates) <= np.timedelta64(int(window_minutes * 60), 's')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        close_distance = np.abs(np.diff(distances)) <= distance_tolerance * np.fmax(distances[:-1], distances[1:])
+
+    # Each row starts a new group unless it overlaps the previous one
+    group = np.concatenate([[0], np.cumsum(~(close_start & close_distance))])
+
+    # Keep the row with heart rate data from each group
+    df['_group'] = group
+    keep = df.sort_values(['_group', '_has_hr'], ascending=[True, False], kind='mergesort').drop_duplicates('_group')
+
+    return keep.sort_values('Date', kind='mergesort').drop(columns=['_has_hr', '_group']).reset_index(drop=True)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Location and size budget of the on-disk cache, overridable for shared deployments
+CACHE_DIR = os.environ.get(
+    "RUNNER_METRICS_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "runner-metrics-cache")
+)
+CACHE_MAX_MB = float(os.environ.get("RUNNER_METRICS_CACHE_MB", 256))
+
+CACHE_EXTENSION = ".npz"
+TEMP_EXTENSION = ".tmp"
+
+# Temporary files older than this were left by a process that died mid-write
+STALE_TEMP_SECONDS = 3600
+
+def make_cache_key(data, mapping):
+    """
+    Build a cache key from the raw upload bytes and the column mapping used to process them
+    """
+    digest = hashlib.blake2b(data, digest_size=20)
+    digest.update(json.dumps(mapping, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+def load_frame(key, cache_dir=None):
+    """
+    Load a processed frame from the cache, or return None if it isn't cached
+    """
+    path = _cache_path(key, cache_dir)
+
+    try:
+        with np.load(path, allow_pickle=False) as bundle:
+            columns = [str(name) for name in bundle["__columns__"]]
+            index = bundle["__index__"]
+            tz_names = dict(zip(bundle["__tz_columns__"], bundle["__tz_names__"]))
+
+            data = {}
+            for column in columns:
+                values = bundle[column]
+                if column in tz_names:
+                    values = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(str(tz_names[column]))
+                data[column] = values
+    except (OSError, KeyError, ValueError):
+        return None
+
+    # Refresh the modification time so eviction treats this entry as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return pd.DataFrame(data, index=index, columns=columns)
+
+def save_frame(key, df, cache_dir=None, max_mb=None):
+    """
+    Store a processed frame in the cache and evict the least recently used entries over the size limit.
+
+    Only numeric and datetime columns can be stored; returns False if the frame has other columns
+    or the cache directory isn't writable.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+
+    arrays = {}
+    tz_columns = []
+    tz_names = []
+
+    for column in df.columns:
+        series = df[column]
+
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            tz_columns.append(column)
+            tz_names.append(str(series.dt.tz))
+            arrays[column] = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        elif pd.api.types.is_datetime64_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            arrays[column] = series.to_numpy()
+        else:
+            return False
+
+    if not isinstance(df.index, pd.RangeIndex) and not pd.api.types.is_integer_dtype(df.index):
+        return False
+
+    arrays["__columns__"] = np.array(list(df.columns), dtype=str)
+    arrays["__index__"] = df.index.to_numpy()
+    arrays["__tz_columns__"] = np.array(tz_columns, dtype=str)
+    arrays["__tz_names__"] = np.array(tz_names, dtype=str)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial bundle
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=TEMP_EXTENSION)
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, _cache_path(key, cache_dir))
+    except OSError:
+        return False
+    finally:
+        # Whatever interrupted the write, don't leave the partial bundle behind
+        if os.path.exists(tmp_path):
+            _remove(tmp_path)
+
+    evict(cache_dir, max_mb)
+    return True
+
+def evict(cache_dir=None, max_mb=None):
+    """
+    Delete the least recently used cache entries until the cache fits within max_mb, and any
+    temporary files abandoned by interrupted writes
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    stale_before = time.time() - STALE_TEMP_SECONDS
+
+    try:
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(CACHE_EXTENSION):
+                stat = os.stat(os.path.join(cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+            elif name.endswith(TEMP_EXTENSION) and os.stat(os.path.join(cache_dir, name)).st_mtime < stale_before:
+                _remove(os.path.join(cache_dir, name))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+            total -= size
+        except OSError:
+            pass
+
+def clear_cache(cache_dir=None):
+    """
+    Remove every entry from the cache
+    """
+    evict(cache_dir, max_mb=0)
+
+def _cache_path(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, key + CACHE_EXTENSION)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
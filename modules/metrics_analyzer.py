@@ -6,6 +6,18 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 
+from modules import activity_files, bulk_ingest, data_cache
+
+# activity_files puts the calculator app's utils package on the path
+from utils import calculations, load_models, zones
+
+# Columns the analysis tabs work from; everything else in an upload is discarded when streaming
+CANONICAL_COLUMNS = ['Date', 'Distance', 'TimeMinutes', 'Pace', 'HeartRate']
+
+# CSV uploads larger than this are streamed in chunks by default
+STREAMING_THRESHOLD_MB = 20
+STREAMING_CHUNK_ROWS = 50000
+
 def show_metrics_analyzer():
     """
     Display the metrics analyzer interface for uploading and analyzing running data
@@ -19,38 +31,183 @@ def show_metrics_analyzer():
     """, unsafe_allow_html=True)
     
     # File uploader
-    uploaded_file = st.file_uploader("Upload your running data (CSV or Excel file)", 
-                                     type=["csv", "xlsx", "xls"])
+    uploaded_files = st.file_uploader("Upload your running data (CSV or Excel files, or GPX/TCX/FIT activities)", 
+                                      type=["csv", "xlsx", "xls", "gpx", "tcx", "fit"],
+                                      accept_multiple_files=True)
+    
+    # Several files at once (e.g. a season of activities) go through the parallel bulk pipeline
+    if len(uploaded_files) > 1:
+        analyze_bulk_upload(uploaded_files)
+        return
+    
+    uploaded_file = uploaded_files[0] if uploaded_files else None
     
     if uploaded_file is not None:
         try:
-            # Determine file type and read accordingly
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            if activity_files.is_activity_file(uploaded_file.name):
+                analyze_activity_file(uploaded_file)
+                return
+            
+            is_csv = uploaded_file.name.endswith('.csv')
+            stream_upload = is_csv and st.checkbox(
+                "Stream the file in chunks (recommended for large exports)",
+                value=uploaded_file.size > STREAMING_THRESHOLD_MB * 1024 * 1024
+            )
+            
+            # Only the first rows are needed for the preview and format detection
+            preview = read_upload(uploaded_file, nrows=5)
             
             # Display preview of the data
             st.markdown("### Data Preview")
-            st.dataframe(df.head())
+            st.dataframe(preview)
             
             # Try to determine data format and extract key metrics
-            data_format = detect_data_format(df)
+            data_format = detect_data_format(preview)
             
             if data_format == "unknown":
                 st.warning("Unable to automatically detect your data format. Please specify the columns manually.")
-                df_processed = manually_map_columns(df)
+                mapping = select_column_mapping(preview.columns)
+                
+                if mapping is None:
+                    return
             else:
                 st.success(f"Detected data format: {data_format}")
-                df_processed = process_data(df, data_format)
+                mapping = {'format': data_format}
+            
+            # Reruns and re-uploads of the same file are served from the processed-data cache
+            cache_key = data_cache.make_cache_key(uploaded_file.getvalue(), mapping)
+            df_processed = data_cache.load_frame(cache_key)
             
-            if df_processed is not None:
-                analyze_metrics(df_processed)
+            if df_processed is None:
+                if data_format == "unknown":
+                    df_processed = apply_column_mapping(read_upload(uploaded_file), mapping)
+                elif stream_upload:
+                    df_processed = load_csv_streaming(uploaded_file, data_format)
+                else:
+                    df_processed = process_data(read_upload(uploaded_file), data_format)
+                
+                canonical = [col for col in CANONICAL_COLUMNS if col in df_processed.columns]
+                data_cache.save_frame(cache_key, df_processed[canonical])
+            
+            analyze_metrics(df_processed)
         
         except Exception as e:
             st.error(f"Error processing the file: {str(e)}")
             st.markdown("Please make sure the file contains valid running data with columns for distance, time/pace, and date.")
 
+def analyze_bulk_upload(uploaded_files):
+    """
+    Parse many uploaded files in parallel, report the ones that failed and analyze the rest together
+    """
+    progress_bar = st.progress(0.0, text="Reading files...")
+    
+    def update_progress(done, total):
+        progress_bar.progress(done / total, text=f"Processed {done:,} of {total:,} files")
+    
+    result = bulk_ingest.ingest_files(
+        [(f.name, f.getvalue()) for f in uploaded_files],
+        progress_callback=update_progress
+    )
+    progress_bar.empty()
+    
+    df_processed = result['data']
+    st.success(f"Loaded {len(df_processed):,} activities from {len(uploaded_files) - len(result['errors']):,} files")
+    
+    if result['duplicates']:
+        st.info(f"Skipped {result['duplicates']:,} duplicate activities found in more than one file.")
+    
+    if result['errors']:
+        st.warning(f"{len(result['errors']):,} files could not be read:")
+        st.dataframe(pd.DataFrame(result['errors'], columns=['File', 'Error']))
+    
+    if df_processed.empty:
+        st.error("None of the uploaded files contained running data that could be analyzed.")
+        return
+    
+    # Keep the per-second streams of activity files for sample-level metrics
+    st.session_state.activity_streams = result['streams']
+    
+    analyze_metrics(df_processed)
+
+def analyze_activity_file(uploaded_file):
+    """
+    Summarize a GPX, TCX or FIT recording into one activity and keep its per-sample streams
+    """
+    streams = activity_files.read_activity(uploaded_file)
+    
+    # Keep the per-second streams for sample-level metrics
+    st.session_state.activity_streams = {uploaded_file.name: streams}
+    
+    df_processed = activity_files.summary_frame([activity_files.summarize_activity(streams)])
+    
+    st.markdown("### Activity Summary")
+    st.success(f"Read {len(streams['timestamp']):,} samples from {uploaded_file.name}")
+    st.dataframe(df_processed)
+    
+    analyze_metrics(df_processed)
+
+def read_upload(uploaded_file, nrows=None):
+    """
+    Read an uploaded CSV or Excel file from the beginning
+    """
+    uploaded_file.seek(0)
+    
+    if uploaded_file.name.endswith('.csv'):
+        return pd.read_csv(uploaded_file, nrows=nrows)
+    else:
+        return pd.read_excel(uploaded_file, nrows=nrows)
+
+def load_csv_streaming(uploaded_file, data_format):
+    """
+    Stream-process an uploaded CSV file with a progress indicator
+    """
+    uploaded_file.seek(0)
+    progress_bar = st.progress(0.0, text="Reading activities...")
+    
+    def update_progress(fraction, rows):
+        progress_bar.progress(fraction, text=f"Processed {rows:,} activities")
+    
+    df_processed = stream_csv(uploaded_file, data_format, progress_callback=update_progress)
+    progress_bar.empty()
+    
+    return df_processed
+
+def stream_csv(source, data_format=None, chunk_rows=STREAMING_CHUNK_ROWS, progress_callback=None):
+    """
+    Read a CSV file object in bounded chunks, normalizing each chunk and keeping only the canonical columns.
+    
+    Peak memory is about one raw chunk plus the compact result. If data_format is None it is
+    detected from the first chunk. progress_callback, if given, is called after every chunk with
+    the fraction of the file consumed and the number of rows processed so far.
+    """
+    total_bytes = getattr(source, 'size', None)
+    parts = []
+    rows = 0
+    
+    for chunk in pd.read_csv(source, chunksize=chunk_rows):
+        if data_format is None:
+            data_format = detect_data_format(chunk)
+        
+        if data_format == "unknown":
+            raise ValueError("Unable to detect the data format of the file.")
+        
+        parts.append(normalize_columns(chunk, data_format))
+        rows += len(chunk)
+        
+        if progress_callback is not None:
+            fraction = min(source.tell() / total_bytes, 1.0) if total_bytes else 0.0
+            progress_callback(fraction, rows)
+    
+    if not parts:
+        return pd.DataFrame(columns=CANONICAL_COLUMNS)
+    
+    df_processed = pd.concat(parts, ignore_index=True)
+    
+    # Sort by date
+    df_processed = df_processed.sort_values('Date')
+    
+    return df_processed
+
 def detect_data_format(df):
     """
     Try to automatically detect the format of the uploaded running data
@@ -73,21 +230,50 @@ def manually_map_columns(df):
     """
     Allow the user to manually map columns when format can't be detected
     """
+    mapping = select_column_mapping(df.columns)
+    
+    if mapping is None:
+        return None
+    
+    return apply_column_mapping(df, mapping)
+
+def select_column_mapping(columns):
+    """
+    Let the user pick which columns hold each metric; returns None until the mapping is usable
+    """
     st.markdown("### Map Your Data Columns")
     st.markdown("Please select which columns correspond to each metric:")
     
-    date_col = st.selectbox("Date column:", ["None"] + list(df.columns))
-    distance_col = st.selectbox("Distance column:", ["None"] + list(df.columns))
-    time_col = st.selectbox("Time/Duration column:", ["None"] + list(df.columns))
+    date_col = st.selectbox("Date column:", ["None"] + list(columns))
+    distance_col = st.selectbox("Distance column:", ["None"] + list(columns))
+    time_col = st.selectbox("Time/Duration column:", ["None"] + list(columns))
     pace_col = st.selectbox("Pace column (if available, otherwise select None):", 
-                           ["None"] + list(df.columns))
+                           ["None"] + list(columns))
     hr_col = st.selectbox("Heart rate column (if available, otherwise select None):", 
-                         ["None"] + list(df.columns))
+                         ["None"] + list(columns))
     
     if date_col == "None" or distance_col == "None" or (time_col == "None" and pace_col == "None"):
         st.warning("Please select at least date, distance, and either time or pace columns.")
         return None
     
+    return {
+        'date': date_col,
+        'distance': distance_col,
+        'time': time_col,
+        'pace': pace_col,
+        'heart_rate': hr_col
+    }
+
+def apply_column_mapping(df, mapping):
+    """
+    Process data using a column mapping from select_column_mapping
+    """
+    date_col = mapping['date']
+    distance_col = mapping['distance']
+    time_col = mapping['time']
+    pace_col = mapping['pace']
+    hr_col = mapping['heart_rate']
+    
     # Create a new dataframe with standardized column names
     df_processed = df.copy()
     df_processed['Date'] = df[date_col] if date_col != "None" else None
@@ -118,11 +304,8 @@ def manually_map_columns(df):
     if 'Time' in df_processed.columns and 'Pace' not in df_processed.columns:
         try:
             # Convert time strings (HH:MM:SS) to minutes
-            if df_processed['Time'].dtype == object:
-                df_processed['TimeMinutes'] = df_processed['Time'].apply(convert_time_to_minutes)
-            else:
-                df_processed['TimeMinutes'] = df_processed['Time']
-                
+            df_processed['TimeMinutes'] = parse_time_column(df_processed['Time'])
+            
             # Calculate pace as minutes per kilometer
             df_processed['Pace'] = df_processed['TimeMinutes'] / df_processed['Distance']
         except:
@@ -136,73 +319,80 @@ def process_data(df, data_format):
     """
     df_processed = df.copy()
     
+    normalized = normalize_columns(df, data_format)
+    for column in normalized.columns:
+        df_processed[column] = normalized[column]
+    
+    # Sort by date
+    df_processed = df_processed.sort_values('Date')
+    
+    return df_processed
+
+def normalize_columns(df, data_format):
+    """
+    Build the canonical analysis columns (Date, Distance, TimeMinutes, Pace, HeartRate)
+    for data in one of the detected formats
+    """
+    normalized = pd.DataFrame(index=df.index)
+    
     if data_format == "standard":
         # Standard format with date, distance, time columns
-        df_processed['Date'] = pd.to_datetime(df['date'])
-        df_processed['Distance'] = pd.to_numeric(df['distance'])
+        normalized['Date'] = pd.to_datetime(df['date'])
+        normalized['Distance'] = pd.to_numeric(df['distance'])
         
-        if df['time'].dtype == object:
-            df_processed['TimeMinutes'] = df['time'].apply(convert_time_to_minutes)
-        else:
-            df_processed['TimeMinutes'] = df['time']
+        normalized['TimeMinutes'] = parse_time_column(df['time'])
         
-        df_processed['Pace'] = df_processed['TimeMinutes'] / df_processed['Distance']
+        normalized['Pace'] = normalized['TimeMinutes'] / normalized['Distance']
         
         if 'heart_rate' in df.columns:
-            df_processed['HeartRate'] = pd.to_numeric(df['heart_rate'])
+            normalized['HeartRate'] = pd.to_numeric(df['heart_rate'])
     
     elif data_format == "strava":
         # Strava export format
-        df_processed['Date'] = pd.to_datetime(df['Activity Date'])
-        df_processed['Distance'] = pd.to_numeric(df['Distance'])
+        normalized['Date'] = pd.to_datetime(df['Activity Date'])
+        normalized['Distance'] = pd.to_numeric(df['Distance'])
         
         if 'Moving Time' in df.columns:
-            df_processed['TimeMinutes'] = df['Moving Time'].apply(convert_time_to_minutes)
+            normalized['TimeMinutes'] = parse_time_column(df['Moving Time'])
         elif 'Elapsed Time' in df.columns:
-            df_processed['TimeMinutes'] = df['Elapsed Time'].apply(convert_time_to_minutes)
+            normalized['TimeMinutes'] = parse_time_column(df['Elapsed Time'])
         
-        df_processed['Pace'] = df_processed['TimeMinutes'] / df_processed['Distance']
+        normalized['Pace'] = normalized['TimeMinutes'] / normalized['Distance']
         
         if 'Average Heart Rate' in df.columns:
-            df_processed['HeartRate'] = pd.to_numeric(df['Average Heart Rate'])
+            normalized['HeartRate'] = pd.to_numeric(df['Average Heart Rate'])
     
     elif data_format == "garmin":
         # Garmin export format
-        df_processed['Date'] = pd.to_datetime(df['start_time'])
-        df_processed['Distance'] = pd.to_numeric(df['distance']) / 1000  # Convert meters to kilometers
+        normalized['Date'] = pd.to_datetime(df['start_time'])
+        normalized['Distance'] = pd.to_numeric(df['distance']) / 1000  # Convert meters to kilometers
         
         if 'duration' in df.columns:
             # Convert seconds to minutes
-            df_processed['TimeMinutes'] = pd.to_numeric(df['duration']) / 60
+            normalized['TimeMinutes'] = pd.to_numeric(df['duration']) / 60
         
-        df_processed['Pace'] = df_processed['TimeMinutes'] / df_processed['Distance']
+        normalized['Pace'] = normalized['TimeMinutes'] / normalized['Distance']
         
         if 'average_heart_rate' in df.columns:
-            df_processed['HeartRate'] = pd.to_numeric(df['average_heart_rate'])
+            normalized['HeartRate'] = pd.to_numeric(df['average_heart_rate'])
     
     elif data_format == "simple":
         # Simple format with date, km, pace
-        df_processed['Date'] = pd.to_datetime(df['date'])
-        df_processed['Distance'] = pd.to_numeric(df['km'])
+        normalized['Date'] = pd.to_datetime(df['date'])
+        normalized['Distance'] = pd.to_numeric(df['km'])
         
         if 'pace' in df.columns:
-            if df['pace'].dtype == object:
-                # Convert pace in format MM:SS to minutes
-                df_processed['Pace'] = df['pace'].apply(convert_pace_to_minutes)
-            else:
-                df_processed['Pace'] = df['pace']
+            # Convert pace in format MM:SS to minutes
+            normalized['Pace'] = parse_pace_column(df['pace'])
         
         # Calculate time from pace and distance
-        df_processed['TimeMinutes'] = df_processed['Pace'] * df_processed['Distance']
+        normalized['TimeMinutes'] = normalized['Pace'] * normalized['Distance']
         
         if 'heart_rate' in df.columns or 'hr' in df.columns:
             hr_col = 'heart_rate' if 'heart_rate' in df.columns else 'hr'
-            df_processed['HeartRate'] = pd.to_numeric(df[hr_col])
+            normalized['HeartRate'] = pd.to_numeric(df[hr_col])
     
-    # Sort by date
-    df_processed = df_processed.sort_values('Date')
-    
-    return df_processed
+    return normalized[[col for col in CANONICAL_COLUMNS if col in normalized.columns]]
 
 def convert_time_to_minutes(time_str):
     """
@@ -246,26 +436,169 @@ def convert_pace_to_minutes(pace_str):
         except:
             return np.nan
 
+# Matches "MM:SS" and "HH:MM:SS", allowing the same whitespace and signs int() accepts
+CLOCK_PATTERN = r'^\s*([+-]?\d+)\s*:\s*([+-]?\d+)\s*(?::\s*([+-]?\d+)\s*)?$'
+
+def parse_clock_column(values, allow_hours=True):
+    """
+    Vectorized equivalent of convert_time_to_minutes / convert_pace_to_minutes for a whole column.
+
+    Text cells are parsed in a single regex pass, numbers pass through unchanged and
+    blank or unparseable cells become NaN. With allow_hours=False, HH:MM:SS cells are
+    treated like any other unparseable text (the pace behaviour).
+    """
+    series = pd.Series(values)
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+
+    # Activity exports repeat the same durations and paces many times, so only
+    # the distinct values are parsed and the results are broadcast back by code
+    codes, uniques = pd.factorize(series)
+    parsed = np.append(_parse_clock_values(pd.Series(uniques, dtype=object), allow_hours), np.nan)
+
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+def _parse_clock_values(series, allow_hours):
+    """
+    Parse an object Series of distinct clock/number values into a float array of minutes
+    """
+    result = np.full(len(series), np.nan)
+
+    # Checked per value because the .str accessor refuses columns without any strings
+    is_text = series.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    colons = np.full(len(series), np.nan)
+    if is_text.any():
+        colons[is_text] = series[is_text].str.count(':').to_numpy(dtype=float)
+
+    # Non-text cells are either missing or numbers that the scalar functions return as-is
+    is_other = ~is_text & series.notna().to_numpy()
+    if is_other.any():
+        result[is_other] = pd.to_numeric(series[is_other]).to_numpy(dtype=float)
+
+    is_clock = is_text & ((colons == 1) | ((colons == 2) & allow_hours))
+
+    # Plain numbers ("42.5") and anything with an unexpected number of parts
+    is_plain = is_text & ~is_clock
+    if is_plain.any():
+        result[is_plain] = pd.to_numeric(series[is_plain], errors='coerce').to_numpy(dtype=float)
+
+    if is_clock.any():
+        clock = series[is_clock]
+        parts = clock.str.extract(CLOCK_PATTERN)
+
+        invalid = (parts[0].isna() | ((colons[is_clock] == 2) & parts[2].isna())).to_numpy()
+        if invalid.any():
+            raise ValueError(f"invalid time value: {clock[invalid].iloc[0]!r}")
+
+        first = parts[0].astype(np.int64).to_numpy()
+        second = parts[1].astype(np.int64).to_numpy()
+        has_hours = parts[2].notna().to_numpy()
+        third = parts[2].fillna('0').astype(np.int64).to_numpy()
+
+        # Same operation order as the scalar functions so the floats match exactly
+        result[is_clock] = np.where(
+            has_hours,
+            (first * 60 + second) + third / 60,
+            first + second / 60
+        )
+
+    return result
+
+def parse_time_column(values):
+    """
+    Convert a column of time values (HH:MM:SS, MM:SS or numeric) to minutes
+    """
+    return parse_clock_column(values, allow_hours=True)
+
+def parse_pace_column(values):
+    """
+    Convert a column of pace values (MM:SS per km or numeric) to minutes per km
+    """
+    return parse_clock_column(values, allow_hours=False)
+
+# Metrics rolled up into the aggregate cubes and the statistics kept for each
+AGGREGATE_METRICS = ['Distance', 'TimeMinutes', 'Pace', 'HeartRate', 'GAP', 'NGP', 'NormalizedPower']
+AGGREGATE_STATS = ['sum', 'count', 'min', 'max']
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def build_aggregates(df):
+    """
+    Roll the runs up into daily, weekly, monthly and day-of-week cubes.
+    
+    Only the daily rollup touches the per-run data; the other cubes are derived from it,
+    so each has columns like Distance_sum, Distance_count, Distance_min, Distance_max and
+    Distance_mean (the per-run mean) for every available metric, plus a Runs count.
+    """
+    metrics = [col for col in AGGREGATE_METRICS if col in df.columns]
+    
+    grouped = df.groupby(df['Date'].dt.normalize())
+    daily = grouped[metrics].agg(AGGREGATE_STATS)
+    daily.columns = [f"{metric}_{stat}" for metric, stat in daily.columns]
+    daily['Runs'] = grouped.size()
+    
+    day_names = daily.index.day_name()
+    day_of_week = _rollup(daily, day_names, metrics)
+    day_of_week = day_of_week.reindex([day for day in DAY_ORDER if day in day_of_week.index])
+    
+    return {
+        'daily': _add_means(daily, metrics),
+        'weekly': _rollup(daily, daily.index.to_period('W'), metrics),
+        'monthly': _rollup(daily, daily.index.to_period('M'), metrics),
+        'day_of_week': day_of_week
+    }
+
+def _rollup(daily, keys, metrics):
+    """
+    Combine daily rollup rows into coarser buckets
+    """
+    how = {'Runs': 'sum'}
+    for metric in metrics:
+        how.update({
+            f"{metric}_sum": 'sum',
+            f"{metric}_count": 'sum',
+            f"{metric}_min": 'min',
+            f"{metric}_max": 'max'
+        })
+    
+    return _add_means(daily.groupby(keys).agg(how), metrics)
+
+def _add_means(cube, metrics):
+    """
+    Add per-run mean columns from the sum and count columns
+    """
+    for metric in metrics:
+        cube[f"{metric}_mean"] = cube[f"{metric}_sum"] / cube[f"{metric}_count"]
+    
+    return cube
+
 def analyze_metrics(df):
     """
     Analyze the processed running data and display insights
     """
+    # Build the aggregate cubes once for all the tabs
+    aggregates = build_aggregates(df)
+    
     # Create tabs for different analyses
-    tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Distance Analysis", "Pace Analysis", "Progress Over Time"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Distance Analysis", "Pace Analysis", "Progress Over Time",
+                                            "Training Load"])
     
     with tab1:
-        show_overview(df)
+        show_overview(df, aggregates)
     
     with tab2:
-        show_distance_analysis(df)
+        show_distance_analysis(df, aggregates)
     
     with tab3:
         show_pace_analysis(df)
     
     with tab4:
-        show_progress_analysis(df)
+        show_progress_analysis(df, aggregates)
+    
+    with tab5:
+        show_training_load(df, aggregates)
 
-def show_overview(df):
+def show_overview(df, aggregates):
     """
     Display overview of running metrics
     """
@@ -331,15 +664,27 @@ def show_overview(df):
             lambda x: f"{int(x)}:{int((x % 1) * 60):02d} min/km"
         )
     
+    # Grade-adjusted and normalized paces from activity files, so hilly runs compare with flat ones
+    for col in ['GAP', 'NGP']:
+        if col in recent_runs.columns:
+            display_df[col] = recent_runs[col].apply(
+                lambda x: f"{int(x)}:{int((x % 1) * 60):02d} min/km" if pd.notna(x) else "-"
+            )
+    
+    if 'NormalizedPower' in recent_runs.columns:
+        display_df['NP'] = recent_runs['NormalizedPower'].apply(lambda x: f"{x:.0f} W" if pd.notna(x) else "-")
+    
     st.dataframe(display_df)
     
     # Monthly distance chart
     st.markdown("### Monthly Distance")
     
-    # Group by month and sum distances
-    df['YearMonth'] = df['Date'].dt.to_period('M')
-    monthly_distance = df.groupby('YearMonth')['Distance'].sum().reset_index()
-    monthly_distance['YearMonth'] = monthly_distance['YearMonth'].astype(str)
+    # Monthly distances from the aggregate cube
+    monthly = aggregates['monthly']
+    monthly_distance = pd.DataFrame({
+        'YearMonth': monthly.index.astype(str),
+        'Distance': monthly['Distance_sum'].to_numpy()
+    })
     
     fig = px.bar(
         monthly_distance, 
@@ -351,7 +696,7 @@ def show_overview(df):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_distance_analysis(df):
+def show_distance_analysis(df, aggregates):
     """
     Display distance analysis
     """
@@ -395,16 +740,14 @@ def show_distance_analysis(df):
     # Distance by day of week
     st.markdown("### Distance by Day of Week")
     
-    df['DayOfWeek'] = df['Date'].dt.day_name()
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    
-    day_distance = df.groupby('DayOfWeek')['Distance'].agg(['sum', 'mean', 'count']).reset_index()
-    day_distance['sum'] = day_distance['sum'].round(2)
-    day_distance['mean'] = day_distance['mean'].round(2)
-    
-    # Reorder days
-    day_distance['DayOfWeek'] = pd.Categorical(day_distance['DayOfWeek'], categories=day_order, ordered=True)
-    day_distance = day_distance.sort_values('DayOfWeek')
+    # Day-of-week cube is already in Monday-Sunday order
+    day_of_week = aggregates['day_of_week']
+    day_distance = pd.DataFrame({
+        'DayOfWeek': day_of_week.index,
+        'sum': day_of_week['Distance_sum'].round(2).to_numpy(),
+        'mean': day_of_week['Distance_mean'].round(2).to_numpy(),
+        'count': day_of_week['Distance_count'].to_numpy()
+    })
     
     fig = px.bar(
         day_distance,
@@ -540,7 +883,7 @@ def show_pace_analysis(df):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_progress_analysis(df):
+def show_progress_analysis(df, aggregates):
     """
     Display progress analysis over time
     """
@@ -549,10 +892,12 @@ def show_progress_analysis(df):
     # Distance progress over time
     st.markdown("### Distance Trends")
     
-    # Weekly distance
-    df['Week'] = df['Date'].dt.to_period('W')
-    weekly_distance = df.groupby('Week')['Distance'].sum().reset_index()
-    weekly_distance['Week'] = weekly_distance['Week'].astype(str)
+    # Weekly distance from the aggregate cube
+    weekly = aggregates['weekly']
+    weekly_distance = pd.DataFrame({
+        'Week': weekly.index.astype(str),
+        'Distance': weekly['Distance_sum'].to_numpy()
+    })
     
     fig = px.line(
         weekly_distance,
@@ -596,13 +941,14 @@ def show_progress_analysis(df):
     st.markdown("### Progress Indicators")
     
     # Calculate 4-week moving averages for key metrics
-    df['YearWeek'] = df['Date'].dt.to_period('W')
-    weekly_metrics = df.groupby('YearWeek').agg({
-        'Distance': 'sum',
-        'Pace': 'mean'
-    }).reset_index()
+    weekly_metrics = pd.DataFrame({
+        'YearWeek': weekly.index.astype(str),
+        'Distance': weekly['Distance_sum'].to_numpy()
+    })
+    
+    if 'Pace_mean' in weekly.columns:
+        weekly_metrics['Pace'] = weekly['Pace_mean'].to_numpy()
     
-    weekly_metrics['YearWeek'] = weekly_metrics['YearWeek'].astype(str)
     weekly_metrics['Distance_MA'] = weekly_metrics['Distance'].rolling(window=4).mean()
     
     if 'Pace' in weekly_metrics.columns:
@@ -643,4 +989,135 @@ def show_progress_analysis(df):
             ticktext=[f"{i}:00" for i in range(pace_min, pace_max)]
         )
         
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(fig, use_container_width=True)
+
+def weekly_zone_distribution(df, max_hr):
+    """
+    Weekly seconds in each heart rate zone and the intensity distribution of every week.
+    
+    The analyzer keeps one row per run, so each run's whole duration counts in the zone of its
+    average heart rate; runs without heart rate or duration are left out.
+    """
+    runs = df.dropna(subset=['HeartRate', 'TimeMinutes'])
+    hr_zones = calculations.calculate_hr_zones_five_zone_system(max_hr)
+    
+    seconds = zones.calculate_zone_seconds_from_averages(runs['HeartRate'], runs['TimeMinutes'] * 60, hr_zones,
+                                                         activity_ids=runs.index)
+    weekly = zones.rollup_zone_seconds(seconds, runs['Date'])
+    
+    return weekly, zones.calculate_polarization(weekly)
+
+def daily_monotony_strain(aggregates):
+    """
+    Rolling 7-day Foster monotony and strain from the daily rollup.
+    
+    Without session RPE the daily load is the running time in minutes, or the distance when there
+    are no durations; days without runs count as zero load.
+    """
+    daily = aggregates['daily']
+    load_column = 'TimeMinutes_sum' if 'TimeMinutes_sum' in daily.columns else 'Distance_sum'
+    
+    loads = load_models.daily_load_series(daily.index, daily[load_column].fillna(0.0))
+    stats = load_models.calculate_monotony_strain(loads.to_numpy())
+    
+    return pd.DataFrame({'Load': loads.to_numpy(), **stats}, index=loads.index)
+
+def show_training_load(df, aggregates):
+    """
+    Display training intensity and load analysis
+    """
+    st.header("Training Load")
+    
+    show_zone_distribution(df)
+    show_monotony_strain(aggregates)
+
+def show_zone_distribution(df):
+    """
+    Display weekly time in heart rate zones and 80/20 compliance
+    """
+    st.markdown("### Time in Heart Rate Zones")
+    
+    if 'HeartRate' not in df.columns or 'TimeMinutes' not in df.columns or df['HeartRate'].notna().sum() == 0:
+        st.info("Time in zone needs the heart rate and duration of your runs.")
+        return
+    
+    max_hr = st.number_input("Maximum heart rate (bpm):", min_value=120, max_value=220, value=190)
+    weekly, distribution = weekly_zone_distribution(df, max_hr)
+    
+    # Hours per zone and week; the 5-zone system has no time below its first zone
+    hours = weekly.drop(columns=zones.BELOW_ZONES) / 3600
+    zone_names = list(hours.columns)
+    hours.insert(0, 'Week', hours.index.astype(str))
+    
+    fig = px.bar(
+        hours,
+        x='Week',
+        y=zone_names,
+        title='Weekly Time in Heart Rate Zones',
+        labels={'value': 'Time (hours)', 'variable': 'Zone'}
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Distribution over the whole history: Zones 1-2 low, Zone 3 moderate, Zones 4-5 high intensity
+    overall = zones.calculate_polarization(weekly.sum().to_frame().T).iloc[0]
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Low Intensity (Zones 1-2)", f"{overall['low']:.0%}")
+    
+    with col2:
+        st.metric("Moderate / High Intensity", f"{overall['moderate']:.0%} / {overall['high']:.0%}")
+    
+    with col3:
+        index = overall['polarization_index']
+        st.metric("Polarization Index", f"{index:.2f}" if pd.notna(index) else "N/A")
+    
+    compliant_weeks = int(distribution['compliant'].sum())
+    st.markdown(f"**80/20 compliance:** {compliant_weeks} of {len(distribution)} weeks had at least "
+                f"{zones.TARGET_LOW_FRACTION:.0%} of their running time at low intensity.")
+
+def show_monotony_strain(aggregates):
+    """
+    Display rolling training monotony and strain
+    """
+    st.markdown("### Training Monotony and Strain")
+    
+    stats = daily_monotony_strain(aggregates)
+    unit = "min" if 'TimeMinutes_sum' in aggregates['daily'].columns else "km"
+    
+    if stats['monotony'].notna().sum() == 0:
+        st.info("Monotony and strain need at least 7 days of history.")
+        return
+    
+    latest = stats.dropna(subset=['monotony']).iloc[-1]
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Last 7 Days Load", f"{latest['weekly_load']:.0f} {unit}")
+    
+    with col2:
+        st.metric("Monotony", f"{latest['monotony']:.2f}")
+    
+    with col3:
+        st.metric("Strain", f"{latest['strain']:.0f}")
+    
+    chart = stats[['monotony', 'strain']].rename_axis('Date').reset_index()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=chart['Date'], y=chart['strain'], name='Strain', line=dict(color='darkblue')))
+    fig.add_trace(go.Scatter(x=chart['Date'], y=chart['monotony'], name='Monotony', yaxis='y2',
+                             line=dict(color='orange')))
+    fig.update_layout(
+        title='Rolling 7-Day Monotony and Strain',
+        yaxis=dict(title=f'Strain ({unit} × monotony)'),
+        yaxis2=dict(title='Monotony', overlaying='y', side='right')
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    load_name = "running time" if unit == "min" else "distance"
+    st.markdown(f"Daily load is your {load_name} ({unit}) with rest days as zero. Monotony (mean / SD of the "
+                "last 7 days) above 2.0 with high strain has been linked to illness and overtraining (Foster, 1998).")
@@ -0,0 +1,70 @@
+import importlib
+import os
+import sys
+import time
+
+# Set to show the import-time breakdown in the sidebar
+PROFILE_ENV_VAR = "RUNNER_METRICS_PROFILE"
+
+# Page modules imported so far in this process: seconds taken and top-level packages pulled in
+IMPORT_TIMES = {}
+
+def load_page(module_name):
+    """
+    Import a page module the first time it is needed, recording how long the import took
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    before = set(sys.modules)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+
+    # Third-party packages the import pulled in, which is where the time usually goes
+    standard = set(sys.builtin_module_names) | set(getattr(sys, 'stdlib_module_names', ()))
+    pulled_in = {name.split('.')[0] for name in set(sys.modules) - before}
+    IMPORT_TIMES[module_name] = {
+        'seconds': elapsed,
+        'packages': sorted(name for name in pulled_in - standard
+                           if not name.startswith('_') and name != module_name.split('.')[0])
+    }
+
+    return module
+
+def render_page(module_name, function_name):
+    """
+    Import a page module if needed and call its page function
+    """
+    getattr(load_page(module_name), function_name)()
+
+def import_report():
+    """
+    Recorded page imports as (module, seconds, packages) rows, slowest first
+    """
+    rows = [(name, info['seconds'], info['packages']) for name, info in IMPORT_TIMES.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+def profiling_enabled():
+    """
+    Whether the import-time breakdown should be shown
+    """
+    return os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0')
+
+def show_import_report(st, script_seconds):
+    """
+    Show this run's script time and the page import breakdown in a sidebar expander
+    """
+    with st.sidebar.expander("Startup timings"):
+        st.write(f"Script run: {script_seconds * 1000:.0f} ms")
+        for name, seconds, packages in import_report():
+            st.write(f"{name}: {seconds * 1000:.0f} ms" + (f" ({', '.join(packages)})" if packages else ""))
+
+if __name__ == '__main__':
+    # Cold-start breakdown: python -m modules.page_registry modules.welcome modules.metrics_analyzer ...
+    start = time.perf_counter()
+    for name in sys.argv[1:]:
+        load_page(name)
+    for name, seconds, packages in import_report():
+        print(f"{seconds * 1000:8.1f} ms  {name}  {', '.join(packages)}")
+    print(f"{(time.perf_counter() - start) * 1000:8.1f} ms  total")
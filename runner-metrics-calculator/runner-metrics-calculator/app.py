@@ -1,16 +1,24 @@
+import time
+SCRIPT_START = time.perf_counter()
+
 import streamlit as st
 
-# Import all modules
-from modules import welcome
-from modules import vo2max_calculator
-from modules import training_zones
-from modules import race_time_predictor
-from modules import running_economy
-from modules import vdot_calculator
-from modules import running_power
-from modules import heart_rate_reserve
-from modules import training_load
-from modules import running_form
+# Page modules are imported the first time their page is selected
+from utils import page_registry
+
+# Calculator pages by navigation label
+PAGES = {
+    "Welcome": "modules.welcome",
+    "VO2 Max Calculator": "modules.vo2max_calculator",
+    "Training Zones": "modules.training_zones",
+    "Race Time Predictor": "modules.race_time_predictor",
+    "Running Economy": "modules.running_economy",
+    "VDOT Calculator": "modules.vdot_calculator",
+    "Running Power": "modules.running_power",
+    "Heart Rate Reserve": "modules.heart_rate_reserve",
+    "Training Load & Recovery": "modules.training_load",
+    "Running Form Analysis": "modules.running_form"
+}
 
 # Set page configuration
 st.set_page_config(
@@ -33,10 +41,7 @@ with col2:
 
 # Create sidebar for navigation
 st.sidebar.title("Navigation")
-app_mode = st.sidebar.selectbox("Choose a calculator:",
-    ["Welcome", "VO2 Max Calculator", "Training Zones", "Race Time Predictor",
-     "Running Economy", "VDOT Calculator", "Running Power", "Heart Rate Reserve",
-     "Training Load & Recovery", "Running Form Analysis"])
+app_mode = st.sidebar.selectbox("Choose a calculator:", list(PAGES))
 
 # User profile for personalized recommendations
 st.sidebar.markdown("---")
@@ -74,26 +79,7 @@ else:
     }
 
 # Render the selected module
-if app_mode == "Welcome":
-    welcome.render()
-elif app_mode == "VO2 Max Calculator":
-    vo2max_calculator.render()
-elif app_mode == "Training Zones":
-    training_zones.render()
-elif app_mode == "Race Time Predictor":
-    race_time_predictor.render()
-elif app_mode == "Running Economy":
-    running_economy.render()
-elif app_mode == "VDOT Calculator":
-    vdot_calculator.render()
-elif app_mode == "Running Power":
-    running_power.render()
-elif app_mode == "Heart Rate Reserve":
-    heart_rate_reserve.render()
-elif app_mode == "Training Load & Recovery":
-    training_load.render()
-elif app_mode == "Running Form Analysis":
-    running_form.render()
+page_registry.render_page(PAGES[app_mode])
 
 # Footer with information
 st.markdown("---")
@@ -103,4 +89,7 @@ st.markdown("""
     <p>© 2025 - All metrics based on validated scientific research in exercise physiology and biomechanics</p>
     <p>Created with Streamlit and Python</p>
 </footer>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if page_registry.profiling_enabled():
+    page_registry.show_import_report(st, time.perf_counter() - SCRIPT_START)
\ No newline at end of file
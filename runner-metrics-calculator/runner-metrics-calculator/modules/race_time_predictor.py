@@ -1,3 +1,5 @@
+from utils.caching import cached_vdot_tables
+
 # --------------------- RACE TIME PREDICTOR ---------------------#
 elif app_mode == "Race Time Predictor":
 st.header("Race Time Predictor")
@@ -139,36 +141,8 @@ if st.button("Calculate Race Predictions"):
             # Calculate VDOT
             vdot = vo2 / percent_vo2
 
-            # Predict time for target distance (in km)
-            # Convert to meters
-            target_distance_m = target_distance * 1000
-
-            # Calculate percent VO2 max for target distance (estimated)
-            # For this, we need to estimate the time first
-            # Start with Riegel estimate
-            estimated_time = riegel_prediction(base_distance, base_time, target_distance)
-
-            # Iterate to refine the estimate
-            for _ in range(3):  # 3 iterations should be enough
-                percent_vo2_target = 0.8 + 0.1894393 * exp(-0.012778 * (estimated_time / 60)) + 0.2989558 * exp(
-                    -0.1932605 * (estimated_time / 60))
-
-                # Calculate required velocity
-                vo2_target = vdot * percent_vo2_target
-
-                # Convert VO2 to velocity (solving the formula: vo2 = -4.60 + 0.182258 * velocity + 0.000104 * velocity * velocity)
-                # Quadratic formula: velocity = (-b ± sqrt(b^2 - 4ac))/2a where a=0.000104, b=0.182258, c=(-4.60-vo2_target)
-                a = 0.000104
-                b = 0.182258
-                c = -4.60 - vo2_target
-
-                # We want the positive solution
-                velocity_target = (-b + (b ** 2 - 4 * a * c) ** 0.5) / (2 * a)
-
-                # Calculate new estimated time
-                estimated_time = (target_distance_m / velocity_target) * 60
-
-            return estimated_time
+            # Standard distances come straight from the precomputed VDOT table, custom ones are solved
+            return float(cached_vdot_tables.lookup_race_time(vdot, target_distance))
 
 
         # Create results DataFrame
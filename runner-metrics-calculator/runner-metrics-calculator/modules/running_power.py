@@ -1,3 +1,7 @@
+from utils import vectorized
+from utils.caching import cached_calculations
+from utils.formatting import format_zone_range
+
 # --------------------- RUNNING POWER ---------------------#
 elif app_mode == "Running Power":
 st.header("Running Power Calculator")
@@ -84,52 +88,11 @@ if power_calculator_type == "Power Estimation":
             footwear_weight = 250
 
     if st.button("Calculate Running Power"):
-        # Convert speed to m/s
-        speed_ms = speed / 3.6
-
-        # Convert wind speed to m/s
-        wind_ms = wind_speed / 3.6
-
-        # Basic power calculation
-        # Power (W) = Force (N) × Velocity (m/s)
-
-        # Gravitational force component
-        g = 9.81  # gravitational acceleration (m/s²)
-        incline_rad = np.arctan(incline / 100)
-        grav_force = weight * g * np.sin(incline_rad)
-
-        # Air resistance
-        # Adjust air density for altitude and temperature
-        air_density_sl = 1.225  # kg/m³ at sea level, 15°C
-        air_density = air_density_sl * np.exp(-altitude / 7000) * (273 / (273 + temperature))
-
-        # Calculate frontal area (approximation based on height and weight)
-        frontal_area = 0.266 * ((weight) ** 0.425) * ((height / 100) ** 0.725) / 10000  # m²
-
-        # Drag coefficient
-        cd = 0.9  # typical value for runner
-
-        # Air resistance force
-        rel_velocity = speed_ms + wind_ms  # relative velocity (headwind positive)
-        air_resist = 0.5 * air_density * cd * frontal_area * rel_velocity ** 2
-
-        # Rolling resistance
-        rolling_coef = 0.01 * terrain_coef  # base coefficient adjusted for terrain
-        rolling_resist = rolling_coef * weight * g * np.cos(incline_rad)
-
-        # Total resistance force
-        total_force = grav_force + air_resist + rolling_resist
-
-        # Calculate power
-        power = total_force * speed_ms
-
-        # Add efficiency factor (running is not 100% efficient)
-        efficiency = 0.25  # approximate mechanical efficiency of running
-        power_output = power / efficiency
-
-        # Add small adjustment for shoe weight
-        shoe_effect = footwear_weight / 250  # normalize to typical shoe weight
-        power_output *= (1 + (shoe_effect - 1) * 0.03)  # small adjustment based on shoe weight
+        # Gravity, air and rolling components and the footwear-adjusted total, in watts
+        components = cached_calculations.calculate_power_components(
+            weight, height, speed, incline, wind_speed, terrain_coef, altitude, temperature, footwear_weight
+        )
+        power_output = components["total"]
 
         # Calculate power-to-weight ratio
         power_to_weight = power_output / weight
@@ -153,15 +116,10 @@ if power_calculator_type == "Power Estimation":
         # Display breakdown of power components
         st.markdown("### Power Component Breakdown")
 
-        # Calculate component percentages
-        grav_power = grav_force * speed_ms / efficiency
-        air_power = air_resist * speed_ms / efficiency
-        rolling_power = rolling_resist * speed_ms / efficiency
-
-        # Ensure we don't have negative percentages
-        grav_power = max(0, grav_power)
-        air_power = max(0, air_power)
-        rolling_power = max(0, rolling_power)
+        # Ensure we don't have negative percentages (downhill or with a tailwind)
+        grav_power = max(0, components["gravity"])
+        air_power = max(0, components["air"])
+        rolling_power = max(0, components["rolling"])
 
         total = grav_power + air_power + rolling_power
 
@@ -245,18 +203,12 @@ if power_calculator_type == "Power Estimation":
         # Display how this changes with different speeds
         st.subheader("Power at Different Speeds")
 
-        # Calculate power at different speeds
-        speeds = [speed * 0.8, speed * 0.9, speed, speed * 1.1, speed * 1.2]
-        powers = []
-
-        for s in speeds:
-            s_ms = s / 3.6
-            rel_v = s_ms + wind_ms
-            air_r = 0.5 * air_density * cd * frontal_area * rel_v ** 2
-            roll_r = rolling_coef * weight * g * np.cos(incline_rad)
-            total_f = grav_force + air_r + roll_r
-            p = total_f * s_ms / efficiency
-            powers.append(int(p))
+        # Calculate power at different speeds in one vectorized call
+        speeds = np.array([0.8, 0.9, 1.0, 1.1, 1.2]) * speed
+        speed_components = vectorized.calculate_power_components(
+            weight, height, speeds, incline, wind_speed, terrain_coef, altitude, temperature
+        )
+        powers = (speed_components["gravity"] + speed_components["air"] + speed_components["rolling"]).astype(int)
 
         # Create data for bar chart
         speed_labels = [f"{s:.1f} km/h" for s in speeds]
@@ -303,25 +255,8 @@ elif power_calculator_type == "Power Zones":
             cv = st.number_input("Critical Velocity (m/s):", min_value=2.5, max_value=7.0, value=4.0, step=0.1)
             weight = st.number_input("Body Weight (kg, CV):", min_value=40.0, max_value=150.0, value=70.0, step=0.1)
 
-            # Estimate CP from CV (this is an approximation)
-            # Formula based on the relationship between running speed and power
-            speed_kph = cv * 3.6  # convert to km/h
-
-            # Estimate power using simplified formula for flat terrain
-            g = 9.81  # gravitational acceleration
-            air_density = 1.225  # kg/m³
-            cd = 0.9  # drag coefficient
-            frontal_area = 0.266 * ((weight) ** 0.425) * ((175 / 100) ** 0.725) / 10000  # m²
-
-            air_resist = 0.5 * air_density * cd * frontal_area * cv ** 2
-            rolling_resist = 0.01 * weight * g
-
-            total_force = air_resist + rolling_resist
-            power = total_force * cv
-
-            # Apply efficiency factor
-            efficiency = 0.25
-            reference_power = power / efficiency
+            # Estimate CP from CV on flat terrain in still air (this is an approximation)
+            reference_power = cached_calculations.estimate_power_from_critical_velocity(cv, weight)
 
             st.info(f"Estimated Power from CV: {reference_power:.0f} watts")
 
@@ -356,31 +291,12 @@ elif power_calculator_type == "Power Zones":
         # Calculate power-to-weight ratio
         power_to_weight = reference_power / weight
 
-        # Calculate power zones based on selected model
-        if zone_model == "7-Zone Model":
-            power_zones = {
-                "Zone 1 (Recovery)": f"< {int(reference_power * 0.55)} watts",
-                "Zone 2 (Endurance)": f"{int(reference_power * 0.55)} - {int(reference_power * 0.75)} watts",
-                "Zone 3 (Tempo)": f"{int(reference_power * 0.76)} - {int(reference_power * 0.9)} watts",
-                "Zone 4 (Threshold)": f"{int(reference_power * 0.91)} - {int(reference_power * 1.05)} watts",
-                "Zone 5 (VO2max)": f"{int(reference_power * 1.06)} - {int(reference_power * 1.2)} watts",
-                "Zone 6 (Anaerobic)": f"{int(reference_power * 1.21)} - {int(reference_power * 1.5)} watts",
-                "Zone 7 (Neuromuscular)": f"> {int(reference_power * 1.5)} watts"
-            }
-        elif zone_model == "5-Zone Model":
-            power_zones = {
-                "Zone 1 (Recovery)": f"< {int(reference_power * 0.75)} watts",
-                "Zone 2 (Endurance)": f"{int(reference_power * 0.75)} - {int(reference_power * 0.9)} watts",
-                "Zone 3 (Tempo)": f"{int(reference_power * 0.9)} - {int(reference_power * 1.0)} watts",
-                "Zone 4 (Threshold)": f"{int(reference_power * 1.0)} - {int(reference_power * 1.1)} watts",
-                "Zone 5 (Anaerobic)": f"> {int(reference_power * 1.1)} watts"
-            }
-        else:  # 3-Zone Model (Polarized)
-            power_zones = {
-                "Zone 1 (Easy)": f"< {int(reference_power * 0.85)} watts",
-                "Zone 2 (Moderate)": f"{int(reference_power * 0.85)} - {int(reference_power * 1.05)} watts",
-                "Zone 3 (Hard)": f"> {int(reference_power * 1.05)} watts"
-            }
+        # Calculate power zones based on selected model ("7-Zone Model" -> "7-Zone")
+        power_zones = {
+            name: format_zone_range(lower, upper, "watts")
+            for name, (lower, upper) in cached_calculations.calculate_power_zones(
+                reference_power, zone_model.split(" Model")[0]).items()
+        }
 
         # Display results
         st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -638,14 +554,14 @@ else:  # Power Metrics Analysis
         # Calculate power duration relationship
         # Simplified version of critical power model (P = AWC/t + CP)
         # where AWC (anaerobic work capacity) is estimated from power reserve
-        awc = power_reserve * 90  # rough estimate, typically in joules
+        awc = cached_calculations.estimate_awc(cp, max_power)  # rough estimate, in joules
 
         # Calculate fatigue resistance
         fatigue_resistance = cp / max_power
 
         # Power duration curve data
         durations = [1, 2, 5, 10, 30, 60, 120, 300, 600, 1200, 2400, 3600, 7200, 10800]  # seconds
-        powers = [min(max_power, cp + (awc / t if t > 0 else 0)) for t in durations]
+        powers = cached_calculations.calculate_power_duration_curve(cp, awc, max_power, durations)
 
         # Display results
         st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -1,3 +1,6 @@
+from utils.load_models import calculate_acwr_series, calculate_monotony_strain
+from utils.recovery import SWC_FACTOR, calculate_hrv_baseline, calculate_rhr_trend, to_ln_rmssd
+
 #--------------------- TRAINING LOAD & RECOVERY ---------------------#
 elif app_mode == "Training Load & Recovery":
     st.header("Training Load & Recovery Calculator")
@@ -206,24 +209,11 @@ elif app_mode == "Training Load & Recovery":
                     else:
                         daily_loads[day] = 0
                 
-                # Calculate average daily load and monotony
-                if training_days > 0:
-                    avg_daily_load = total_weekly_load / 7  # Use 7 for all days of the week
-                    
-                    # Calculate standard deviation of daily loads
-                    squared_diffs = [(daily_loads[day] - avg_daily_load)**2 for day in days]
-                    variance = sum(squared_diffs) / 7
-                    std_dev = variance**0.5
-                    
-                    # Training monotony (average load / standard deviation)
-                    training_monotony = avg_daily_load / std_dev if std_dev > 0 else 0
-                    
-                    # Training strain (total load × monotony)
-                    training_strain = total_weekly_load * training_monotony
-                else:
-                    avg_daily_load = 0
-                    training_monotony = 0
-                    training_strain = 0
+                # Average daily load, monotony (mean / SD) and strain (total × monotony) of the 7-day window
+                weekly_stats = calculate_monotony_strain([daily_loads[day] for day in days])
+                avg_daily_load = float(weekly_stats["mean"][-1])
+                training_monotony = float(weekly_stats["monotony"][-1])
+                training_strain = float(weekly_stats["strain"][-1])
                 
                 # Display result
                 st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -867,14 +857,27 @@ elif app_mode == "Training Load & Recovery":
                 ["Distance (km/miles)", "Duration (minutes)", "Training Load (TRIMP/RPE)"]
             )
             
-            st.markdown("### Enter your training loads for the past 4 weeks:")
+            # Optional: Allow changing the acute/chronic period definitions
+            custom_periods = st.checkbox("Customize acute/chronic periods")
+            
+            if custom_periods:
+                acute_period = st.slider("Acute period (days):", min_value=3, max_value=14, value=7)
+                chronic_period = st.slider("Chronic period (days):", min_value=max(14, acute_period + 1), max_value=42, value=28)
+                st.caption("Each week's load is spread evenly over its 7 days, so periods that aren't whole weeks include part of a week.")
+            else:
+                acute_period = 7
+                chronic_period = 28
+            
+            # Ask for enough weeks to cover the chronic period (at least 4)
+            week_count = max(4, -(-chronic_period // 7))
+            
+            st.markdown(f"### Enter your training loads for the past {week_count} weeks:")
             
-            # Create 4 columns for the past 4 weeks
-            weeks = ["Week -4", "Week -3", "Week -2", "Last Week"]
+            weeks = [f"Week -{week_count - i}" for i in range(week_count - 1)] + ["Last Week"]
             week_loads = {}
             
             for i, week in enumerate(weeks):
-                if i == 3:  # Last week (acute period)
+                if i == len(weeks) - 1:  # Last week (acute period)
                     st.markdown(f"**{week} (Acute Period)**")
                 else:
                     st.markdown(f"**{week}**")
@@ -888,16 +891,6 @@ elif app_mode == "Training Load & Recovery":
                 
                 # Add a spacer between weeks
                 st.markdown("---")
-            
-            # Optional: Allow changing the acute/chronic period definitions
-            custom_periods = st.checkbox("Customize acute/chronic periods")
-            
-            if custom_periods:
-                acute_period = st.slider("Acute period (days):", min_value=3, max_value=14, value=7)
-                chronic_period = st.slider("Chronic period (days):", min_value=14, max_value=42, value=28)
-            else:
-                acute_period = 7
-                chronic_period = 28
         
         with col2:
             st.markdown("""
@@ -931,15 +924,18 @@ elif app_mode == "Training Load & Recovery":
             """)
         
         if st.button("Calculate ACWR"):
-            # Calculate acute workload (last week)
-            acute_workload = week_loads["Last Week"]
+            # Spread each week's load evenly over its days to get a daily load history
+            daily_loads = np.repeat(np.array([week_loads[week] for week in weeks], dtype=float) / 7, 7)
+            
+            # Rolling acute and chronic loads over the chosen periods (the history covers the chronic period)
+            acwr_series = calculate_acwr_series(daily_loads, acute_period, chronic_period)
             
-            # Calculate chronic workload (average of last 4 weeks)
-            total_load = sum(week_loads.values())
-            chronic_workload = total_load / 4
+            # Express both workloads per week, as entered
+            acute_workload = float(acwr_series["acute"][-1]) * 7
+            chronic_workload = float(acwr_series["chronic"][-1]) * 7
             
             # Calculate ACWR
-            acwr = acute_workload / chronic_workload if chronic_workload > 0 else 0
+            acwr = float(acwr_series["acwr"][-1])
             
             # Display result
             st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -948,9 +944,9 @@ elif app_mode == "Training Load & Recovery":
             st.markdown(f"""
             <h3>ACWR: <span class="highlight">{acwr:.2f}</span></h3>
             
-            **Acute Workload (Last Week)**: {acute_workload} {load_unit.split(" ")[0]}
+            **Acute Workload ({acute_period}-Day, Weekly Rate)**: {acute_workload:.1f} {load_unit.split(" ")[0]}
             
-            **Chronic Workload (4-Week Average)**: {chronic_workload:.1f} {load_unit.split(" ")[0]}
+            **Chronic Workload ({chronic_period}-Day, Weekly Rate)**: {chronic_workload:.1f} {load_unit.split(" ")[0]}
             """, unsafe_allow_html=True)
             
             # Categorize the ACWR value
@@ -990,7 +986,7 @@ elif app_mode == "Training Load & Recovery":
             st.markdown(f"""
             **Weekly Progression Rate**: {avg_weekly_change:.1f}% (Recommended: 5-10%)
             
-            **4-Week Load Trend**: {"Increasing" if avg_weekly_change > 2 else "Decreasing" if avg_weekly_change < -2 else "Stable"}
+            **{len(weeks)}-Week Load Trend**: {"Increasing" if avg_weekly_change > 2 else "Decreasing" if avg_weekly_change < -2 else "Stable"}
             """)
             
             st.markdown("</div>", unsafe_allow_html=True)
@@ -1005,7 +1001,7 @@ elif app_mode == "Training Load & Recovery":
             fig.add_trace(go.Bar(
                 x=weeks,
                 y=[week_loads[week] for week in weeks],
-                marker_color=['#4E97E6', '#4E97E6', '#4E97E6', 
+                marker_color=['#4E97E6'] * (len(weeks) - 1) + [
                              '#E6754E' if acwr > 1.3 else '#4EE6A5' if acwr >= 0.8 else '#4E97E6'],
                 text=[f"{week_loads[week]}" for week in weeks],
                 textposition='auto'
@@ -1248,10 +1244,11 @@ elif app_mode == "Training Load & Recovery":
                     
                     hrv_type = st.radio("HRV Metric Type (Weekly):", ["RMSSD (ms)", "ln RMSSD"])
                     
+                    # Readings of 0 count as missing
                     if hrv_type == "RMSSD (ms)":
-                        ln_rmssd_values = [np.log(v) if v > 0 else 0 for v in hrv_values]
+                        ln_rmssd_values = to_ln_rmssd(hrv_values)
                     else:
-                        ln_rmssd_values = hrv_values
+                        ln_rmssd_values = np.where(np.asarray(hrv_values, dtype=float) > 0, hrv_values, np.nan)
             
             with col2:
                 st.markdown("""
@@ -1419,46 +1416,47 @@ elif app_mode == "Training Load & Recovery":
                         """)
                 
                 else:  # Weekly Trend
-                    # Calculate 7-day rolling average and coefficient of variation
-                    avg_hrv = sum(hrv_values) / len(hrv_values)
-                    rolling_avg = avg_hrv
-                    
-                    # Calculate standard deviation
-                    squared_diffs = [(v - avg_hrv)**2 for v in hrv_values]
-                    variance = sum(squared_diffs) / len(hrv_values)
-                    std_dev = variance**0.5
-                    
-                    # Coefficient of variation
-                    cv = (std_dev / avg_hrv) * 100 if avg_hrv > 0 else 0
-                    
-                    # Calculate day-to-day change (last day compared to 7-day average)
-                    today_vs_avg = ((hrv_values[-1] - rolling_avg) / rolling_avg) * 100 if rolling_avg > 0 else 0
-                    
-                    # Calculate smallest worthwhile change (SWC = 0.5 × CV)
-                    swc = 0.5 * cv
+                    # ln-RMSSD baseline of the week with its smallest worthwhile change band (mean ± 0.5 × SD,
+                    # Plews et al., 2013); today's reading is compared with the band
+                    days = len(ln_rmssd_values)
+                    baseline = calculate_hrv_baseline(ln_rmssd_values, short_days=days, long_days=days,
+                                                      normal_range_sd=SWC_FACTOR)
+                    
+                    if np.isnan(baseline["baseline_long"][-1]):
+                        st.warning("Enter at least 3 HRV readings above zero to calculate a baseline.")
+                        st.stop()
+                    
+                    # Show the baseline and band in the units the readings were entered in
+                    to_display = np.exp if hrv_type == "RMSSD (ms)" else (lambda value: value)
+                    rolling_avg = float(to_display(baseline["baseline_long"][-1]))
+                    swc_lower = float(to_display(baseline["swc_lower"][-1]))
+                    swc_upper = float(to_display(baseline["swc_upper"][-1]))
+                    cv = float(baseline["cv"][-1])
+                    today_vs_avg = ((hrv_values[-1] - rolling_avg) / rolling_avg) * 100
+                    today_flag = baseline["reading_flag"][-1]
                     
                     # Display result
                     st.markdown("<div class='result-box'>", unsafe_allow_html=True)
                     st.subheader("HRV Trend Analysis")
                     
                     st.markdown(f"""
-                    **7-Day Average HRV**: {rolling_avg:.1f} {hrv_type}
+                    **7-Day Baseline HRV**: {rolling_avg:.1f} {hrv_type}
                     
-                    **Coefficient of Variation**: {cv:.1f}% (stability of measurements)
+                    **Coefficient of Variation**: {cv:.1f}% of ln RMSSD (stability of measurements)
                     
-                    **Today vs. Average**: {today_vs_avg:+.1f}% (positive is better)
+                    **Today vs. Baseline**: {today_vs_avg:+.1f}% (positive is better)
                     
-                    **Smallest Worthwhile Change**: {swc:.1f}% (threshold for meaningful change)
+                    **Smallest Worthwhile Change Band**: {swc_lower:.1f} to {swc_upper:.1f} {hrv_type} (threshold for meaningful change)
                     """)
                     
-                    # Determine trend status
+                    # Determine trend status from today's reading against the SWC band
                     trend_status = ""
-                    if abs(today_vs_avg) < swc:
-                        trend_status = "Stable (No Significant Change)"
-                    elif today_vs_avg > 0:
+                    if today_flag > 0:
                         trend_status = "Improving (Enhanced Recovery)"
-                    else:
+                    elif today_flag < 0:
                         trend_status = "Declining (Increasing Fatigue)"
+                    else:
+                        trend_status = "Stable (No Significant Change)"
                     
                     st.markdown(f"""
                     <h3>HRV Trend: {trend_status}</h3>
@@ -1471,36 +1469,36 @@ elif app_mode == "Training Load & Recovery":
                     
                     # Add line for daily HRV values
                     fig.add_trace(go.Scatter(
-                        x=list(range(1, 8)),
+                        x=list(range(1, days + 1)),
                         y=hrv_values,
                         mode='lines+markers',
                         name='Daily HRV',
                         line=dict(color='#E6754E', width=2)
                     ))
                     
-                    # Add line for rolling average
+                    # Add line for the baseline
                     fig.add_trace(go.Scatter(
-                        x=list(range(1, 8)),
-                        y=[rolling_avg] * 7,
+                        x=list(range(1, days + 1)),
+                        y=[rolling_avg] * days,
                         mode='lines',
-                        name='7-Day Average',
+                        name='7-Day Baseline',
                         line=dict(color='rgba(0, 0, 0, 0.7)', width=2, dash='dash')
                     ))
                     
                     # Add bands for smallest worthwhile change
                     fig.add_trace(go.Scatter(
-                        x=list(range(1, 8)),
-                        y=[rolling_avg * (1 + swc/100)] * 7,
+                        x=list(range(1, days + 1)),
+                        y=[swc_upper] * days,
                         mode='lines',
-                        name=f'SWC (+{swc:.1f}%)',
+                        name=f'SWC upper ({swc_upper:.1f})',
                         line=dict(color='rgba(0, 255, 0, 0.3)', width=1)
                     ))
                     
                     fig.add_trace(go.Scatter(
-                        x=list(range(1, 8)),
-                        y=[rolling_avg * (1 - swc/100)] * 7,
+                        x=list(range(1, days + 1)),
+                        y=[swc_lower] * days,
                         mode='lines',
-                        name=f'SWC (-{swc:.1f}%)',
+                        name=f'SWC lower ({swc_lower:.1f})',
                         line=dict(color='rgba(255, 0, 0, 0.3)', width=1),
                         fill='tonexty',
                         fillcolor='rgba(200, 200, 200, 0.2)'
@@ -1783,37 +1781,15 @@ elif app_mode == "Training Load & Recovery":
                         """)
                 
                 else:  # Weekly Trend
-                    # Calculate 7-day average
-                    avg_rhr = sum(rhr_values) / len(rhr_values)
-                    
-                    # Calculate standard deviation
-                    squared_diffs = [(v - avg_rhr)**2 for v in rhr_values]
-                    variance = sum(squared_diffs) / len(rhr_values)
-                    std_dev = variance**0.5
-                    
-                    # Calculate trend (simple linear regression)
-                    x = list(range(1, 8))
-                    y = rhr_values
-                    
-                    # Calculate slope and intercept
-                    n = len(x)
-                    sum_x = sum(x)
-                    sum_y = sum(y)
-                    sum_xy = sum(x_i * y_i for x_i, y_i in zip(x, y))
-                    sum_xx = sum(x_i * x_i for x_i in x)
-                    
-                    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
-                    intercept = (sum_y - slope * sum_x) / n
-                    
-                    # Project values based on trend line
-                    trend_values = [intercept + slope * x_i for x_i in x]
-                    
-                    # Calculate day-to-day variability (average absolute difference between consecutive days)
-                    day_to_day = []
-                    for i in range(1, len(rhr_values)):
-                        day_to_day.append(abs(rhr_values[i] - rhr_values[i-1]))
-                    
-                    avg_day_to_day = sum(day_to_day) / len(day_to_day) if day_to_day else 0
+                    # 7-day average, least-squares trend, scatter around it and day-to-day change, from the
+                    # rolling regression over a window covering the whole week (last day's values)
+                    rhr_trend = calculate_rhr_trend(rhr_values, window=len(rhr_values))
+                    avg_rhr = float(rhr_trend["mean"][-1])
+                    std_dev = float(rhr_trend["residual_sd"][-1])
+                    slope = float(rhr_trend["slope"][-1])
+                    intercept = float(rhr_trend["intercept"][-1])
+                    trend_values = intercept + slope * np.arange(1, len(rhr_values) + 1)
+                    avg_day_to_day = float(rhr_trend["day_to_day"][-1])
                     
                     # Display result
                     st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -1822,7 +1798,7 @@ elif app_mode == "Training Load & Recovery":
                     st.markdown(f"""
                     **7-Day Average RHR**: {avg_rhr:.1f} bpm
                     
-                    **RHR Variability**: ±{std_dev:.1f} bpm (lower is better)
+                    **RHR Variability**: ±{std_dev:.1f} bpm around the trend (lower is better)
                     
                     **Day-to-Day Change**: {avg_day_to_day:.1f} bpm (average)
                     
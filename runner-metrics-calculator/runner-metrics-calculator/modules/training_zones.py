@@ -1,3 +1,6 @@
+from utils.caching import cached_calculations, cached_vdot_tables
+from utils.formatting import format_zone_range
+
 # --------------------- TRAINING ZONES ---------------------#
 elif app_mode == "Training Zones":
 st.header("Training Zones Calculator")
@@ -61,48 +64,21 @@ with zones_tabs[0]:
     if st.button("Calculate Heart Rate Zones"):
         if zone_method == "% of Max HR":
             # Calculate zones based on % of Max HR
-            zones = {
-                "Zone 1 (Recovery)": f"{int(max_hr * 0.5)} - {int(max_hr * 0.6)} bpm",
-                "Zone 2 (Aerobic)": f"{int(max_hr * 0.6 + 1)} - {int(max_hr * 0.7)} bpm",
-                "Zone 3 (Tempo)": f"{int(max_hr * 0.7 + 1)} - {int(max_hr * 0.8)} bpm",
-                "Zone 4 (Threshold)": f"{int(max_hr * 0.8 + 1)} - {int(max_hr * 0.9)} bpm",
-                "Zone 5 (Anaerobic)": f"{int(max_hr * 0.9 + 1)} - {int(max_hr)} bpm"
-            }
+            zone_ranges = cached_calculations.calculate_hr_zones_max_hr(max_hr)
 
         elif zone_method == "Karvonen (Heart Rate Reserve)":
-            # Calculate Heart Rate Reserve (HRR)
-            hrr = max_hr - resting_hr
-
-            # Calculate zones based on HRR (Karvonen method)
-            zones = {
-                "Zone 1 (Recovery)": f"{int(resting_hr + (hrr * 0.5))} - {int(resting_hr + (hrr * 0.6))} bpm",
-                "Zone 2 (Aerobic)": f"{int(resting_hr + (hrr * 0.6) + 1)} - {int(resting_hr + (hrr * 0.7))} bpm",
-                "Zone 3 (Tempo)": f"{int(resting_hr + (hrr * 0.7) + 1)} - {int(resting_hr + (hrr * 0.8))} bpm",
-                "Zone 4 (Threshold)": f"{int(resting_hr + (hrr * 0.8) + 1)} - {int(resting_hr + (hrr * 0.9))} bpm",
-                "Zone 5 (Anaerobic)": f"{int(resting_hr + (hrr * 0.9) + 1)} - {int(max_hr)} bpm"
-            }
+            # Calculate zones based on Heart Rate Reserve (Karvonen method)
+            zone_ranges = cached_calculations.calculate_hr_zones_karvonen(max_hr, resting_hr)
 
         elif zone_method == "Lactate Threshold":
             # Calculate zones based on LTHR (Lactate Threshold Heart Rate)
-            zones = {
-                "Zone 1 (Recovery)": f"< {int(lthr * 0.85)} bpm",
-                "Zone 2 (Aerobic)": f"{int(lthr * 0.85)} - {int(lthr * 0.89)} bpm",
-                "Zone 3 (Tempo)": f"{int(lthr * 0.9)} - {int(lthr * 0.94)} bpm",
-                "Zone 4 (Threshold)": f"{int(lthr * 0.95)} - {int(lthr * 0.99)} bpm",
-                "Zone 5a (VO2 Intervals)": f"{int(lthr * 1.0)} - {int(lthr * 1.02)} bpm",
-                "Zone 5b (Anaerobic)": f"{int(lthr * 1.03)} - {int(lthr * 1.06)} bpm",
-                "Zone 5c (Neuromuscular)": f"> {int(lthr * 1.06)} bpm"
-            }
+            zone_ranges = cached_calculations.calculate_hr_zones_lthr(lthr)
 
         elif zone_method == "5-Zone System":
             # 5-Zone system (common in training platforms like TrainingPeaks)
-            zones = {
-                "Zone 1 (Active Recovery)": f"< {int(max_hr * 0.68)} bpm",
-                "Zone 2 (Endurance)": f"{int(max_hr * 0.68)} - {int(max_hr * 0.83)} bpm",
-                "Zone 3 (Tempo)": f"{int(max_hr * 0.84)} - {int(max_hr * 0.94)} bpm",
-                "Zone 4 (Threshold)": f"{int(max_hr * 0.95)} - {int(max_hr * 1.0)} bpm",
-                "Zone 5 (Anaerobic)": f"> {int(max_hr * 1.0)} bpm"
-            }
+            zone_ranges = cached_calculations.calculate_hr_zones_five_zone_system(max_hr)
+
+        zones = {name: format_zone_range(lower, upper, "bpm") for name, (lower, upper) in zone_ranges.items()}
 
         # Display results
         st.markdown("<div class='result-box'>", unsafe_allow_html=True)
@@ -299,24 +275,25 @@ with zones_tabs[1]:
             return f"{minutes}:{seconds:02d}"
 
 
-        # Calculate training paces based on VDOT value
-        # These formulas are derived from Daniels' Running Formula
+        # Look up training paces for the VDOT value in the precomputed table
+        # These paces are derived from Daniels' Running Formula
+        paces = cached_vdot_tables.lookup_training_paces(vdot_value)
 
         # Easy pace (min/km)
-        easy_pace_lower = (180 * (vdot_value ** -0.79)) * (60 / 1000)
-        easy_pace_upper = (150 * (vdot_value ** -0.75)) * (60 / 1000)
+        easy_pace_lower = float(paces["easy_min"])
+        easy_pace_upper = float(paces["easy_max"])
 
         # Marathon pace (min/km)
-        marathon_pace = (120 * (vdot_value ** -0.73)) * (60 / 1000)
+        marathon_pace = float(paces["marathon"])
 
         # Threshold pace (min/km)
-        threshold_pace = (100 * (vdot_value ** -0.71)) * (60 / 1000)
+        threshold_pace = float(paces["threshold"])
 
         # Interval pace (min/km)
-        interval_pace = (77 * (vdot_value ** -0.67)) * (60 / 1000)
+        interval_pace = float(paces["interval"])
 
         # Repetition pace (min/km)
-        repetition_pace = (64 * (vdot_value ** -0.65)) * (60 / 1000)
+        repetition_pace = float(paces["repetition"])
 
         # Create a dictionary of pace zones
         pace_zones = {
@@ -597,13 +574,8 @@ with zones_tabs[2]:
 
         # Calculate 7-zone power ranges based on reference power
         power_zones = {
-            "Zone 1 (Recovery)": f"< {int(reference_power * 0.55)} watts",
-            "Zone 2 (Endurance)": f"{int(reference_power * 0.55)} - {int(reference_power * 0.75)} watts",
-            "Zone 3 (Tempo)": f"{int(reference_power * 0.76)} - {int(reference_power * 0.9)} watts",
-            "Zone 4 (Threshold)": f"{int(reference_power * 0.91)} - {int(reference_power * 1.05)} watts",
-            "Zone 5 (VO2max)": f"{int(reference_power * 1.06)} - {int(reference_power * 1.2)} watts",
-            "Zone 6 (Anaerobic)": f"{int(reference_power * 1.21)} - {int(reference_power * 1.5)} watts",
-            "Zone 7 (Neuromuscular)": f"> {int(reference_power * 1.5)} watts"
+            name: format_zone_range(lower, upper, "watts")
+            for name, (lower, upper) in cached_calculations.calculate_power_zones(reference_power, "7-Zone").items()
         }
 
         # Display results
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the calculator's utils package when pytest is run from anywhere
+sys.path.append(str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,42 @@
+"""
+The cached calculator namespaces must give the results of the functions they wrap, and leave the
+stream functions uncached.
+"""
+import numpy as np
+
+from utils import calculations, caching, vdot_tables
+from utils.formatting import format_zone_range
+
+
+def test_cached_results_match_and_hit():
+    caching.clear_caches()
+    for _ in range(2):
+        assert caching.cached_calculations.calculate_hr_zones_karvonen(190, 50) == \
+            calculations.calculate_hr_zones_karvonen(190, 50)
+        assert float(caching.cached_vdot_tables.lookup_race_time(50.0, 10)) == \
+            float(vdot_tables.lookup_race_time(50.0, 10))
+
+    info = caching.cached_calculations.calculate_hr_zones_karvonen.cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+
+def test_cached_results_are_copies():
+    paces = caching.cached_vdot_tables.lookup_training_paces(50.0)
+    paces["easy_min"] = None
+    assert caching.cached_vdot_tables.lookup_training_paces(50.0)["easy_min"] is not None
+
+
+def test_stream_functions_are_not_memoized():
+    assert not hasattr(caching.cached_critical_power, "calculate_w_prime_balance")
+    assert not hasattr(caching.cached_critical_power, "batch_w_prime_balance")
+    assert not hasattr(caching.cached_calculations, "calculate_weekly_load_stats")
+
+
+def test_formatted_zones_match_page_strings():
+    max_hr = 180
+    zones = calculations.calculate_hr_zones_five_zone_system(max_hr)
+    formatted = [format_zone_range(lower, upper, "bpm") for lower, upper in zones.values()]
+    assert formatted[0] == f"< {int(max_hr * 0.68)} bpm"
+    assert formatted[2] == f"{int(max_hr * 0.84)} - {int(max_hr * 0.94)} bpm"
+    assert formatted[-1] == f"> {int(max_hr * 1.0)} bpm"
+    assert np.isfinite(caching.cached_calculations.calculate_max_hr(40))
@@ -0,0 +1,119 @@
+"""
+Critical power fits and W′ balance against direct computations.
+"""
+import numpy as np
+import pytest
+
+from utils import critical_power
+
+
+def regression_se(x, y, dof):
+    """
+    Intercept and slope standard errors of y = a + b x with the residual variance over dof
+    """
+    design = np.column_stack([np.ones_like(x), x])
+    coefficients, residuals, _, _ = np.linalg.lstsq(design, y, rcond=None)
+    sigma2 = residuals[0] / dof
+    return coefficients, np.sqrt(np.diag(sigma2 * np.linalg.inv(design.T @ design)))
+
+
+def test_t_quantiles_for_few_points():
+    np.testing.assert_allclose(critical_power._t_critical_95([1, 2, 5, 30]),
+                               [12.7062, 4.3027, 2.5706, 2.0423], atol=1e-4)
+    assert np.isnan(critical_power._t_critical_95(0))
+
+
+def test_two_parameter_interval_with_three_durations():
+    durations = np.array([180.0, 420.0, 720.0])
+    power = 300 + 18000 / durations + np.array([2.0, -3.0, 1.5])
+
+    fit = critical_power.fit_cp_2_parameter(durations, power)
+    (cp, _), (cp_se, _) = regression_se(1 / durations, power, 1)
+
+    assert fit["cp"] == pytest.approx(cp)
+    assert fit["cp_ci"][1] - fit["cp"] == pytest.approx(12.7062 * cp_se, rel=1e-4)
+
+
+def test_three_parameter_errors_use_three_degrees_of_freedom():
+    durations = np.array([5.0, 15.0, 30.0, 60.0, 180.0, 300.0, 600.0])
+    power = 280 + 20000 / (durations + 10) + np.array([4.0, -6.0, 3.0, -2.0, 5.0, -1.0, 2.0])
+
+    fit = critical_power.fit_cp_3_parameter(durations, power, offsets=[10.0])
+    (cp, w_prime), (cp_se, w_prime_se) = regression_se(1 / (durations + 10), power, len(durations) - 3)
+    t = critical_power._t_critical_95(len(durations) - 3)
+
+    assert (fit["cp"], fit["w_prime"]) == pytest.approx((cp, w_prime))
+    assert fit["cp_ci"][1] - fit["cp"] == pytest.approx(t * cp_se)
+    assert fit["w_prime_ci"][1] - fit["w_prime"] == pytest.approx(t * w_prime_se)
+
+
+def skiba_loop(values, cp, w_prime, dt):
+    """
+    W′ balance of the differential model, one sample at a time
+    """
+    spent = 0.0
+    balance = []
+    for value, step in zip(values, dt):
+        if value > cp:
+            spent += (value - cp) * step
+        elif value < cp:
+            spent *= np.exp(-(cp - value) * step / w_prime)
+        balance.append(w_prime - spent)
+    return np.array(balance)
+
+
+def interval_session(seconds, seed):
+    """
+    Power alternating between hard efforts and long easy spells, with a few dropouts
+    """
+    rng = np.random.default_rng(seed)
+    power = np.where((np.arange(seconds) // 120) % 3 == 0, 380.0, 120.0) + rng.normal(0, 15, seconds)
+    power[rng.choice(seconds, 20, replace=False)] = np.nan
+    return power
+
+
+def test_w_prime_balance_matches_the_skiba_loop():
+    # A small W′ makes the recovery exponent pass many underflow blocks
+    power = interval_session(7200, 1)
+    balance = critical_power.calculate_w_prime_balance(power, 280, 1000)
+
+    np.testing.assert_allclose(balance, skiba_loop(np.nan_to_num(power), 280, 1000, np.ones(7200)),
+                               rtol=1e-9, atol=1e-6)
+
+
+def test_w_prime_balance_with_irregular_timestamps():
+    rng = np.random.default_rng(2)
+    steps = rng.choice([1.0, 2.0, 5.0], 1999)
+    timestamps = np.concatenate([[0.0], np.cumsum(steps)])
+    power = interval_session(2000, 3)
+
+    balance = critical_power.calculate_w_prime_balance(power, 280, 15000, timestamps)
+    dt = np.append(steps, np.median(steps))
+
+    np.testing.assert_allclose(balance, skiba_loop(np.nan_to_num(power), 280, 15000, dt), rtol=1e-9, atol=1e-6)
+
+
+def test_batch_matches_single_sessions():
+    sessions = [(interval_session(1800, seed), None) for seed in range(3)]
+    sessions.append((interval_session(900, 9), np.arange(900) * 2.0))
+    cps = [270, 280, 290, 300]
+
+    batch = critical_power.batch_w_prime_balance(sessions, cps, 18000)
+
+    for (values, timestamps), cp, result in zip(sessions, cps, batch):
+        single = critical_power.summarize_w_prime_balance(
+            critical_power.calculate_w_prime_balance(values, cp, 18000, timestamps), 18000, timestamps)
+        assert result["min_balance"] == single["min_balance"]
+        assert result["time_below"] == single["time_below"]
+        np.testing.assert_array_equal(result["series"]["balance"], single["series"]["balance"])
+
+
+def test_summary_time_below_and_downsampling():
+    balance = np.array([20000.0, 9000, 4000, -100, 12000, 15000])
+    summary = critical_power.summarize_w_prime_balance(balance, 20000, points=3)
+
+    assert summary["min_balance"] == -100
+    assert summary["time_below"] == {0.5: 3.0, 0.25: 2.0, 0.0: 1.0}
+    # The lowest sample of each bucket is kept
+    np.testing.assert_array_equal(summary["series"]["balance"], [9000, -100, 12000])
+    np.testing.assert_array_equal(summary["series"]["seconds"], [1, 3, 4])
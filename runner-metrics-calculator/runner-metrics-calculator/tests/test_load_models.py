@@ -0,0 +1,94 @@
+"""
+The vectorized load models against direct day-by-day computations.
+"""
+import numpy as np
+import pytest
+
+from utils import load_models
+
+
+def daily_loads(athletes, days, seed=0):
+    """
+    Random daily loads with rest days and a few missing entries
+    """
+    rng = np.random.default_rng(seed)
+    loads = rng.gamma(2.0, 40.0, (athletes, days)) * (rng.random((athletes, days)) > 0.25)
+    loads[rng.random((athletes, days)) < 0.02] = np.nan
+    return loads
+
+
+def test_exponential_filter_matches_a_daily_loop():
+    loads = daily_loads(3, 400)
+    time_constants = np.array([42.0, 28.0, 7.0])
+    initial = np.array([10.0, 0.0, 55.0])
+
+    filtered = load_models.exponential_filter(loads, time_constants, initial)
+
+    for athlete in range(3):
+        value = initial[athlete]
+        gain = 1 - np.exp(-1 / time_constants[athlete])
+        expected = []
+        for load in np.nan_to_num(loads[athlete]):
+            value = value + gain * (load - value)
+            expected.append(value)
+        np.testing.assert_allclose(filtered[athlete], expected, rtol=1e-12)
+
+
+def test_fitness_fatigue_form_is_the_previous_day_balance():
+    loads = daily_loads(1, 120)[0]
+    model = load_models.calculate_fitness_fatigue(loads, initial_fitness=30.0, initial_fatigue=20.0)
+
+    assert model["form"][0] == pytest.approx(10.0)
+    np.testing.assert_allclose(model["form"][1:], (model["fitness"] - model["fatigue"])[:-1])
+
+
+@pytest.mark.parametrize("method, coupled", [("rolling", True), ("rolling", False), ("ewma", True), ("ewma", False)])
+def test_incremental_acwr_matches_the_batch_series(method, coupled):
+    loads = daily_loads(2, 90, seed=1)
+    batch = load_models.calculate_acwr_series(loads, 7, 28, method, coupled)
+
+    # Start from histories shorter and longer than the chronic window
+    for start in (0, 10, 40):
+        state = load_models.acwr_state(loads[:, :start], 7, 28, method, coupled)
+        for day in range(start, loads.shape[1]):
+            result = load_models.update_acwr(state, loads[:, day])
+            for name in ("acute", "chronic", "acwr"):
+                np.testing.assert_allclose(result[name], batch[name][:, day], rtol=1e-9, atol=1e-9,
+                                           err_msg=f"{name} on day {day} from {start}")
+
+
+def test_rolling_acwr_matches_window_means():
+    loads = np.nan_to_num(daily_loads(1, 60, seed=2)[0])
+    series = load_models.calculate_acwr_series(loads, 7, 28, coupled=False)
+
+    for day in range(27, 60):
+        acute = loads[day - 6:day + 1].mean()
+        chronic = loads[day - 27:day - 6].mean()
+        assert series["acwr"][day] == pytest.approx(acute / chronic)
+    assert np.isnan(series["acwr"][:27]).all()
+
+
+def test_incremental_monotony_matches_the_batch_series():
+    loads = daily_loads(2, 60, seed=3)
+    # A flat week must report zero monotony both ways
+    loads[:, 20:27] = 50.0
+    batch = load_models.calculate_monotony_strain(loads)
+
+    for start in (0, 3, 30):
+        state = load_models.monotony_state(loads[:, :start])
+        for day in range(start, loads.shape[1]):
+            result = load_models.update_monotony(state, loads[:, day])
+            for name, values in batch.items():
+                np.testing.assert_allclose(result[name], values[:, day], rtol=1e-9, atol=1e-9,
+                                           err_msg=f"{name} on day {day} from {start}")
+
+    assert (batch["monotony"][:, 26] == 0).all()
+
+
+def test_monotony_matches_foster_for_one_week():
+    week = np.array([60.0, 0.0, 45.0, 80.0, 0.0, 120.0, 30.0])
+    stats = load_models.calculate_monotony_strain(week)
+
+    assert stats["monotony"][-1] == pytest.approx(week.mean() / week.std())
+    assert stats["strain"][-1] == pytest.approx(week.sum() * week.mean() / week.std())
+    assert np.isnan(stats["monotony"][:-1]).all()
@@ -0,0 +1,81 @@
+import numpy as np
+
+from utils.power_curves import (
+    best_curve_state, calculate_mean_max, curve_durations, curve_exact_mask, mean_max_curve, update_best_curves
+)
+
+
+def exact_curve(values):
+    values = np.asarray(values, dtype=float)
+    return np.array([np.convolve(values, np.ones(d) / d, mode="valid").max() for d in range(1, len(values) + 1)])
+
+
+def test_curve_durations_cover_short_durations_and_the_longest():
+    durations = curve_durations(5000)
+
+    np.testing.assert_array_equal(durations[:50], np.arange(1, 51))
+    assert durations[-1] == 5000
+    assert np.all(durations[1:] / durations[:-1] <= 1.02 + 1 / durations[:-1])
+
+
+def test_mean_max_curve_is_close_to_the_exact_curve():
+    rng = np.random.default_rng(1)
+    power = np.clip(250 + rng.normal(0, 40, 1800) + np.where(rng.random(1800) < 0.05, 300, 0), 0, None)
+
+    curve = mean_max_curve(power)
+    exact = exact_curve(power)
+
+    exact_points = curve_durations(len(power)) - 1
+    np.testing.assert_allclose(curve[exact_points], exact[exact_points], rtol=1e-12)
+    np.testing.assert_allclose(curve, exact, rtol=0.02)
+
+
+def test_mean_max_curve_step_zero_is_exact():
+    values = [10, 0, 10, 3, 8, 1]
+
+    np.testing.assert_allclose(mean_max_curve(values, step=0), exact_curve(values))
+
+
+def test_durations_longer_than_the_stream_are_nan():
+    curve = mean_max_curve([1, 2, 3], 5)
+
+    np.testing.assert_allclose(curve[:3], [3, 2.5, 2])
+    assert np.isnan(curve[3:]).all()
+    assert calculate_mean_max([1, 2, 3], [4])["start"][0] == -1
+
+
+def test_mean_max_curve_never_exceeds_the_exact_curve():
+    rng = np.random.default_rng(2)
+    values = np.abs(np.sin(np.arange(2400) / 50)) * 5 + rng.random(2400)
+
+    curve = mean_max_curve(values)
+    exact = exact_curve(values)
+    mask = curve_exact_mask(len(values))
+
+    assert np.all(curve <= exact + 1e-9)
+    np.testing.assert_allclose(curve[mask], exact[mask], rtol=1e-12)
+    np.testing.assert_array_equal(np.flatnonzero(mask), curve_durations(len(values)) - 1)
+
+
+def test_best_curves_never_exceed_any_activity_and_keep_exact_flags():
+    rng = np.random.default_rng(3)
+    activities = [np.clip(250 + rng.normal(0, 60, n), 0, None) for n in (900, 1500, 1200)]
+    state = best_curve_state(1500, window_days=2)
+
+    for day, power in zip(["2024-01-01", "2024-01-02", "2024-01-03"], activities):
+        result = update_best_curves(state, day, mean_max_curve(power, 1500), curve_exact_mask(len(power), 1500))
+
+    exact = [np.concatenate([exact_curve(p), np.full(1500 - len(p), np.nan)]) for p in activities]
+    all_time = np.fmax.reduce(exact, axis=0)
+    rolling = np.fmax(exact[1], exact[2])
+
+    assert np.all(result["all_time"] <= all_time + 1e-9)
+    assert np.all(result["rolling"] <= rolling + 1e-9)
+
+    # Flagged values are the exact best of the activity they came from
+    for key, curves in (("all_time", exact), ("rolling", exact[1:])):
+        flagged = result[key + "_exact"]
+        matches = [np.isclose(result[key][flagged], curve[flagged], rtol=1e-12) for curve in curves]
+        assert np.logical_or.reduce(matches).all()
+    assert result["all_time_exact"][:50].all()
+    assert not result["rolling_exact"].all()
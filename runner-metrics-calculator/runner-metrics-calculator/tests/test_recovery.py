@@ -0,0 +1,45 @@
+"""
+Rolling HRV baselines against pandas windows and their incremental updates.
+"""
+import numpy as np
+import pandas as pd
+
+from utils import recovery
+
+
+def ln_rmssd_history(athletes, days, seed=0):
+    """
+    Daily ln-RMSSD around each athlete's own level, with mornings missed
+    """
+    rng = np.random.default_rng(seed)
+    levels = rng.uniform(3.6, 4.6, (athletes, 1))
+    readings = levels + rng.normal(0, 0.12, (athletes, days))
+    readings[rng.random((athletes, days)) < 0.15] = np.nan
+    return readings
+
+
+def test_baselines_match_pandas_rolling_windows():
+    readings = ln_rmssd_history(1, 200)[0]
+    result = recovery.calculate_hrv_baseline(readings)
+    series = pd.Series(readings)
+
+    for name, days in (("short", 7), ("long", 60)):
+        rolling = series.rolling(days, min_periods=3)
+        np.testing.assert_allclose(result[f"baseline_{name}"], rolling.mean(), rtol=1e-12)
+    np.testing.assert_allclose(result["sd_long"], series.rolling(60, min_periods=3).std(ddof=0), rtol=1e-9)
+    np.testing.assert_allclose(result["swc_upper"] - result["baseline_long"], 0.5 * result["sd_long"])
+
+
+def test_incremental_baselines_match_the_batch_series():
+    readings = ln_rmssd_history(3, 150, seed=1)
+    # One athlete starts measuring late
+    readings[2, :40] = np.nan
+    batch = recovery.calculate_hrv_baseline(readings)
+
+    for start in (0, 5, 80):
+        state = recovery.hrv_state(readings[:, :start])
+        for day in range(start, readings.shape[1]):
+            result = recovery.update_hrv(state, readings[:, day])
+            for name, values in batch.items():
+                np.testing.assert_allclose(result[name], values[:, day], rtol=1e-9, atol=1e-12,
+                                           err_msg=f"{name} on day {day} from {start}")
@@ -0,0 +1,65 @@
+"""
+The array functions in utils.vectorized must give the same results as the scalar functions in
+utils.calculations, element for element.
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from utils import calculations, vectorized
+
+
+def scalar_grid(function, *columns):
+    """
+    Scalar results over every combination of the column values, with the combinations as arrays
+    """
+    rows = list(itertools.product(*columns))
+    expected = np.array([function(*row) for row in rows], dtype=float)
+    return expected, [np.array(column) for column in zip(*rows)]
+
+
+def test_estimate_power_from_critical_velocity_matches_scalar():
+    expected, (cv_ms, weight, height) = scalar_grid(
+        calculations.estimate_power_from_critical_velocity,
+        [2.5, 3.2, 4.0, 5.5], [48, 62.5, 70, 91], [155, 175, 192.5]
+    )
+
+    np.testing.assert_array_equal(vectorized.estimate_power_from_critical_velocity(cv_ms, weight, height), expected)
+
+
+def test_estimate_power_from_critical_velocity_default_height():
+    assert vectorized.estimate_power_from_critical_velocity(4.0, 70) == \
+        calculations.estimate_power_from_critical_velocity(4.0, 70)
+
+
+@pytest.mark.parametrize("temperature_c, altitude_m", [(20, 0), (0, 0), (30, 1500)])
+def test_running_power_matches_scalar(temperature_c, altitude_m):
+    expected, (weight, height, speed, incline, wind) = scalar_grid(
+        lambda *row: calculations.calculate_running_power(*row, altitude_m=altitude_m, temperature_c=temperature_c),
+        [55, 70], [165, 180], [8.0, 12.0, 16.5], [-5, 0, 6], [-10, 0, 15]
+    )
+
+    actual = vectorized.calculate_running_power(weight, height, speed, incline, wind,
+                                                altitude_m=altitude_m, temperature_c=temperature_c)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("gender", ["Male", "Female"])
+def test_banister_trimp_matches_scalar(gender):
+    expected, (duration, avg_hr, resting_hr, max_hr) = scalar_grid(
+        lambda *row: calculations.calculate_banister_trimp(*row, gender=gender),
+        [30, 75], [130, 155, 172], [45, 60], [185, 198]
+    )
+
+    actual = vectorized.calculate_banister_trimp(duration, avg_hr, resting_hr, max_hr, gender)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+
+def test_vdot_from_performance_matches_scalar():
+    expected, (distance, time) = scalar_grid(
+        calculations.calculate_vdot_from_performance,
+        [1.5, 5, 10, 21.0975, 42.195], [300, 1200, 2700, 5400, 10800]
+    )
+
+    np.testing.assert_allclose(vectorized.calculate_vdot_from_performance(distance, time), expected, rtol=1e-12)
@@ -0,0 +1,41 @@
+"""
+Time in zone and the polarization index computed from it.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import calculations, zones
+
+
+def test_three_zone_polarization():
+    # Zone 2 of a three-zone model is moderate, not both low and high intensity
+    seconds = pd.DataFrame({"Zone 1 (Easy)": [3000.0], "Zone 2 (Moderate)": [600.0], "Zone 3 (Hard)": [400.0]})
+    result = zones.calculate_polarization(seconds).iloc[0]
+
+    assert (result["low"], result["moderate"], result["high"]) == pytest.approx((0.75, 0.15, 0.10))
+    assert result["polarization_index"] == pytest.approx(np.log10(50))
+    assert not result["compliant"]
+
+
+def test_overlapping_split_is_rejected():
+    seconds = pd.DataFrame({"Zone 1": [1.0], "Zone 2": [1.0], "Zone 3": [1.0]})
+    with pytest.raises(ValueError):
+        zones.calculate_polarization(seconds, low_zones=2, high_zones=2)
+
+
+def test_zone_seconds_match_a_sample_loop():
+    zone_bounds = calculations.calculate_hr_zones_five_zone_system(190)
+    names, lowers = zones.zone_edges(zone_bounds)
+    rng = np.random.default_rng(3)
+    heart_rate = rng.uniform(100, 200, 600)
+    timestamps = np.concatenate([np.arange(300.0), np.arange(300.0) * 2])
+    activity_ids = np.repeat(["a", "b"], 300)
+
+    result = zones.calculate_zone_seconds(heart_rate, timestamps, activity_ids, zone_bounds)
+
+    expected = pd.DataFrame(0.0, index=["a", "b"], columns=[zones.BELOW_ZONES] + names)
+    for activity, step in (("a", 1.0), ("b", 2.0)):
+        for value in heart_rate[activity_ids == activity]:
+            expected.loc[activity, ([zones.BELOW_ZONES] + names)[np.digitize(value, lowers)]] += step
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
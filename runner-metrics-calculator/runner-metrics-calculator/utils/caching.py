@@ -0,0 +1,220 @@
+"""
+Memoization for the pure calculators.
+
+Streamlit reruns the page script on every interaction, so the same calculations are repeated with
+the same inputs. memoize wraps a pure function in a bounded, thread-safe LRU cache keyed on its
+normalized arguments: floats are rounded to the input precision (so 65.0 and 65.0000000001 share
+an entry), lists and tuples compare by value, and NumPy arrays and pandas objects by content.
+Mutable results are copied on the way out so callers can't change what is cached.
+
+Only calculators with scalar or small inputs are cached. Keying a whole activity stream means
+hashing it on every call, which costs about as much as the calculation, and the entries would
+hold on to large arrays, so stream functions such as critical_power.calculate_w_prime_balance
+are called directly.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from utils import calculations, critical_power, vdot_tables
+
+DEFAULT_MAXSIZE = 256
+
+# Floats are rounded to this many decimals before lookup, finer than any input widget
+DEFAULT_DECIMALS = 6
+
+# Results of these types are returned from the cache as they are
+IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, np.number, np.bool_)
+
+# Every memoized function, by qualified name, for cache_stats
+_registry = {}
+
+# Calculators worth caching: scalar arguments, or a handful of points, and deterministic results
+CACHED_CALCULATIONS = (
+    "calculate_vo2max_cooper", "calculate_vo2max_bruce", "calculate_vdot_from_performance",
+    "calculate_training_paces_from_vdot", "calculate_max_hr", "calculate_hr_zones_karvonen",
+    "predict_race_time", "calculate_power_components", "calculate_running_power",
+    "estimate_power_from_critical_velocity", "estimate_ftp_from_race_power", "calculate_power_zones",
+    "estimate_awc", "calculate_power_duration_curve", "calculate_hr_zones_max_hr", "calculate_hr_zones_lthr",
+    "calculate_hr_zones_five_zone_system", "calculate_vo2max_1_5_mile", "calculate_vo2max_rockport",
+    "calculate_vo2max_astrand", "get_vo2max_categories", "classify_vo2max", "get_average_vo2max",
+    "calculate_equivalent_race_times"
+)
+CACHED_VDOT_TABLES = ("lookup_race_time", "lookup_vdot", "lookup_training_paces")
+CACHED_CRITICAL_POWER = ("fit_cp_2_parameter", "fit_cp_3_parameter", "fit_riegel")
+
+
+class Uncacheable(TypeError):
+    """
+    Raised when an argument can't be turned into a cache key
+    """
+
+
+def normalize_key(value, decimals=DEFAULT_DECIMALS):
+    """
+    Convert an argument into a hashable cache key.
+
+    Args:
+        value: Argument value
+        decimals (int, optional): Decimals kept of float values. Defaults to 6.
+
+    Returns:
+        object: Hashable key that is equal for arguments that round to the same values
+    """
+    if isinstance(value, (bool, np.bool_, str, bytes, type(None))):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        # Tagged so that 2 and 2.0, which can give differently typed results, don't share an entry;
+        # + 0.0 turns -0.0 into 0.0
+        return ("float", round(float(value), decimals) + 0.0)
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(normalize_key(item, decimals) for item in value)
+    if isinstance(value, dict):
+        return ("dict",) + tuple(sorted((normalize_key(k, decimals), normalize_key(v, decimals))
+                                        for k, v in value.items()))
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            value = np.round(value, decimals) + 0.0
+        elif value.dtype.kind == "O":
+            return ("object_array", value.shape) + tuple(normalize_key(item, decimals) for item in value.ravel())
+        return ("ndarray", value.dtype.str, value.shape, np.ascontiguousarray(value).tobytes())
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        if isinstance(value, pd.DataFrame):
+            columns = tuple(value.columns)
+        else:
+            columns = getattr(value, "name", None)
+        if not isinstance(value, pd.Index):
+            value = value.round(decimals)
+        hashes = pd.util.hash_pandas_object(value)
+        return (type(value).__name__, normalize_key(columns, decimals), hashes.to_numpy().tobytes())
+
+    try:
+        hash(value)
+    except TypeError:
+        raise Uncacheable(f"Can't cache arguments of type {type(value).__name__}") from None
+    return value
+
+
+def memoize(maxsize=DEFAULT_MAXSIZE, decimals=DEFAULT_DECIMALS):
+    """
+    Decorate a pure function with a bounded LRU cache of its results.
+
+    The wrapped function has cache_info() (hits, misses, uncacheable calls, size and maxsize) and
+    cache_clear() like functools.lru_cache. Calls with arguments that can't be normalized run
+    uncached.
+
+    Args:
+        maxsize (int, optional): Most results kept; the least recently used is evicted. Defaults to 256.
+        decimals (int, optional): Decimals kept of float arguments. Defaults to 6.
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0, "uncacheable": 0}
+
+        def wrapper(*args, **kwargs):
+            try:
+                key = (normalize_key(args, decimals), normalize_key(kwargs, decimals))
+            except Uncacheable:
+                with lock:
+                    stats["uncacheable"] += 1
+                return func(*args, **kwargs)
+
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    result = cache[key]
+                    return result if isinstance(result, IMMUTABLE_TYPES) else copy.deepcopy(result)
+                stats["misses"] += 1
+
+            # Computed outside the lock; concurrent misses for one key just compute it twice
+            result = func(*args, **kwargs)
+
+            with lock:
+                cache[key] = result
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+            return result if isinstance(result, IMMUTABLE_TYPES) else copy.deepcopy(result)
+
+        def cache_info():
+            with lock:
+                return dict(stats, size=len(cache), maxsize=maxsize)
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats.update(hits=0, misses=0, uncacheable=0)
+
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+
+        _registry[f"{func.__module__}.{func.__qualname__}"] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def memoize_module(module, names, maxsize=DEFAULT_MAXSIZE, decimals=DEFAULT_DECIMALS):
+    """
+    Memoized versions of selected functions of a module.
+
+    Args:
+        module (module): Module of pure functions, e.g. utils.calculations
+        names (iterable): Names of the functions to memoize
+        maxsize (int, optional): Cache size of each function. Defaults to 256.
+        decimals (int, optional): Decimals kept of float arguments. Defaults to 6.
+
+    Returns:
+        types.SimpleNamespace: The memoized functions under their original names
+    """
+    return SimpleNamespace(**{name: memoize(maxsize, decimals)(getattr(module, name)) for name in names})
+
+
+def cache_stats():
+    """
+    Hit and miss counters of every memoized function.
+
+    Returns:
+        dict: cache_info() of each function keyed by qualified name, plus "total" hits, misses
+            and hit_rate
+    """
+    stats = {name: wrapper.cache_info() for name, wrapper in _registry.items()}
+    hits = sum(info["hits"] for info in stats.values())
+    misses = sum(info["misses"] for info in stats.values())
+
+    stats["total"] = {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+    }
+    return stats
+
+
+def clear_caches():
+    """
+    Empty every memoized function's cache and reset its counters.
+    """
+    for wrapper in _registry.values():
+        wrapper.cache_clear()
+
+
+# Cached drop-in replacements, e.g. cached_calculations.calculate_hr_zones_karvonen(190, 50)
+cached_calculations = memoize_module(calculations, CACHED_CALCULATIONS)
+cached_vdot_tables = memoize_module(vdot_tables, CACHED_VDOT_TABLES)
+cached_critical_power = memoize_module(critical_power, CACHED_CRITICAL_POWER)
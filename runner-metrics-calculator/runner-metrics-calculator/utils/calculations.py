@@ -4,6 +4,8 @@ Calculation utilities for the Runner Performance Metrics Calculator.
 import numpy as np
 from math import exp, log
 
+from utils.vectorized import solve_daniels_race_time
+
 
 def calculate_vo2max_cooper(distance_m, age, gender="Male"):
     """
@@ -189,46 +191,23 @@ def predict_race_time(base_distance, base_time, target_distance, method="Riegel"
         # Calculate VDOT from base performance
         vdot = calculate_vdot_from_performance(base_distance, base_time)
 
-        # Target distance in meters
-        target_distance_m = target_distance * 1000
-
-        # Calculate percent VO2 max for target distance (estimated)
-        # Start with Riegel estimate for initial approximation
+        # Start from the Riegel estimate and solve the VDOT equation for the target time
         estimated_time = base_time * (target_distance / base_distance) ** 1.06
+        solution = solve_daniels_race_time(vdot, target_distance, initial_time=estimated_time)
 
-        # Iterate to refine the estimate (3 iterations is usually sufficient)
-        for _ in range(3):
-            percent_vo2_target = 0.8 + 0.1894393 * exp(-0.012778 * (estimated_time / 60)) + 0.2989558 * exp(
-                -0.1932605 * (estimated_time / 60))
-
-            # Calculate required velocity
-            vo2_target = vdot * percent_vo2_target
-
-            # Convert VO2 to velocity using quadratic formula
-            # vo2 = -4.60 + 0.182258 * velocity + 0.000104 * velocity * velocity
-            a = 0.000104
-            b = 0.182258
-            c = -4.60 - vo2_target
-
-            # Velocity = (-b ± sqrt(b² - 4ac)) / 2a (we want the positive solution)
-            velocity_target = (-b + (b ** 2 - 4 * a * c) ** 0.5) / (2 * a)
-
-            # Calculate new estimated time
-            estimated_time = (target_distance_m / velocity_target) * 60
-
-        return estimated_time
+        return float(solution["time"])
 
     else:  # Default to Riegel
         # Standard Riegel formula with fatigue factor of 1.06
         return base_time * (target_distance / base_distance) ** 1.06
 
 
-def calculate_running_power(
+def calculate_power_components(
         weight, height, speed_kph, incline_pct=0, wind_speed_kph=0,
-        terrain_coef=1.0, altitude_m=0, temperature_c=20
+        terrain_coef=1.0, altitude_m=0, temperature_c=20, footwear_weight_g=250
 ):
     """
-    Calculate running power based on runner parameters and environmental conditions.
+    Break running power down into its gravitational, aerodynamic and rolling components.
 
     Args:
         weight (float): Runner's weight in kilograms
@@ -239,9 +218,11 @@ def calculate_running_power(
         terrain_coef (float, optional): Terrain coefficient (1.0=track/road). Defaults to 1.0.
         altitude_m (int, optional): Altitude in meters. Defaults to 0.
         temperature_c (float, optional): Temperature in Celsius. Defaults to 20.
+        footwear_weight_g (float, optional): Shoe weight in grams (250 = no adjustment). Defaults to 250.
 
     Returns:
-        float: Estimated running power in watts
+        dict: Metabolic power in watts for "gravity", "air" and "rolling" (unadjusted, may be
+            negative downhill or with a tailwind) and the footwear-adjusted "total"
     """
     # Convert speed to m/s
     speed_ms = speed_kph / 3.6
@@ -280,11 +261,640 @@ def calculate_running_power(
     # Calculate total resistance force
     total_force = grav_force + air_resist + rolling_resist
 
-    # Calculate power
-    power = total_force * speed_ms
-
     # Apply efficiency factor
     efficiency = 0.25  # Typical running efficiency
-    power_output = power / efficiency
+    power_output = total_force * speed_ms / efficiency
+
+    # Small adjustment for shoe weight, normalized to a typical 250 g shoe
+    shoe_effect = footwear_weight_g / 250
+    power_output *= (1 + (shoe_effect - 1) * 0.03)
+
+    return {
+        "gravity": grav_force * speed_ms / efficiency,
+        "air": air_resist * speed_ms / efficiency,
+        "rolling": rolling_resist * speed_ms / efficiency,
+        "total": power_output
+    }
+
+
+def calculate_running_power(
+        weight, height, speed_kph, incline_pct=0, wind_speed_kph=0,
+        terrain_coef=1.0, altitude_m=0, temperature_c=20
+):
+    """
+    Calculate running power based on runner parameters and environmental conditions.
+
+    Args:
+        weight (float): Runner's weight in kilograms
+        height (float): Runner's height in centimeters
+        speed_kph (float): Running speed in kilometers per hour
+        incline_pct (float, optional): Incline/grade in percent. Defaults to 0.
+        wind_speed_kph (float, optional): Wind speed in km/h (positive=headwind, negative=tailwind). Defaults to 0.
+        terrain_coef (float, optional): Terrain coefficient (1.0=track/road). Defaults to 1.0.
+        altitude_m (int, optional): Altitude in meters. Defaults to 0.
+        temperature_c (float, optional): Temperature in Celsius. Defaults to 20.
+
+    Returns:
+        float: Estimated running power in watts
+    """
+    return calculate_power_components(
+        weight, height, speed_kph, incline_pct, wind_speed_kph,
+        terrain_coef, altitude_m, temperature_c
+    )["total"]
+
+
+def estimate_power_from_critical_velocity(cv_ms, weight, height=175):
+    """
+    Estimate critical power from critical velocity on flat terrain in still air.
+
+    Args:
+        cv_ms (float): Critical velocity in meters per second
+        weight (float): Runner's weight in kilograms
+        height (float, optional): Runner's height in centimeters. Defaults to 175.
+
+    Returns:
+        float: Estimated power at critical velocity in watts
+    """
+    g = 9.81  # gravitational acceleration
+    air_density = 1.225  # kg/m³
+    cd = 0.9  # drag coefficient
+    frontal_area = 0.266 * ((weight) ** 0.425) * ((height / 100) ** 0.725) / 10000  # m²
+
+    air_resist = 0.5 * air_density * cd * frontal_area * cv_ms ** 2
+    rolling_resist = 0.01 * weight * g
+
+    total_force = air_resist + rolling_resist
+    power = total_force * cv_ms
+
+    # Apply efficiency factor
+    efficiency = 0.25
+    return power / efficiency
+
+
+def estimate_ftp_from_race_power(race_power, race_duration_min):
+    """
+    Estimate functional threshold power from the average power of a race.
+
+    Args:
+        race_power (float): Average race power in watts
+        race_duration_min (float): Race duration in minutes
+
+    Returns:
+        float: Estimated FTP in watts
+    """
+    if race_duration_min <= 20:
+        # For shorter races, assume FTP is ~85-90% of race power
+        return race_power * 0.88
+    elif race_duration_min <= 60:
+        # For medium duration, closer to FTP
+        return race_power * 0.95
+    else:
+        # For longer races, power is typically below FTP
+        return race_power * 1.05
+
+
+def calculate_power_zones(reference_power, zone_model="7-Zone"):
+    """
+    Calculate running power zones from a reference power (CP or FTP).
+
+    Args:
+        reference_power (float): Critical power or functional threshold power in watts
+        zone_model (str, optional): Zone model to use, options are:
+            - "7-Zone": Detailed 7-zone model
+            - "5-Zone": Standard 5-zone model
+            - "3-Zone": Polarized training model
+
+    Returns:
+        dict: Dictionary of zone names and (lower, upper) power ranges in watts;
+            None marks the open end of the first and last zones
+    """
+    if zone_model == "7-Zone":
+        zones = {
+            "Zone 1 (Recovery)": (None, int(reference_power * 0.55)),
+            "Zone 2 (Endurance)": (int(reference_power * 0.55), int(reference_power * 0.75)),
+            "Zone 3 (Tempo)": (int(reference_power * 0.76), int(reference_power * 0.9)),
+            "Zone 4 (Threshold)": (int(reference_power * 0.91), int(reference_power * 1.05)),
+            "Zone 5 (VO2max)": (int(reference_power * 1.06), int(reference_power * 1.2)),
+            "Zone 6 (Anaerobic)": (int(reference_power * 1.21), int(reference_power * 1.5)),
+            "Zone 7 (Neuromuscular)": (int(reference_power * 1.5), None)
+        }
+    elif zone_model == "5-Zone":
+        zones = {
+            "Zone 1 (Recovery)": (None, int(reference_power * 0.75)),
+            "Zone 2 (Endurance)": (int(reference_power * 0.75), int(reference_power * 0.9)),
+            "Zone 3 (Tempo)": (int(reference_power * 0.9), int(reference_power * 1.0)),
+            "Zone 4 (Threshold)": (int(reference_power * 1.0), int(reference_power * 1.1)),
+            "Zone 5 (Anaerobic)": (int(reference_power * 1.1), None)
+        }
+    else:  # 3-Zone Polarized
+        zones = {
+            "Zone 1 (Easy)": (None, int(reference_power * 0.85)),
+            "Zone 2 (Moderate)": (int(reference_power * 0.85), int(reference_power * 1.05)),
+            "Zone 3 (Hard)": (int(reference_power * 1.05), None)
+        }
+
+    return zones
+
+
+def estimate_awc(cp, max_power):
+    """
+    Roughly estimate anaerobic work capacity from critical power and maximal power.
+
+    Args:
+        cp (float): Critical power in watts
+        max_power (float): Maximal (sprint) power in watts
+
+    Returns:
+        float: Estimated anaerobic work capacity in joules
+    """
+    return (max_power - cp) * 90
+
+
+def calculate_power_duration_curve(cp, awc, max_power, durations):
+    """
+    Calculate the modelled power-duration curve (P = CP + AWC / t, capped at maximal power).
+
+    Args:
+        cp (float): Critical power in watts
+        awc (float): Anaerobic work capacity in joules
+        max_power (float): Maximal (sprint) power in watts
+        durations (list): Durations in seconds
+
+    Returns:
+        list: Sustainable power in watts for each duration
+    """
+    return [min(max_power, cp + (awc / t if t > 0 else 0)) for t in durations]
+
+
+def calculate_hr_zones_max_hr(max_hr):
+    """
+    Calculate heart rate zones as percentages of maximum heart rate.
+
+    Args:
+        max_hr (int): Maximum heart rate in beats per minute
+
+    Returns:
+        dict: Dictionary of zone names and heart rate ranges
+    """
+    return {
+        "Zone 1 (Recovery)": (int(max_hr * 0.5), int(max_hr * 0.6)),
+        "Zone 2 (Aerobic)": (int(max_hr * 0.6 + 1), int(max_hr * 0.7)),
+        "Zone 3 (Tempo)": (int(max_hr * 0.7 + 1), int(max_hr * 0.8)),
+        "Zone 4 (Threshold)": (int(max_hr * 0.8 + 1), int(max_hr * 0.9)),
+        "Zone 5 (Anaerobic)": (int(max_hr * 0.9 + 1), int(max_hr))
+    }
+
+
+def calculate_hr_zones_lthr(lthr):
+    """
+    Calculate heart rate zones from lactate threshold heart rate.
+
+    Args:
+        lthr (int): Lactate threshold heart rate in beats per minute
+
+    Returns:
+        dict: Dictionary of zone names and heart rate ranges; None marks the
+            open end of the first and last zones
+    """
+    return {
+        "Zone 1 (Recovery)": (None, int(lthr * 0.85)),
+        "Zone 2 (Aerobic)": (int(lthr * 0.85), int(lthr * 0.89)),
+        "Zone 3 (Tempo)": (int(lthr * 0.9), int(lthr * 0.94)),
+        "Zone 4 (Threshold)": (int(lthr * 0.95), int(lthr * 0.99)),
+        "Zone 5a (VO2 Intervals)": (int(lthr * 1.0), int(lthr * 1.02)),
+        "Zone 5b (Anaerobic)": (int(lthr * 1.03), int(lthr * 1.06)),
+        "Zone 5c (Neuromuscular)": (int(lthr * 1.06), None)
+    }
+
+
+def calculate_hr_zones_five_zone_system(max_hr):
+    """
+    Calculate heart rate zones using the 5-zone system common in training platforms.
+
+    Args:
+        max_hr (int): Maximum heart rate in beats per minute
+
+    Returns:
+        dict: Dictionary of zone names and heart rate ranges; None marks the
+            open end of the first and last zones
+    """
+    return {
+        "Zone 1 (Active Recovery)": (None, int(max_hr * 0.68)),
+        "Zone 2 (Endurance)": (int(max_hr * 0.68), int(max_hr * 0.83)),
+        "Zone 3 (Tempo)": (int(max_hr * 0.84), int(max_hr * 0.94)),
+        "Zone 4 (Threshold)": (int(max_hr * 0.95), int(max_hr * 1.0)),
+        "Zone 5 (Anaerobic)": (int(max_hr * 1.0), None)
+    }
+
+
+def calculate_vo2max_1_5_mile(weight, run_time_min, gender="Male"):
+    """
+    Calculate VO2 Max from a 1.5-mile run test.
+
+    Args:
+        weight (float): Body weight in kilograms
+        run_time_min (float): Time to complete 1.5 miles in minutes
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        float: Estimated VO2 Max in ml/kg/min
+    """
+    return 88.02 - (0.1656 * weight) - (2.76 * run_time_min) + (3.716 * (1 if gender == "Male" else 0))
+
+
+def calculate_vo2max_rockport(weight_lb, age, walk_time_min, heart_rate, gender="Male"):
+    """
+    Calculate VO2 Max from the Rockport one-mile walking test.
+
+    Args:
+        weight_lb (float): Body weight in pounds
+        age (int): Age in years
+        walk_time_min (float): Time to walk one mile in minutes
+        heart_rate (int): Heart rate at the end of the walk
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        float: Estimated VO2 Max in ml/kg/min
+    """
+    gender_factor = 1 if gender == "Male" else 0
+    return 132.853 - (0.0769 * weight_lb) - (0.3877 * age) + (6.315 * gender_factor) - (
+            3.2649 * walk_time_min) - (0.1565 * heart_rate)
+
+
+def calculate_vo2max_astrand(workload_watts, steady_hr, age, weight, gender="Male"):
+    """
+    Calculate VO2 Max from the Astrand submaximal cycle test.
+
+    Args:
+        workload_watts (float): Cycle workload in watts
+        steady_hr (int): Steady-state heart rate at that workload
+        age (int): Age in years
+        weight (float): Body weight in kilograms
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        float: Estimated VO2 Max in ml/kg/min
+    """
+    # Convert workload from watts to kgm/min (1 watt = 6.12 kgm/min)
+    workload_kgm = workload_watts * 6.12
+
+    # Estimate VO2 at the test workload (L/min)
+    divisor = 200 if gender == "Male" else 170
+    if steady_hr <= 120:
+        vo2_test = (workload_kgm + 300) / divisor
+    else:
+        vo2_test = workload_kgm / divisor
+
+    # Scale to maximum heart rate
+    hr_max = 220 - age
+    vo2max_l = vo2_test * hr_max / steady_hr
+
+    # Age correction factor
+    age_factor = 1.0
+    if age >= 25:
+        age_factor = 1.0 - (0.01 * (age - 25))
+
+    vo2max_l = vo2max_l * age_factor
+
+    # Convert to ml/kg/min
+    return vo2max_l * 1000 / weight
+
+
+def get_vo2max_categories(age, gender="Male"):
+    """
+    Get the VO2 Max fitness category thresholds for an age group.
+
+    Args:
+        age (int): Age in years
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        list: (category, lower, upper) tuples in ml/kg/min; None marks the open
+            end of the lowest and highest categories
+    """
+    if gender == "Male":
+        if age < 30:
+            bounds = (33, 37, 49, 53)
+        elif age < 40:
+            bounds = (31, 35, 46, 50)
+        elif age < 50:
+            bounds = (28, 33, 43, 47)
+        else:
+            bounds = (25, 30, 39, 43)
+    else:  # Female
+        if age < 30:
+            bounds = (28, 33, 43, 47)
+        elif age < 40:
+            bounds = (26, 31, 39, 43)
+        elif age < 50:
+            bounds = (24, 29, 37, 41)
+        else:
+            bounds = (22, 27, 35, 39)
+
+    fair, good, excellent, superior = bounds
+
+    return [
+        ("Poor", None, fair),
+        ("Fair", fair, good - 1),
+        ("Good", good, excellent - 1),
+        ("Excellent", excellent, superior),
+        ("Superior", superior, None)
+    ]
+
+
+def classify_vo2max(vo2max, age, gender="Male"):
+    """
+    Classify a VO2 Max value into a fitness category for the runner's age and gender.
+
+    Args:
+        vo2max (float): VO2 Max in ml/kg/min
+        age (int): Age in years
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        str: Category name, or an empty string if the value falls between category bounds
+    """
+    for category, lower, upper in get_vo2max_categories(age, gender):
+        if lower is None and vo2max < upper:
+            return category
+        elif upper is None and vo2max > lower:
+            return category
+        elif lower is not None and upper is not None and lower <= vo2max <= upper:
+            return category
+
+    return ""
+
+
+def get_average_vo2max(age, gender="Male"):
+    """
+    Get the population average VO2 Max for an age group.
+
+    Args:
+        age (int): Age in years
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
 
-    return power_output
\ No newline at end of file
+    Returns:
+        int: Average VO2 Max in ml/kg/min
+    """
+    if gender == "Male":
+        averages = (44, 42, 39, 36)
+    else:  # Female
+        averages = (38, 36, 33, 30)
+
+    if age < 30:
+        return averages[0]
+    elif age < 40:
+        return averages[1]
+    elif age < 50:
+        return averages[2]
+    else:
+        return averages[3]
+
+
+def calculate_equivalent_race_times(vdot):
+    """
+    Calculate equivalent race times for standard distances from a VDOT value.
+
+    Args:
+        vdot (float): VDOT value
+
+    Returns:
+        dict: Predicted times in seconds for "5K", "10K", "Half Marathon" and "Marathon"
+    """
+    # These formulas are approximations based on Daniels' tables
+    return {
+        "5K": (5000 / 1000) * 60 * (29.87 * (vdot ** -0.29)),
+        "10K": (10000 / 1000) * 60 * (31.72 * (vdot ** -0.294)),
+        "Half Marathon": (21097.5 / 1000) * 60 * (33.71 * (vdot ** -0.298)),
+        "Marathon": (42195 / 1000) * 60 * (35.66 * (vdot ** -0.3))
+    }
+
+
+def calculate_srpe_load(duration_min, rpe):
+    """
+    Calculate session RPE training load.
+
+    Args:
+        duration_min (float): Session duration in minutes
+        rpe (int): Session rating of perceived exertion (1-10)
+
+    Returns:
+        float: Session load in arbitrary units
+    """
+    return duration_min * rpe
+
+
+def calculate_weekly_load_stats(daily_loads):
+    """
+    Calculate Foster's weekly training load statistics from seven daily loads.
+
+    Args:
+        daily_loads (list): Training load for each day of the week (0 for rest days)
+
+    Returns:
+        dict: "total", "mean", "std" (population), "monotony" (mean / std) and
+            "strain" (total × monotony)
+    """
+    loads = np.asarray(daily_loads, dtype=float)
+    total = loads.sum()
+
+    if not np.any(loads > 0):
+        return {"total": total, "mean": 0, "std": 0, "monotony": 0, "strain": 0}
+
+    mean = total / len(loads)
+    std = np.sqrt(np.mean((loads - mean) ** 2))
+    monotony = mean / std if std > 0 else 0
+
+    return {
+        "total": total,
+        "mean": mean,
+        "std": std,
+        "monotony": monotony,
+        "strain": total * monotony
+    }
+
+
+def calculate_banister_trimp(duration_min, avg_hr, resting_hr, max_hr, gender="Male"):
+    """
+    Calculate Banister's training impulse (TRIMP) from average heart rate.
+
+    Args:
+        duration_min (float): Session duration in minutes
+        avg_hr (float): Average heart rate during the session
+        resting_hr (float): Resting heart rate
+        max_hr (float): Maximum heart rate
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        float: TRIMP in arbitrary units
+    """
+    hr_ratio = (avg_hr - resting_hr) / (max_hr - resting_hr)
+
+    # Gender-specific weighting factor
+    if gender == "Male":
+        intensity_factor = 0.64 * exp(1.92 * hr_ratio)
+    else:  # Female
+        intensity_factor = 0.86 * exp(1.67 * hr_ratio)
+
+    return duration_min * hr_ratio * intensity_factor
+
+
+def calculate_edwards_trimp(zone_minutes):
+    """
+    Calculate Edwards' summated heart rate zone TRIMP.
+
+    Args:
+        zone_minutes (list): Minutes spent in each of the five heart rate zones
+
+    Returns:
+        float: TRIMP in arbitrary units
+    """
+    return sum(minutes * weight for weight, minutes in enumerate(zone_minutes, start=1))
+
+
+def calculate_acwr(weekly_loads):
+    """
+    Calculate the acute:chronic workload ratio from the last four weeks of training.
+
+    Args:
+        weekly_loads (list): Weekly loads, oldest first; the last entry is the acute week
+
+    Returns:
+        dict: "acute" and "chronic" (mean weekly) workloads and the "acwr"
+    """
+    acute = weekly_loads[-1]
+    chronic = sum(weekly_loads) / len(weekly_loads)
+
+    return {
+        "acute": acute,
+        "chronic": chronic,
+        "acwr": acute / chronic if chronic > 0 else 0
+    }
+
+
+def classify_acwr(acwr):
+    """
+    Classify an acute:chronic workload ratio into an injury-risk band.
+
+    Args:
+        acwr (float): Acute:chronic workload ratio
+
+    Returns:
+        str: "Undertraining", "Sweet Spot", "Caution" or "High Risk"
+    """
+    if acwr < 0.8:
+        return "Undertraining"
+    elif acwr <= 1.3:
+        return "Sweet Spot"
+    elif acwr <= 1.5:
+        return "Caution"
+    else:
+        return "High Risk"
+
+
+def calculate_hrv_trend_stats(hrv_values):
+    """
+    Calculate weekly HRV trend statistics.
+
+    Args:
+        hrv_values (list): Daily HRV readings, oldest first
+
+    Returns:
+        dict: "mean", "std" (population), "cv" (%), "swc" (smallest worthwhile
+            change, 0.5 × CV in %) and "today_vs_avg" (% change of the last reading)
+    """
+    values = np.asarray(hrv_values, dtype=float)
+    mean = values.mean()
+    std = np.sqrt(np.mean((values - mean) ** 2))
+    cv = (std / mean) * 100 if mean > 0 else 0
+
+    return {
+        "mean": mean,
+        "std": std,
+        "cv": cv,
+        "swc": 0.5 * cv,
+        "today_vs_avg": ((values[-1] - mean) / mean) * 100 if mean > 0 else 0
+    }
+
+
+def calculate_rhr_trend_stats(rhr_values):
+    """
+    Calculate resting heart rate trend statistics with a least-squares trend line.
+
+    Args:
+        rhr_values (list): Daily resting heart rates, oldest first
+
+    Returns:
+        dict: "mean", "std" (population), "slope" (bpm/day), "intercept" (day 1 = x of 1),
+            "trend" (fitted values) and "day_to_day" (mean absolute daily change)
+    """
+    y = np.asarray(rhr_values, dtype=float)
+    x = np.arange(1, len(y) + 1, dtype=float)
+    n = len(y)
+
+    mean = y.mean()
+    std = np.sqrt(np.mean((y - mean) ** 2))
+
+    slope = (n * np.sum(x * y) - x.sum() * y.sum()) / (n * np.sum(x * x) - x.sum() ** 2)
+    intercept = (y.sum() - slope * x.sum()) / n
+
+    return {
+        "mean": mean,
+        "std": std,
+        "slope": slope,
+        "intercept": intercept,
+        "trend": intercept + slope * x,
+        "day_to_day": np.mean(np.abs(np.diff(y))) if n > 1 else 0
+    }
+
+
+def calculate_rhr_recovery(today_rhr, baseline_rhr):
+    """
+    Estimate recovery percentage from today's resting heart rate relative to baseline.
+
+    Args:
+        today_rhr (float): This morning's resting heart rate
+        baseline_rhr (float): Baseline resting heart rate
+
+    Returns:
+        float: Recovery percentage, limited to 0-110%
+    """
+    recovery = 100 - ((today_rhr - baseline_rhr) * 5)
+    return max(0, min(110, recovery))
+
+
+def calculate_optimal_cadence(height_cm):
+    """
+    Estimate the optimal running cadence range for a runner's height.
+
+    Args:
+        height_cm (float): Height in centimeters
+
+    Returns:
+        tuple: (optimal, lower, upper) cadence in steps per minute
+    """
+    height_inches = height_cm / 2.54
+    optimal = 180 + (70 - height_inches) * 0.5
+    return optimal, optimal - 5, optimal + 5
+
+
+def calculate_cadence_score(cadence, lower_optimal, upper_optimal):
+    """
+    Score a cadence against the optimal range.
+
+    Args:
+        cadence (float): Cadence in steps per minute
+        lower_optimal (float): Lower bound of the optimal range
+        upper_optimal (float): Upper bound of the optimal range
+
+    Returns:
+        float: Score from 0 to 100
+    """
+    if cadence < lower_optimal:
+        score = 50 + ((cadence - 150) / (lower_optimal - 150)) * 30
+    elif cadence > upper_optimal:
+        score = 80 + ((220 - cadence) / (220 - upper_optimal)) * 10
+    else:
+        score = 90
+
+    return min(100, max(0, score))
@@ -0,0 +1,311 @@
+"""
+Critical power / critical speed models fitted to mean-maximal data.
+
+Fits take a shared array of durations (seconds) and the best values for those durations, either
+1-D for one athlete or 2-D (athletes × durations) for a roster, with NaN where an athlete has no
+data. Every athlete is fitted at once with closed-form least squares, and confidence intervals are
+95% intervals from the regression standard errors.
+"""
+import numpy as np
+from scipy.stats import t as student_t
+
+
+def _t_critical_95(dof):
+    """
+    Two-sided 95% Student t quantile, NaN without degrees of freedom
+    """
+    dof = np.asarray(dof, dtype=float)
+    return np.where(dof > 0, student_t.ppf(0.975, np.where(dof > 0, dof, 1.0)), np.nan)
+
+
+def _linear_fit(x, y, parameters=2):
+    """
+    Least-squares fit of y = intercept + slope * x along the last axis, ignoring NaN points.
+
+    The residual variance behind the standard errors has n - parameters degrees of freedom, so a
+    model with a parameter chosen outside the line (such as the 3-parameter offset) passes 3.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    n = valid.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = x.sum(axis=-1) / n
+        y_mean = y.sum(axis=-1) / n
+        dx = np.where(valid, x - x_mean[..., None], 0.0)
+        dy = np.where(valid, y - y_mean[..., None], 0.0)
+
+        sxx = (dx * dx).sum(axis=-1)
+        sxy = (dx * dy).sum(axis=-1)
+        syy = (dy * dy).sum(axis=-1)
+
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+
+        sse = np.maximum(syy - slope * sxy, 0.0)
+        dof = n - parameters
+        sigma2 = np.where(dof > 0, sse / dof, np.nan)
+
+        slope_se = np.sqrt(sigma2 / sxx)
+        intercept_se = np.sqrt(sigma2 * (1.0 / n + x_mean ** 2 / sxx))
+        r_squared = np.where(syy > 0, 1 - sse / syy, np.nan)
+
+    return {
+        "intercept": intercept,
+        "slope": slope,
+        "intercept_se": intercept_se,
+        "slope_se": slope_se,
+        "r_squared": r_squared,
+        "rmse": np.sqrt(sse / np.where(n > 0, n, np.nan)),
+        "sse": sse,
+        "n": n,
+        "dof": dof
+    }
+
+
+def _select_durations(durations, values, min_duration, max_duration):
+    """
+    Mask out points outside the fitting range
+    """
+    durations = np.asarray(durations, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    in_range = durations >= min_duration
+    if max_duration is not None:
+        in_range &= durations <= max_duration
+
+    return durations, np.where(in_range, values, np.nan)
+
+
+def _interval(estimate, se, dof):
+    half_width = _t_critical_95(dof) * se
+    return estimate - half_width, estimate + half_width
+
+
+def fit_cp_2_parameter(durations, values, min_duration=120, max_duration=1200):
+    """
+    Fit the 2-parameter critical power model P = CP + W′ / t.
+
+    The model is linear in 1 / t, so CP is the intercept and W′ the slope. Works the same for
+    speed, giving critical velocity and D′.
+
+    Args:
+        durations (array-like): Durations in seconds
+        values (array-like): Best power (W) or speed (m/s) for each duration; 2-D for a roster
+        min_duration (float, optional): Shortest duration used in the fit. Defaults to 120 s.
+        max_duration (float, optional): Longest duration used in the fit. Defaults to 1200 s.
+
+    Returns:
+        dict: "cp" and "w_prime" with 95% intervals "cp_ci" and "w_prime_ci" (lower, upper),
+            plus "r_squared", "rmse" and "n_points"
+    """
+    durations, values = _select_durations(durations, values, min_duration, max_duration)
+    fit = _linear_fit(1.0 / durations, values)
+
+    return {
+        "cp": fit["intercept"],
+        "w_prime": fit["slope"],
+        "cp_ci": _interval(fit["intercept"], fit["intercept_se"], fit["dof"]),
+        "w_prime_ci": _interval(fit["slope"], fit["slope_se"], fit["dof"]),
+        "r_squared": fit["r_squared"],
+        "rmse": fit["rmse"],
+        "n_points": fit["n"]
+    }
+
+
+def fit_cp_3_parameter(durations, values, min_duration=1, max_duration=None, offsets=None):
+    """
+    Fit the 3-parameter critical power model P = CP + W′ / (t + k) (Morton, 1996).
+
+    The model is linear in 1 / (t + k) for a fixed time offset k, so every candidate offset is
+    fitted by least squares at once and the best one kept per athlete. Maximal power is
+    Pmax = CP + W′ / k. Intervals for CP and W′ are conditional on the chosen k. Memory grows with
+    offsets × athletes × durations, so fit rosters on a coarse grid such as
+    power_curves.STANDARD_DURATIONS rather than the per-second curve.
+
+    Args:
+        durations (array-like): Durations in seconds
+        values (array-like): Best power (W) or speed (m/s) for each duration; 2-D for a roster
+        min_duration (float, optional): Shortest duration used in the fit. Defaults to 1 s.
+        max_duration (float, optional): Longest duration used in the fit. Defaults to no limit.
+        offsets (array-like, optional): Candidate k values in seconds. Defaults to 0.5-120 s
+            on a logarithmic grid.
+
+    Returns:
+        dict: "cp", "w_prime", "k" and "p_max", with "cp_ci" and "w_prime_ci", "r_squared",
+            "rmse" and "n_points"
+    """
+    durations, values = _select_durations(durations, values, min_duration, max_duration)
+    offsets = np.geomspace(0.5, 120, 200) if offsets is None else np.asarray(offsets, dtype=float)
+
+    # Candidate offsets on a new leading axis: (offsets, athletes..., durations)
+    shape = (len(offsets),) + (1,) * values.ndim
+    x = 1.0 / (durations + offsets.reshape(shape))
+    fits = _linear_fit(x, values[None, ...], parameters=3)
+
+    sse = np.where(np.isnan(fits["sse"]), np.inf, fits["sse"])
+    best = np.argmin(sse, axis=0)
+
+    def pick(array):
+        return np.take_along_axis(array, best[None, ...], axis=0)[0]
+
+    cp = pick(fits["intercept"])
+    w_prime = pick(fits["slope"])
+    k = offsets[best]
+    dof = pick(fits["dof"])
+
+    return {
+        "cp": cp,
+        "w_prime": w_prime,
+        "k": k,
+        "p_max": cp + w_prime / k,
+        "cp_ci": _interval(cp, pick(fits["intercept_se"]), dof),
+        "w_prime_ci": _interval(w_prime, pick(fits["slope_se"]), dof),
+        "r_squared": pick(fits["r_squared"]),
+        "rmse": pick(fits["rmse"]),
+        "n_points": pick(fits["n"])
+    }
+
+
+def fit_riegel(durations, speeds, min_duration=120, max_duration=None):
+    """
+    Fit the Riegel fatigue exponent from best speeds, T = a × D^b.
+
+    Each point is a best-effort duration and speed, so the distance covered is speed × duration
+    and the fit is a straight line of log time against log distance.
+
+    Args:
+        durations (array-like): Durations in seconds
+        speeds (array-like): Best speed in meters per second for each duration; 2-D for a roster
+        min_duration (float, optional): Shortest duration used in the fit. Defaults to 120 s.
+        max_duration (float, optional): Longest duration used in the fit. Defaults to no limit.
+
+    Returns:
+        dict: "exponent" (b, 1.06 in Riegel's original work) with "exponent_ci", the
+            coefficient "a" (seconds per meter^b), "r_squared" and "n_points"
+    """
+    durations, speeds = _select_durations(durations, speeds, min_duration, max_duration)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distances = np.where(speeds > 0, speeds * durations, np.nan)
+        log_times = np.where(np.isnan(distances), np.nan, np.log(durations))
+        fit = _linear_fit(np.log(distances), log_times)
+
+    return {
+        "exponent": fit["slope"],
+        "exponent_ci": _interval(fit["slope"], fit["slope_se"], fit["dof"]),
+        "a": np.exp(fit["intercept"]),
+        "r_squared": fit["r_squared"],
+        "n_points": fit["n"]
+    }
+
+
+def calculate_w_prime_balance(values, cp, w_prime, timestamps=None):
+    """
+    Calculate W′ balance over a power (or speed) stream with the differential model (Skiba, 2015).
+
+    Above CP, W′ is spent at (P - CP) per second. Below CP the spent part recovers exponentially
+    at a rate (CP - P) / W′. This makes the spent W′ a linear recurrence, which is solved with
+    cumulative sums and products in one vectorized pass instead of a per-sample loop.
+
+    Args:
+        values (array-like): Power (W) or speed (m/s) samples, NaN where missing (treated as 0)
+        cp (float): Critical power or critical velocity
+        w_prime (float): W′ in joules (or D′ in meters for speed)
+        timestamps (array-like, optional): Sample timestamps, datetime64 or seconds. Defaults to
+            one sample per second.
+
+    Returns:
+        numpy.ndarray: W′ balance after each sample
+    """
+    # Imported here to keep the model fits usable without the stream helpers
+    from utils.streams import sample_durations
+
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    dt = np.ones(len(values)) if timestamps is None else sample_durations(timestamps)
+
+    spend = np.where(values > cp, (values - cp) * dt, 0.0)
+    log_decay = np.where(values < cp, -(cp - values) * dt / w_prime, 0.0)
+
+    # spent[t] = decay[t] * spent[t-1] + spend[t], solved per block so the products can't underflow
+    spent = np.empty(len(values))
+    log_total = np.cumsum(log_decay)
+    block = np.floor(-log_total / 500.0).astype(int)
+    carried = 0.0
+
+    for index in np.unique(block):
+        members = np.flatnonzero(block == index)
+        first, last = members[0], members[-1] + 1
+
+        log_product = log_total[first:last] - (log_total[first - 1] if first > 0 else 0.0)
+        product = np.exp(log_product)
+        spent[first:last] = product * (carried + np.cumsum(spend[first:last] / product))
+        carried = spent[last - 1]
+
+    return w_prime - spent
+
+
+def summarize_w_prime_balance(balance, w_prime, timestamps=None, thresholds=(0.5, 0.25, 0.0), points=500):
+    """
+    Summarize a W′ balance series for reporting and plotting.
+
+    Args:
+        balance (array-like): W′ balance per sample, from calculate_w_prime_balance
+        w_prime (float): W′ the balance started from
+        timestamps (array-like, optional): Sample timestamps, datetime64 or seconds. Defaults to
+            one sample per second.
+        thresholds (tuple, optional): Fractions of W′ to report time below. Defaults to 50%, 25% and 0%.
+        points (int, optional): Maximum length of the plotting series. Defaults to 500.
+
+    Returns:
+        dict: "min_balance", "min_fraction", "time_below" (seconds below each threshold fraction)
+            and "series", the balance downsampled to at most points (keeping each bucket's minimum)
+            with the elapsed "seconds" of each point
+    """
+    # Imported here to keep the model fits usable without the stream helpers
+    from utils.streams import sample_durations
+
+    balance = np.asarray(balance, dtype=float)
+    dt = np.ones(len(balance)) if timestamps is None else sample_durations(timestamps)
+    elapsed = np.cumsum(dt) - dt
+
+    time_below = {
+        threshold: float(dt[balance < threshold * w_prime].sum()) for threshold in thresholds
+    }
+
+    # Keep the lowest point of every bucket so dips survive the downsampling
+    buckets = np.array_split(np.arange(len(balance)), min(points, len(balance))) if len(balance) else []
+    lowest = [bucket[np.argmin(balance[bucket])] for bucket in buckets]
+
+    return {
+        "min_balance": float(balance.min()) if len(balance) else np.nan,
+        "min_fraction": float(balance.min() / w_prime) if len(balance) else np.nan,
+        "time_below": time_below,
+        "series": {
+            "seconds": elapsed[lowest],
+            "balance": balance[lowest]
+        }
+    }
+
+
+def batch_w_prime_balance(sessions, cp, w_prime):
+    """
+    Summarize W′ balance for many sessions, e.g. a season of track workouts.
+
+    Args:
+        sessions (list): (values, timestamps) pairs, with timestamps None for 1 Hz streams
+        cp (float or list): Critical power (or velocity), one per session or shared
+        w_prime (float or list): W′ (or D′), one per session or shared
+
+    Returns:
+        list: summarize_w_prime_balance results, one per session
+    """
+    cps = np.broadcast_to(np.asarray(cp, dtype=float), (len(sessions),))
+    w_primes = np.broadcast_to(np.asarray(w_prime, dtype=float), (len(sessions),))
+
+    return [
+        summarize_w_prime_balance(calculate_w_prime_balance(values, c, w, timestamps), w, timestamps)
+        for (values, timestamps), c, w in zip(sessions, cps, w_primes)
+    ]
@@ -50,4 +50,23 @@ def format_with_units(value, unit, precision=1):
     Returns:
         str: Formatted string with value and units
     """
-    return f"{value:.{precision}f} {unit}"
\ No newline at end of file
+    return f"{value:.{precision}f} {unit}"
+
+
+def format_zone_range(lower, upper, unit):
+    """
+    Format a (lower, upper) zone range from the zone calculators.
+
+    Args:
+        lower (int): Lower bound, or None for an open first zone
+        upper (int): Upper bound, or None for an open last zone
+        unit (str): The unit string (e.g., "bpm", "watts")
+
+    Returns:
+        str: Formatted range (e.g., "120 - 140 bpm", "< 120 bpm" or "> 180 bpm")
+    """
+    if lower is None:
+        return f"< {upper} {unit}"
+    if upper is None:
+        return f"> {lower} {unit}"
+    return f"{lower} - {upper} {unit}"
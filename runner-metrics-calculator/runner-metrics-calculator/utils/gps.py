@@ -0,0 +1,236 @@
+"""
+GPS track preprocessing: distance, 1 Hz resampling, speed, grade, outliers and auto-pause.
+
+preprocess_track turns raw latitude/longitude/elevation/time samples into clean 1 Hz streams
+that the stream metrics (power, zones, mean-max curves, W′ balance) can consume directly, so
+every calculator works from the same derivation. Every stage is a vectorized O(n) pass.
+"""
+import numpy as np
+import pandas as pd
+from scipy.signal import savgol_filter
+
+from utils.streams import calculate_grade, to_seconds
+
+EARTH_RADIUS_M = 6371008.8
+
+# Steps implying a faster speed than this are GPS jumps, not running
+MAX_SPEED_MS = 12.0
+
+# Elevation samples this far from their neighbours' median are barometer/GPS spikes
+MAX_ELEVATION_JUMP_M = 25.0
+
+# Below this (smoothed) speed the runner is considered stopped
+PAUSE_SPEED_MS = 0.5
+
+
+def haversine_distance(lat, lon):
+    """
+    Great-circle distance between consecutive GPS samples.
+
+    Args:
+        lat (array-like): Latitudes in degrees
+        lon (array-like): Longitudes in degrees
+
+    Returns:
+        numpy.ndarray: Meters from the previous sample (0 for the first sample)
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+
+    steps = np.zeros(len(lat))
+    if len(lat) < 2:
+        return steps
+
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    steps[1:] = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    return steps
+
+
+def find_outliers(seconds, lat, lon, elevation=None, max_speed_ms=MAX_SPEED_MS,
+                  max_elevation_jump_m=MAX_ELEVATION_JUMP_M):
+    """
+    Flag GPS jumps and elevation spikes.
+
+    A position is a jump when the steps both into and out of it imply an impossible speed while
+    its neighbours are consistent with each other. An elevation is a spike when it is far from the
+    median of the surrounding samples.
+
+    Args:
+        seconds (array-like): Sample times in seconds
+        lat (array-like): Latitudes in degrees
+        lon (array-like): Longitudes in degrees
+        elevation (array-like, optional): Elevations in meters
+        max_speed_ms (float, optional): Fastest plausible speed. Defaults to 12 m/s.
+        max_elevation_jump_m (float, optional): Largest plausible deviation from the local
+            median elevation. Defaults to 25 m.
+
+    Returns:
+        dict: Boolean masks "position" and "elevation", True for outliers
+    """
+    seconds = np.asarray(seconds, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    n = len(seconds)
+
+    position = np.zeros(n, dtype=bool)
+    if n >= 3:
+        # Speed of every step, and from the sample before to the sample after, skipping the middle one
+        bridge = haversine_distance(np.stack([lat[:-2], lat[2:]], 1).ravel(),
+                                    np.stack([lon[:-2], lon[2:]], 1).ravel())[1::2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step_speed = haversine_distance(lat, lon)[1:] / np.diff(seconds)
+            skip_speed = bridge / (seconds[2:] - seconds[:-2])
+
+        fast_in = step_speed[:-1] > max_speed_ms
+        fast_out = step_speed[1:] > max_speed_ms
+        position[1:-1] = fast_in & fast_out & (skip_speed <= max_speed_ms)
+
+    spikes = np.zeros(n, dtype=bool)
+    if elevation is not None:
+        elevation = pd.Series(np.asarray(elevation, dtype=float))
+        local = elevation.rolling(5, center=True, min_periods=1).median()
+        spikes = ((elevation - local).abs() > max_elevation_jump_m).to_numpy()
+
+    return {
+        "position": position,
+        "elevation": spikes
+    }
+
+
+def _smooth(values, window):
+    """
+    Savitzky-Golay smoothing that leaves streams shorter than the window untouched
+    """
+    window = min(window, len(values) - (1 - len(values) % 2))
+    if window < 5:
+        return values
+    return savgol_filter(values, window, 2)
+
+
+def preprocess_track(timestamps, lat, lon, elevation=None, max_gap_s=30, smoothing_s=9,
+                     elevation_smoothing_s=31, pause_speed_ms=PAUSE_SPEED_MS, distance=None, **streams):
+    """
+    Clean and resample a GPS track to 1 Hz.
+
+    Invalid fixes and outliers are dropped, the remaining samples are linearly interpolated onto a
+    one-second grid, and speed and elevation are smoothed with a Savitzky-Golay filter before grade
+    is derived. Seconds inside recording gaps longer than max_gap_s are marked as not recorded and
+    count as paused, as does any second slower than pause_speed_ms. When the device recorded its
+    own distance (foot pod, treadmill, or a watch's filtered GPS distance), that distance replaces
+    the one measured along the positions and goes through the same resampling and smoothing.
+
+    Args:
+        timestamps (array-like): Sample timestamps, datetime64 or seconds
+        lat (array-like): Latitudes in degrees
+        lon (array-like): Longitudes in degrees
+        elevation (array-like, optional): Elevations in meters
+        max_gap_s (float, optional): Longest interval interpolated as recording. Defaults to 30.
+        smoothing_s (int, optional): Speed smoothing window in seconds (odd). Defaults to 9.
+        elevation_smoothing_s (int, optional): Elevation and grade smoothing window in seconds
+            (odd). Defaults to 31.
+        pause_speed_ms (float, optional): Auto-pause speed threshold. Defaults to 0.5 m/s.
+        distance (array-like, optional): Cumulative distance recorded by the device in meters;
+            lat and lon may then be missing
+        **streams: Other per-sample streams (heart_rate, cadence, power, ...) to resample alongside
+
+    Returns:
+        dict: 1 Hz float32 arrays "distance" (m), "speed" (m/s), "elevation" (m), "grade" (%) and
+            the resampled extra streams, boolean "moving" and "recorded" masks, and "timestamp"
+            (datetime64[s] for datetime input, seconds otherwise)
+    """
+    is_datetime = np.issubdtype(np.asarray(timestamps).dtype, np.datetime64)
+    seconds = to_seconds(timestamps)
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    elevation = None if elevation is None else np.asarray(elevation, dtype=float)
+
+    recorded_distance = None if distance is None else np.asarray(distance, dtype=float)
+
+    # Keep valid, time-ordered fixes (or distance samples)
+    if recorded_distance is None:
+        valid = np.isfinite(seconds) & np.isfinite(lat) & np.isfinite(lon)
+    else:
+        valid = np.isfinite(seconds) & np.isfinite(recorded_distance)
+    valid &= np.concatenate([[True], np.diff(np.fmax.accumulate(np.where(valid, seconds, -np.inf))) > 0])
+
+    outliers = find_outliers(seconds[valid], lat[valid], lon[valid],
+                             None if elevation is None else elevation[valid])
+    if recorded_distance is not None:
+        # Position jumps don't affect a distance the device measured itself
+        outliers["position"][:] = False
+    keep = np.flatnonzero(valid)[~outliers["position"]]
+
+    seconds = seconds[keep]
+    if recorded_distance is None:
+        distance = np.cumsum(haversine_distance(lat[keep], lon[keep]))
+    else:
+        distance = recorded_distance[keep]
+
+    if len(seconds) == 0:
+        raise ValueError("The track has no valid GPS or distance samples")
+
+    # One-second grid, with the seconds inside long gaps marked as not recorded
+    grid = np.arange(np.floor(seconds[0]), np.floor(seconds[-1]) + 1)
+    following = np.clip(np.searchsorted(seconds, grid), 0, len(seconds) - 1)
+    preceding = np.clip(following - 1, 0, len(seconds) - 1)
+    recorded = (seconds[following] - seconds[preceding]) <= max_gap_s
+
+    resampled = {"distance": np.interp(grid, seconds, distance)}
+
+    if elevation is not None:
+        kept_elevation = elevation[keep]
+        good = np.isfinite(kept_elevation) & ~outliers["elevation"][~outliers["position"]]
+        if good.any():
+            resampled["elevation"] = _smooth(np.interp(grid, seconds[good], kept_elevation[good]),
+                                            elevation_smoothing_s)
+
+    for name, values in streams.items():
+        values = np.asarray(values, dtype=float)[keep]
+        good = np.isfinite(values)
+        resampled[name] = np.interp(grid, seconds[good], values[good]) if good.any() else np.full(len(grid), np.nan)
+        resampled[name][~recorded] = np.nan
+
+    speed = np.clip(_smooth(np.gradient(resampled["distance"]) if len(grid) > 1 else np.zeros(len(grid)),
+                            smoothing_s), 0, None)
+    speed[~recorded] = 0.0
+    resampled["speed"] = speed
+
+    if "elevation" in resampled:
+        resampled["grade"] = calculate_grade(resampled["elevation"], resampled["distance"],
+                                             elevation_smoothing_s)
+
+    track = {name: values.astype(np.float32) for name, values in resampled.items()}
+    track["recorded"] = recorded
+    track["moving"] = recorded & (speed >= pause_speed_ms)
+    track["timestamp"] = grid.astype("datetime64[s]") if is_datetime else grid
+
+    return track
+
+
+def summarize_track(track):
+    """
+    Totals for a preprocessed track.
+
+    Args:
+        track (dict): Output of preprocess_track
+
+    Returns:
+        dict: "distance_m", "elapsed_s", "moving_s", "moving_speed_ms" and "elevation_gain_m"
+    """
+    moving_s = float(track["moving"].sum())
+    distance_m = float(track["distance"][-1]) if len(track["distance"]) else 0.0
+
+    gain = 0.0
+    if "elevation" in track and len(track["elevation"]) > 1:
+        climbs = np.diff(track["elevation"].astype(float))
+        gain = float(climbs[climbs > 0].sum())
+
+    return {
+        "distance_m": distance_m,
+        "elapsed_s": float(len(track["distance"])),
+        "moving_s": moving_s,
+        "moving_speed_ms": float(track["speed"][track["moving"]].mean()) if moving_s else 0.0,
+        "elevation_gain_m": gain
+    }
@@ -0,0 +1,392 @@
+"""
+Training load models over full daily load histories.
+
+Loads are daily values (TRIMP, session RPE load, distance, ...) with days on the last axis, so a
+1-D array is one athlete's history and a 2-D array is a roster of athletes × days. Missing days
+(NaN) count as rest days with zero load.
+"""
+import numpy as np
+import pandas as pd
+
+
+def daily_load_series(dates, loads, start=None, end=None):
+    """
+    Sum session loads per calendar day into a gap-free daily series.
+
+    Args:
+        dates (array-like): Session dates or timestamps
+        loads (array-like): Session loads
+        start (date-like, optional): First day of the series. Defaults to the first session.
+        end (date-like, optional): Last day of the series. Defaults to the last session.
+
+    Returns:
+        pandas.Series: Daily loads indexed by day, with 0 on days without sessions
+    """
+    sessions = pd.Series(np.asarray(loads, dtype=float), index=pd.to_datetime(dates).normalize())
+    daily = sessions.groupby(level=0).sum()
+
+    days = pd.date_range(start or daily.index.min(), end or daily.index.max(), freq="D")
+    return daily.reindex(days, fill_value=0.0)
+
+
+def exponential_filter(daily_loads, time_constant, initial=0.0):
+    """
+    Exponentially weighted average of daily loads, computed with a one-pass recursive filter.
+
+    Each day the average moves towards that day's load by a fraction 1 - exp(-1 / time_constant),
+    which is the discrete form of the Banister impulse-response decay.
+
+    Args:
+        daily_loads (array-like): Daily loads, days on the last axis
+        time_constant (float or array-like): Decay time constant in days, one per athlete for 2-D input
+        initial (float or array-like, optional): Value before the first day. Defaults to 0.
+
+    Returns:
+        numpy.ndarray: Filtered loads with the same shape as daily_loads
+    """
+    decay = np.exp(-1.0 / np.asarray(time_constant, dtype=float))
+    return _recursive_filter(daily_loads, 1.0 - decay, initial)
+
+
+def _recursive_filter(daily_loads, gain, initial=0.0):
+    """
+    Run value = value + gain × (load - value) over the days axis, for every athlete at once
+    """
+    loads = np.nan_to_num(np.asarray(daily_loads, dtype=float))
+    gain = np.asarray(gain, dtype=float)
+    decay = 1.0 - gain
+
+    # Days on the first (contiguous) axis so each step updates every athlete at once
+    weighted_by_day = np.ascontiguousarray(np.moveaxis(loads, -1, 0)) * gain
+    filtered = np.empty_like(weighted_by_day)
+    value = np.broadcast_to(np.asarray(initial, dtype=float), weighted_by_day.shape[1:]).copy()
+
+    for day in range(weighted_by_day.shape[0]):
+        value *= decay
+        value += weighted_by_day[day]
+        filtered[day] = value
+
+    return np.moveaxis(filtered, 0, -1)
+
+
+def calculate_fitness_fatigue(daily_loads, fitness_tc=42, fatigue_tc=7, initial_fitness=0.0, initial_fatigue=0.0):
+    """
+    Calculate fitness (CTL), fatigue (ATL) and form (TSB) from daily loads (Banister, 1991).
+
+    Args:
+        daily_loads (array-like): Daily loads, one row per athlete for 2-D input
+        fitness_tc (float or array-like, optional): Fitness time constant in days. Defaults to 42.
+        fatigue_tc (float or array-like, optional): Fatigue time constant in days. Defaults to 7.
+        initial_fitness (float or array-like, optional): Fitness before the first day. Defaults to 0.
+        initial_fatigue (float or array-like, optional): Fatigue before the first day. Defaults to 0.
+
+    Returns:
+        dict: "fitness", "fatigue" and "form" arrays shaped like daily_loads. Form on a day is
+            the previous day's fitness minus fatigue, i.e. the freshness going into that day.
+    """
+    fitness = exponential_filter(daily_loads, fitness_tc, initial_fitness)
+    fatigue = exponential_filter(daily_loads, fatigue_tc, initial_fatigue)
+
+    balance = fitness - fatigue
+    form = np.empty_like(balance)
+    form[..., 0] = np.asarray(initial_fitness, dtype=float) - np.asarray(initial_fatigue, dtype=float)
+    form[..., 1:] = balance[..., :-1]
+
+    return {
+        "fitness": fitness,
+        "fatigue": fatigue,
+        "form": form
+    }
+
+
+def calculate_banister_performance(daily_loads, fitness_tc=42, fatigue_tc=7, fitness_gain=1.0,
+                                   fatigue_gain=2.0, baseline=0.0):
+    """
+    Predict performance with the Banister impulse-response model.
+
+    Performance is baseline + fitness_gain × fitness - fatigue_gain × fatigue, where fitness and
+    fatigue are the exponentially filtered loads from calculate_fitness_fatigue.
+
+    Args:
+        daily_loads (array-like): Daily loads, one row per athlete for 2-D input
+        fitness_tc (float or array-like, optional): Fitness time constant in days. Defaults to 42.
+        fatigue_tc (float or array-like, optional): Fatigue time constant in days. Defaults to 7.
+        fitness_gain (float or array-like, optional): Weight of fitness (k1). Defaults to 1.
+        fatigue_gain (float or array-like, optional): Weight of fatigue (k2). Defaults to 2.
+        baseline (float or array-like, optional): Baseline performance (p0). Defaults to 0.
+
+    Returns:
+        numpy.ndarray: Modelled performance shaped like daily_loads
+    """
+    model = calculate_fitness_fatigue(daily_loads, fitness_tc, fatigue_tc)
+
+    def per_athlete(value):
+        # Per-athlete parameters broadcast across the days axis
+        return np.asarray(value, dtype=float)[..., None] if np.ndim(value) else value
+
+    return (per_athlete(baseline) + per_athlete(fitness_gain) * model["fitness"]
+            - per_athlete(fatigue_gain) * model["fatigue"])
+
+
+def _ratio(acute, chronic):
+    """
+    Acute:chronic ratio, 0 where there is no chronic load (as calculations.calculate_acwr)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(chronic > 0, acute / chronic, np.where(np.isnan(chronic), np.nan, 0.0))
+
+
+def calculate_acwr_series(daily_loads, acute_days=7, chronic_days=28, method="rolling", coupled=True):
+    """
+    Calculate the acute:chronic workload ratio for every day of a load history.
+
+    The rolling method averages daily loads over the acute and chronic windows using cumulative
+    sums; when uncoupled, the chronic window excludes the acute days. The EWMA method uses
+    exponentially weighted averages with decay 2 / (days + 1) (Williams et al., 2017); when
+    uncoupled, each day's acute load is compared with the previous day's chronic load.
+
+    Args:
+        daily_loads (array-like): Daily loads, one row per athlete for 2-D input
+        acute_days (int, optional): Acute window in days. Defaults to 7.
+        chronic_days (int, optional): Chronic window in days, including the acute window. Defaults to 28.
+        method (str, optional): "rolling" or "ewma". Defaults to "rolling".
+        coupled (bool, optional): Whether the chronic load includes the acute window. Defaults to True.
+
+    Returns:
+        dict: "acute" and "chronic" mean daily loads and the "acwr", shaped like daily_loads.
+            Rolling values are NaN until a full chronic window is available.
+    """
+    if not 0 < acute_days < chronic_days:
+        raise ValueError("The acute window must be shorter than the chronic window")
+
+    loads = np.nan_to_num(np.asarray(daily_loads, dtype=float))
+
+    if method == "ewma":
+        acute = _recursive_filter(loads, 2.0 / (acute_days + 1))
+        chronic = _recursive_filter(loads, 2.0 / (chronic_days + 1))
+
+        if not coupled:
+            previous = np.full_like(chronic, np.nan)
+            previous[..., 1:] = chronic[..., :-1]
+            chronic = previous
+    else:
+        totals = np.concatenate([np.zeros(loads.shape[:-1] + (1,)), np.cumsum(loads, axis=-1)], axis=-1)
+
+        acute = np.full_like(loads, np.nan)
+        chronic = np.full_like(loads, np.nan)
+        acute_sum = totals[..., chronic_days:] - totals[..., chronic_days - acute_days:-acute_days]
+        chronic_sum = totals[..., chronic_days:] - totals[..., :-chronic_days]
+
+        acute[..., chronic_days - 1:] = acute_sum / acute_days
+        if coupled:
+            chronic[..., chronic_days - 1:] = chronic_sum / chronic_days
+        else:
+            chronic[..., chronic_days - 1:] = (chronic_sum - acute_sum) / (chronic_days - acute_days)
+
+    return {
+        "acute": acute,
+        "chronic": chronic,
+        "acwr": _ratio(acute, chronic)
+    }
+
+
+def acwr_state(daily_loads, acute_days=7, chronic_days=28, method="rolling", coupled=True):
+    """
+    Summarize a load history into the state needed to extend its ACWR one day at a time.
+
+    Args:
+        daily_loads (array-like): Daily loads so far, one row per athlete for 2-D input
+        acute_days (int, optional): Acute window in days. Defaults to 7.
+        chronic_days (int, optional): Chronic window in days, including the acute window. Defaults to 28.
+        method (str, optional): "rolling" or "ewma". Defaults to "rolling".
+        coupled (bool, optional): Whether the chronic load includes the acute window. Defaults to True.
+
+    Returns:
+        dict: State to pass to update_acwr
+    """
+    loads = np.nan_to_num(np.asarray(daily_loads, dtype=float))
+    days = loads.shape[-1]
+
+    state = {
+        "acute_days": acute_days,
+        "chronic_days": chronic_days,
+        "method": method,
+        "coupled": coupled,
+        "days": days
+    }
+
+    if method == "ewma":
+        series = calculate_acwr_series(loads, acute_days, chronic_days, "ewma", coupled=True)
+        empty = np.zeros(loads.shape[:-1])
+        state["acute"] = series["acute"][..., -1] if days else empty
+        state["chronic"] = series["chronic"][..., -1] if days else empty
+    else:
+        # Ring buffer of the last chronic_days loads; position is where the next load goes
+        window = np.zeros(loads.shape[:-1] + (chronic_days,))
+        recent = loads[..., -chronic_days:]
+        window[..., chronic_days - recent.shape[-1]:] = recent
+        state["window"] = np.moveaxis(window, -1, 0).copy()
+        state["position"] = 0
+        state["acute_sum"] = window[..., -acute_days:].sum(axis=-1)
+        state["chronic_sum"] = window.sum(axis=-1)
+
+    return state
+
+
+def update_acwr(state, load):
+    """
+    Add one day's load to an ACWR state in O(1) and return that day's values.
+
+    Args:
+        state (dict): State from acwr_state, updated in place
+        load (float or array-like): The new day's load, one per athlete for a roster state
+
+    Returns:
+        dict: "acute", "chronic" and "acwr" for the new day, as in calculate_acwr_series
+    """
+    load = np.nan_to_num(np.asarray(load, dtype=float))
+    acute_days = state["acute_days"]
+    chronic_days = state["chronic_days"]
+    state["days"] += 1
+
+    if state["method"] == "ewma":
+        previous_chronic = state["chronic"]
+        state["acute"] = state["acute"] + 2.0 / (acute_days + 1) * (load - state["acute"])
+        state["chronic"] = previous_chronic + 2.0 / (chronic_days + 1) * (load - previous_chronic)
+
+        acute = state["acute"]
+        if state["coupled"]:
+            chronic = state["chronic"]
+        else:
+            chronic = previous_chronic if state["days"] > 1 else np.nan
+    else:
+        window = state["window"]
+        position = state["position"]
+
+        # The oldest load leaves the chronic window, the one acute_days back leaves the acute window
+        leaving_acute = window[(position + chronic_days - acute_days) % chronic_days]
+        state["acute_sum"] = state["acute_sum"] + load - leaving_acute
+        state["chronic_sum"] = state["chronic_sum"] + load - window[position]
+        window[position] = load
+        state["position"] = (position + 1) % chronic_days
+
+        acute = state["acute_sum"] / acute_days
+        if state["coupled"]:
+            chronic = state["chronic_sum"] / chronic_days
+        else:
+            chronic = (state["chronic_sum"] - state["acute_sum"]) / (chronic_days - acute_days)
+
+        if state["days"] < chronic_days:
+            acute = np.full_like(acute, np.nan)
+            chronic = np.full_like(chronic, np.nan)
+
+    acute = np.asarray(acute, dtype=float)
+    chronic = np.broadcast_to(np.asarray(chronic, dtype=float), acute.shape)
+
+    return {
+        "acute": acute,
+        "chronic": chronic,
+        "acwr": _ratio(acute, chronic)
+    }
+
+
+def _monotony(total, std, days):
+    """
+    Foster's monotony (mean / SD, 0 when the SD is 0) and strain from window totals and SDs
+    """
+    mean = total / days
+
+    # Identical daily loads leave only rounding noise in the SD; treat it as no spread
+    varied = std > 1e-9 * np.abs(mean)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monotony = np.where(varied, mean / std, np.where(np.isnan(std), np.nan, 0.0))
+
+    return {
+        "weekly_load": total,
+        "mean": mean,
+        "std": std,
+        "monotony": monotony,
+        "strain": total * monotony
+    }
+
+
+def calculate_monotony_strain(daily_loads, days=7):
+    """
+    Calculate Foster's training monotony and strain over a rolling window for every day.
+
+    Each day uses the loads of the window ending on it, as calculations.calculate_weekly_load_stats
+    does for a single week. The moments are taken over a strided view of the windows, so flat
+    weeks give exactly zero spread however long the history is.
+
+    Args:
+        daily_loads (array-like): Daily loads (e.g. from daily_load_series), one row per athlete for 2-D input
+        days (int, optional): Window length in days. Defaults to 7.
+
+    Returns:
+        dict: "weekly_load" (window total), "mean", "std" (population), "monotony" and "strain"
+            arrays shaped like daily_loads, NaN until a full window is available
+    """
+    loads = np.nan_to_num(np.asarray(daily_loads, dtype=float))
+
+    total = np.full_like(loads, np.nan)
+    std = np.full_like(loads, np.nan)
+    if loads.shape[-1] >= days:
+        windows = np.lib.stride_tricks.sliding_window_view(loads, days, axis=-1)
+        total[..., days - 1:] = windows.sum(axis=-1)
+        std[..., days - 1:] = windows.std(axis=-1)
+
+    return _monotony(total, std, days)
+
+
+def monotony_state(daily_loads, days=7):
+    """
+    Summarize a load history into the state needed to extend monotony and strain one day at a time.
+
+    Args:
+        daily_loads (array-like): Daily loads so far, one row per athlete for 2-D input
+        days (int, optional): Window length in days. Defaults to 7.
+
+    Returns:
+        dict: State to pass to update_monotony
+    """
+    loads = np.nan_to_num(np.asarray(daily_loads, dtype=float))
+
+    # Ring buffer of the last days loads; position is where the next load goes
+    window = np.zeros(loads.shape[:-1] + (days,))
+    recent = loads[..., -days:]
+    window[..., days - recent.shape[-1]:] = recent
+
+    return {
+        "days": days,
+        "recorded": loads.shape[-1],
+        "window": np.moveaxis(window, -1, 0).copy(),
+        "position": 0
+    }
+
+
+def update_monotony(state, load):
+    """
+    Add one day's load to a monotony state and return that day's values.
+
+    The window moments are recomputed from the ring buffer of the last days loads rather than
+    updated by difference, so each update costs O(days) and rounding never accumulates.
+
+    Args:
+        state (dict): State from monotony_state, updated in place
+        load (float or array-like): The new day's load, one per athlete for a roster state
+
+    Returns:
+        dict: "weekly_load", "mean", "std", "monotony" and "strain" for the new day, as in
+            calculate_monotony_strain
+    """
+    window = state["window"]
+    window[state["position"]] = np.nan_to_num(np.asarray(load, dtype=float))
+    state["position"] = (state["position"] + 1) % state["days"]
+    state["recorded"] += 1
+
+    stats = _monotony(window.sum(axis=0), window.std(axis=0), state["days"])
+    if state["recorded"] < state["days"]:
+        stats = {name: np.full_like(values, np.nan) for name, values in stats.items()}
+
+    return stats
@@ -0,0 +1,293 @@
+"""
+Mean-maximal (best effort) curves from activity streams.
+
+Streams are 1-D arrays sampled at 1 Hz (resample irregular recordings first), so a window of
+d samples is d seconds long. Curves are arrays indexed by duration: element i holds the best
+average over i + 1 seconds, NaN where the activity is shorter than the duration.
+
+Each duration evaluated costs one O(n) pass, so evaluating all n durations would be O(n²).
+Per-second curves are therefore evaluated exactly on log-spaced durations (every second up to
+about a minute, then 2% steps), which is O(n log n) in total. In between, each duration takes the
+best of a few real windows placed against the best windows of the neighbouring exact durations,
+so every value on the curve was actually achieved: it can fall slightly short of the true best
+but never exceeds it, and best curves merged from many activities never claim more than an
+activity did. curve_exact_mask tells which durations were evaluated exactly.
+"""
+import numpy as np
+import pandas as pd
+
+# Durations (seconds) for quick summaries and charts of long activities
+STANDARD_DURATIONS = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 420, 600, 900, 1200,
+                      1800, 2400, 3600, 5400, 7200, 10800, 14400, 21600]
+
+# Relative spacing of the durations evaluated exactly for per-second curves
+CURVE_STEP = 0.02
+
+
+def curve_durations(max_duration, step=CURVE_STEP):
+    """
+    Log-spaced durations at which per-second curves are evaluated exactly.
+
+    Args:
+        max_duration (int): Longest duration in seconds, always included
+        step (float, optional): Largest relative gap between durations. Defaults to 0.02.
+
+    Returns:
+        numpy.ndarray: Increasing durations from 1 s, every second while step is under a second
+    """
+    if max_duration < 1:
+        return np.zeros(0, dtype=int)
+
+    count = int(np.ceil(np.log(max_duration) / np.log1p(step))) + 1
+    return np.unique(np.round(np.geomspace(1, max_duration, count)).astype(int))
+
+
+def calculate_mean_max(values, durations=None):
+    """
+    Calculate the best average of a stream for each duration using prefix sums.
+
+    Every window sum is a difference of two prefix sums, so each duration costs one vectorized
+    O(n) pass over the stream and the total cost is O(n × len(durations)).
+
+    Args:
+        values (array-like): Samples at 1 Hz (power, speed, heart rate); missing samples count as 0
+        durations (array-like, optional): Durations in seconds. Defaults to the log-spaced
+            curve_durations up to the length of the stream.
+
+    Returns:
+        dict: "durations", the best "values" and the "start" sample index of each best window
+            (NaN / -1 for durations longer than the stream)
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    n = len(values)
+
+    if durations is None:
+        durations = curve_durations(n)
+    durations = np.asarray(durations, dtype=int)
+
+    prefix = np.concatenate([[0.0], np.cumsum(values)])
+    best = np.full(len(durations), np.nan)
+    start = np.full(len(durations), -1)
+
+    for i, duration in enumerate(durations):
+        if 0 < duration <= n:
+            window_sums = prefix[duration:] - prefix[:-duration]
+            start[i] = int(np.argmax(window_sums))
+            best[i] = window_sums[start[i]] / duration
+
+    return {
+        "durations": durations,
+        "values": best,
+        "start": start
+    }
+
+
+def mean_max_curve(values, max_duration=None, step=CURVE_STEP):
+    """
+    Mean-maximal curve of a stream on the per-second duration grid.
+
+    The curve is evaluated exactly at curve_durations. Each duration in between takes the best
+    of the windows that start or end with the best windows of the neighbouring exact durations,
+    a lower bound of the true value that some window actually achieved; with step=0 every
+    duration is evaluated, which is O(n²).
+
+    Args:
+        values (array-like): Samples at 1 Hz
+        max_duration (int, optional): Length of the curve in seconds. Defaults to the stream length.
+        step (float, optional): Largest relative gap between exactly evaluated durations.
+            Defaults to 0.02.
+
+    Returns:
+        numpy.ndarray: Best average for every duration from 1 s to max_duration
+    """
+    n = len(values)
+    max_duration = n if max_duration is None else max_duration
+    grid = np.arange(1, max_duration + 1)
+    longest = min(max_duration, n)
+
+    if step <= 0 or longest < 1:
+        return calculate_mean_max(values, grid)["values"]
+
+    durations = curve_durations(longest, step)
+    starts = calculate_mean_max(values, durations)["start"]
+
+    # Neighbouring exact durations of every duration up to the stream length
+    within = grid[:longest]
+    upper = np.searchsorted(durations, within)
+    lower = np.where(durations[upper] == within, upper, upper - 1)
+
+    # Windows aligned with the start or the end of either neighbour's best window
+    candidates = np.stack([
+        starts[lower], starts[lower] + durations[lower] - within,
+        starts[upper], starts[upper] + durations[upper] - within
+    ])
+    candidates = np.clip(candidates, 0, n - within)
+
+    prefix = np.concatenate([[0.0], np.cumsum(np.nan_to_num(np.asarray(values, dtype=float)))])
+    totals = prefix[candidates + within] - prefix[candidates]
+
+    curve = np.full(max_duration, np.nan)
+    curve[:longest] = totals.max(axis=0) / within
+
+    return curve
+
+
+def curve_exact_mask(length, max_duration=None, step=CURVE_STEP):
+    """
+    Which durations of a mean_max_curve were evaluated exactly rather than bounded from below.
+
+    Args:
+        length (int): Number of samples in the stream
+        max_duration (int, optional): Length of the curve in seconds. Defaults to the stream length.
+        step (float, optional): Step passed to mean_max_curve. Defaults to 0.02.
+
+    Returns:
+        numpy.ndarray: Boolean mask for every duration from 1 s to max_duration, False beyond the stream
+    """
+    max_duration = length if max_duration is None else max_duration
+    longest = min(max_duration, length)
+
+    exact = np.zeros(max_duration, dtype=bool)
+    if step <= 0:
+        exact[:longest] = True
+    else:
+        exact[curve_durations(longest, step) - 1] = True
+
+    return exact
+
+
+def mean_max_pace_curve(speed, max_duration=None, step=CURVE_STEP):
+    """
+    Best pace curve from a speed stream.
+
+    Args:
+        speed (array-like): Speed samples in meters per second at 1 Hz
+        max_duration (int, optional): Length of the curve in seconds. Defaults to the stream length.
+        step (float, optional): Largest relative gap between exactly evaluated durations.
+            Defaults to 0.02.
+
+    Returns:
+        numpy.ndarray: Fastest average pace in minutes per kilometer for every duration
+    """
+    best_speed = mean_max_curve(speed, max_duration, step)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(best_speed > 0, (1000 / 60) / best_speed, np.nan)
+
+
+def _fit_length(curve, length):
+    """
+    Pad a curve with NaN or cut it to the given number of durations
+    """
+    curve = np.asarray(curve, dtype=float)[:length]
+    return np.concatenate([curve, np.full(length - len(curve), np.nan)])
+
+
+def merge_best_curves(curves, max_duration=None):
+    """
+    Combine mean-maximal curves into one best curve.
+
+    Args:
+        curves (list): Curves on the per-second duration grid, possibly of different lengths
+        max_duration (int, optional): Length of the result. Defaults to the longest curve.
+
+    Returns:
+        numpy.ndarray: Best value for every duration across all curves
+    """
+    if max_duration is None:
+        max_duration = max((len(curve) for curve in curves), default=0)
+
+    if not curves:
+        return np.full(max_duration, np.nan)
+
+    # fmax ignores NaN, so durations missing from some curves take the best of the others
+    return np.fmax.reduce([_fit_length(curve, max_duration) for curve in curves], axis=0)
+
+
+def best_curve_state(max_duration, window_days=90):
+    """
+    Create the state for tracking all-time and rolling best curves as activities arrive.
+
+    Args:
+        max_duration (int): Longest duration tracked, in seconds
+        window_days (int, optional): Length of the rolling window in days. Defaults to 90.
+
+    Returns:
+        dict: State to pass to update_best_curves
+    """
+    return {
+        "max_duration": max_duration,
+        "window_days": window_days,
+        "all_time": np.full(max_duration, np.nan),
+        "all_time_exact": np.zeros(max_duration, dtype=bool),
+        "daily": {},
+        "latest": None
+    }
+
+
+def _merge_flagged(best, best_exact, curve, exact):
+    """Element-wise maximum of two curves, keeping the exact flag of whichever value wins."""
+    take_new = (curve > best) | (np.isnan(best) & ~np.isnan(curve))
+
+    merged = np.where(take_new, curve, best)
+    merged_exact = np.where(take_new, exact, best_exact) | ((curve == best) & exact)
+
+    return merged, merged_exact & ~np.isnan(merged)
+
+
+def update_best_curves(state, date, curve, exact=None):
+    """
+    Add one activity's mean-maximal curve to the tracked best curves.
+
+    The all-time curve is updated in place with an element-wise maximum. Per-day best curves are
+    kept for the rolling window only, so the rolling curve is the maximum of at most window_days
+    curves regardless of how long the history is. Every value kept comes from an activity's
+    curve, so as long as those are achieved values (as mean_max_curve returns) the bests never
+    exceed what an activity achieved; the exact flags tell which of them are the true best of the
+    activity they came from rather than a lower bound of it.
+
+    Args:
+        state (dict): State from best_curve_state, updated in place
+        date (date-like): Date of the activity
+        curve (array-like): The activity's mean-maximal curve on the per-second duration grid
+        exact (array-like, optional): Which durations of the curve were evaluated exactly, as from
+            curve_exact_mask. Defaults to all durations the curve covers.
+
+    Returns:
+        dict: "all_time" and "rolling" best curves, with "all_time_exact" and "rolling_exact" flags
+    """
+    day = pd.Timestamp(date).normalize()
+    max_duration = state["max_duration"]
+    curve = _fit_length(curve, max_duration)
+
+    if exact is None:
+        exact = ~np.isnan(curve)
+    else:
+        exact = _fit_length(np.asarray(exact, dtype=float), max_duration) == 1
+
+    state["all_time"], state["all_time_exact"] = _merge_flagged(
+        state["all_time"], state["all_time_exact"], curve, exact
+    )
+
+    daily = state["daily"]
+    daily[day] = _merge_flagged(*daily[day], curve, exact) if day in daily else (curve, exact)
+
+    if state["latest"] is None or day > state["latest"]:
+        state["latest"] = day
+
+    # Drop days that have left the rolling window
+    cutoff = state["latest"] - pd.Timedelta(days=state["window_days"] - 1)
+    for old_day in [d for d in daily if d < cutoff]:
+        del daily[old_day]
+
+    rolling = np.full(max_duration, np.nan)
+    rolling_exact = np.zeros(max_duration, dtype=bool)
+    for day_curve, day_exact in daily.values():
+        rolling, rolling_exact = _merge_flagged(rolling, rolling_exact, day_curve, day_exact)
+
+    return {
+        "all_time": state["all_time"],
+        "all_time_exact": state["all_time_exact"],
+        "rolling": rolling,
+        "rolling_exact": rolling_exact
+    }
@@ -0,0 +1,308 @@
+"""
+Longitudinal recovery markers over daily readings (HRV, resting heart rate).
+
+Readings are daily values with days on the last axis, so a 1-D array is one athlete's history
+and a 2-D array is a roster of athletes × days. Unlike training loads, a missing reading (NaN)
+is not a zero: rolling statistics are taken over the readings present in each window.
+"""
+import numpy as np
+
+# Short and long rolling windows for the HRV baseline (Plews et al., 2013)
+HRV_SHORT_DAYS = 7
+HRV_LONG_DAYS = 60
+
+# Smallest worthwhile change as a fraction of the long-term standard deviation
+SWC_FACTOR = 0.5
+
+# Daily readings further than this many long-term standard deviations from baseline are flagged
+NORMAL_RANGE_SD = 1.0
+
+
+def _offset(values):
+    """
+    Mean reading of each athlete (0 without readings), used to center the sums of squares
+    """
+    present = ~np.isnan(values)
+    count = present.sum(axis=-1)
+    total = np.where(present, values, 0.0).sum(axis=-1)
+    return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+
+def _window_sums(values, window):
+    """
+    Count, sum and sum of squares of the readings in the trailing window ending on each day
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    def trailing(series):
+        totals = np.cumsum(series, axis=-1)
+        totals[..., window:] = totals[..., window:] - totals[..., :-window]
+        return totals
+
+    return trailing(present.astype(float)), trailing(filled), trailing(filled ** 2)
+
+
+def _moments(count, total, squares, min_readings):
+    """
+    Mean and (population) standard deviation from window sums, NaN with too few readings
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(count >= min_readings, total / count, np.nan)
+        variance = np.where(count >= min_readings, squares / count - mean ** 2, np.nan)
+
+    return mean, np.sqrt(np.clip(variance, 0, None))
+
+
+def _hrv_stats(ln_rmssd, short_mean, short_sd, long_mean, long_sd, swc_factor, normal_range_sd):
+    """
+    Derive SWC bands, CV and flags from the short and long rolling moments
+    """
+    swc = swc_factor * long_sd
+    swc_lower = long_mean - swc
+    swc_upper = long_mean + swc
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(short_mean > 0, 100 * short_sd / short_mean, np.nan)
+
+    def flag(values, lower, upper):
+        # -1 below, +1 above, 0 inside the band, NaN when either side is unknown
+        flags = np.where(values < lower, -1.0, np.where(values > upper, 1.0, 0.0))
+        return np.where(np.isnan(values) | np.isnan(lower), np.nan, flags)
+
+    return {
+        "ln_rmssd": ln_rmssd,
+        "baseline_short": short_mean,
+        "baseline_long": long_mean,
+        "sd_long": long_sd,
+        "swc_lower": swc_lower,
+        "swc_upper": swc_upper,
+        "cv": cv,
+        "trend_flag": flag(short_mean, swc_lower, swc_upper),
+        "reading_flag": flag(ln_rmssd, long_mean - normal_range_sd * long_sd,
+                             long_mean + normal_range_sd * long_sd)
+    }
+
+
+def to_ln_rmssd(rmssd):
+    """
+    Natural log of RMSSD readings, NaN for missing or non-positive readings.
+
+    Args:
+        rmssd (array-like): RMSSD in milliseconds
+
+    Returns:
+        numpy.ndarray: ln-RMSSD
+    """
+    rmssd = np.asarray(rmssd, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rmssd > 0, np.log(rmssd), np.nan)
+
+
+def calculate_hrv_baseline(ln_rmssd, short_days=HRV_SHORT_DAYS, long_days=HRV_LONG_DAYS, min_readings=3,
+                           swc_factor=SWC_FACTOR, normal_range_sd=NORMAL_RANGE_SD):
+    """
+    Rolling ln-RMSSD baselines, smallest-worthwhile-change band, CV and flags for every day.
+
+    The short (7-day) baseline is compared with the SWC band, the long (60-day) mean ± 0.5 × its
+    standard deviation, to detect meaningful trends; each daily reading is compared with the
+    long mean ± 1 standard deviation to flag unusual mornings. Window sums come from cumulative
+    sums, so every day costs O(1) whatever the window lengths.
+
+    Args:
+        ln_rmssd (array-like): Daily ln-RMSSD (see to_ln_rmssd), NaN on days without a reading
+        short_days (int, optional): Short baseline window in days. Defaults to 7.
+        long_days (int, optional): Long baseline window in days. Defaults to 60.
+        min_readings (int, optional): Fewest readings for a window to count. Defaults to 3.
+        swc_factor (float, optional): SWC as a fraction of the long standard deviation. Defaults to 0.5.
+        normal_range_sd (float, optional): Half-width of the normal range for daily readings in
+            long standard deviations. Defaults to 1.0.
+
+    Returns:
+        dict: Arrays shaped like ln_rmssd: "ln_rmssd", "baseline_short", "baseline_long",
+            "sd_long", "swc_lower", "swc_upper", "cv" (% of the short window), and "trend_flag"
+            (short baseline vs the SWC band) and "reading_flag" (daily reading vs the normal
+            range) with -1 below, 0 inside and +1 above
+    """
+    ln_rmssd = np.asarray(ln_rmssd, dtype=float)
+
+    # Center on each athlete's mean so the sums of squares keep their precision
+    offset = _offset(ln_rmssd)[..., None]
+    centered = ln_rmssd - offset
+
+    short_mean, short_sd = _moments(*_window_sums(centered, short_days), min_readings)
+    long_mean, long_sd = _moments(*_window_sums(centered, long_days), min_readings)
+
+    return _hrv_stats(ln_rmssd, short_mean + offset, short_sd, long_mean + offset, long_sd,
+                      swc_factor, normal_range_sd)
+
+
+def hrv_state(ln_rmssd, short_days=HRV_SHORT_DAYS, long_days=HRV_LONG_DAYS, min_readings=3,
+              swc_factor=SWC_FACTOR, normal_range_sd=NORMAL_RANGE_SD):
+    """
+    Summarize an HRV history into the state needed to extend its baseline one day at a time.
+
+    Args:
+        ln_rmssd (array-like): Daily ln-RMSSD so far, one row per athlete for 2-D input
+        short_days (int, optional): Short baseline window in days. Defaults to 7.
+        long_days (int, optional): Long baseline window in days. Defaults to 60.
+        min_readings (int, optional): Fewest readings for a window to count. Defaults to 3.
+        swc_factor (float, optional): SWC as a fraction of the long standard deviation. Defaults to 0.5.
+        normal_range_sd (float, optional): Half-width of the normal range for daily readings in
+            long standard deviations. Defaults to 1.0.
+
+    Returns:
+        dict: State to pass to update_hrv
+    """
+    if not 0 < short_days <= long_days:
+        raise ValueError("The short window must not be longer than the long window")
+
+    ln_rmssd = np.asarray(ln_rmssd, dtype=float)
+    athletes = ln_rmssd.shape[:-1]
+
+    offset = _offset(ln_rmssd)
+
+    # Ring buffer of the last long_days centered readings; position is where the next one goes
+    window = np.full(athletes + (long_days,), np.nan)
+    recent = ln_rmssd[..., -long_days:]
+    window[..., long_days - recent.shape[-1]:] = recent - offset[..., None]
+    window = np.moveaxis(window, -1, 0).copy()
+
+    state = {
+        "short_days": short_days,
+        "long_days": long_days,
+        "min_readings": min_readings,
+        "swc_factor": swc_factor,
+        "normal_range_sd": normal_range_sd,
+        "offset": offset,
+        "window": window,
+        "position": 0
+    }
+
+    for name, days in [("short", short_days), ("long", long_days)]:
+        readings = window[long_days - days:]
+        state[f"{name}_count"] = (~np.isnan(readings)).sum(axis=0).astype(float)
+        state[f"{name}_sum"] = np.nansum(readings, axis=0)
+        state[f"{name}_squares"] = np.nansum(readings ** 2, axis=0)
+
+    return state
+
+
+def update_hrv(state, ln_rmssd):
+    """
+    Add one day's reading to an HRV state in O(1) and return that day's values.
+
+    Args:
+        state (dict): State from hrv_state, updated in place
+        ln_rmssd (float or array-like): The new day's ln-RMSSD (NaN if not measured), one per
+            athlete for a roster state
+
+    Returns:
+        dict: The new day's values, as in calculate_hrv_baseline
+    """
+    reading = np.asarray(ln_rmssd, dtype=float)
+    centered = reading - state["offset"]
+    window = state["window"]
+    position = state["position"]
+    long_days = state["long_days"]
+
+    def contribution(values):
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        return present.astype(float), filled, filled ** 2
+
+    # The oldest reading leaves the long window, the one short_days back leaves the short window
+    leaving = {
+        "short": window[(position + long_days - state["short_days"]) % long_days],
+        "long": window[position]
+    }
+    entering = contribution(centered)
+
+    for name in ["short", "long"]:
+        for key, added, removed in zip(["count", "sum", "squares"], entering, contribution(leaving[name])):
+            state[f"{name}_{key}"] = state[f"{name}_{key}"] + added - removed
+
+    window[position] = centered
+    state["position"] = (position + 1) % long_days
+
+    short_mean, short_sd = _moments(state["short_count"], state["short_sum"], state["short_squares"],
+                                    state["min_readings"])
+    long_mean, long_sd = _moments(state["long_count"], state["long_sum"], state["long_squares"],
+                                  state["min_readings"])
+
+    return _hrv_stats(reading, short_mean + state["offset"], short_sd, long_mean + state["offset"],
+                      long_sd, state["swc_factor"], state["normal_range_sd"])
+
+
+def calculate_rhr_trend(rhr, window=7, min_readings=None):
+    """
+    Rolling least-squares trend of resting heart rate over a trailing window for every day.
+
+    Each window's regression comes from differences of cumulative sums of 1, t, t², y, t·y and y²
+    (t the day index), so a window costs O(1) whatever its length and a whole squad is scored in
+    one call. Days are numbered 1..window within each window, as in
+    calculations.calculate_rhr_trend_stats.
+
+    Args:
+        rhr (array-like): Daily resting heart rate, NaN on days without a reading; one row per
+            athlete for 2-D input
+        window (int, optional): Window length in days, e.g. 7, 14 or 28. Defaults to 7.
+        min_readings (int, optional): Fewest readings for a window to count. Defaults to the
+            whole window.
+
+    Returns:
+        dict: Arrays shaped like rhr for the window ending on each day: "mean", "slope" (bpm/day),
+            "intercept", "residual_sd" (bpm, n - 2 degrees of freedom) and "day_to_day" (mean
+            absolute change between consecutive days)
+    """
+    rhr = np.asarray(rhr, dtype=float)
+    min_readings = window if min_readings is None else max(min_readings, 2)
+
+    # Day indices are integers, so their window sums are exact; readings are centered for precision
+    offset = _offset(rhr)[..., None]
+    days = np.arange(rhr.shape[-1], dtype=float)
+    present = ~np.isnan(rhr)
+    y = np.where(present, rhr - offset, 0.0)
+    t = np.where(present, days, 0.0)
+
+    def trailing(series):
+        totals = np.cumsum(series, axis=-1)
+        totals[..., window:] = totals[..., window:] - totals[..., :-window]
+        return totals
+
+    n = trailing(present.astype(float))
+    st, sy = trailing(t), trailing(y)
+    stt, sty, syy = trailing(t * t), trailing(t * y), trailing(y * y)
+
+    # Consecutive-day changes whose both days fall inside the window
+    steps = np.abs(np.diff(rhr, axis=-1))
+    pair = ~np.isnan(steps)
+    pair_count = np.zeros_like(n)
+    pair_total = np.zeros_like(n)
+    pair_count[..., 1:] = np.cumsum(pair, axis=-1)
+    pair_total[..., 1:] = np.cumsum(np.where(pair, steps, 0.0), axis=-1)
+    if window > 1:
+        pair_count[..., window:] -= pair_count[..., 1:-window + 1]
+        pair_total[..., window:] -= pair_total[..., 1:-window + 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        enough = n >= min_readings
+        t_mean = st / n
+        y_mean = sy / n
+        t_var = stt - n * t_mean ** 2
+        ty_cov = sty - n * t_mean * y_mean
+
+        slope = np.where(enough & (t_var > 0), ty_cov / t_var, np.nan)
+        first_day = days - window + 1
+        intercept = y_mean - slope * (t_mean - first_day + 1)
+        residual = syy - n * y_mean ** 2 - slope * ty_cov
+        residual_sd = np.where(n > 2, np.sqrt(np.clip(residual, 0, None) / (n - 2)), np.nan)
+        day_to_day = np.where(pair_count > 0, pair_total / pair_count, 0.0)
+
+    return {
+        "mean": np.where(enough, y_mean + offset, np.nan),
+        "slope": slope,
+        "intercept": np.where(enough, intercept + offset, np.nan),
+        "residual_sd": np.where(enough, residual_sd, np.nan),
+        "day_to_day": np.where(enough, day_to_day, np.nan)
+    }
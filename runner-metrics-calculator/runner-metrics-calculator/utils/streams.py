@@ -0,0 +1,332 @@
+"""
+Per-sample metrics computed from activity streams (heart rate, speed, grade, power, ...).
+
+Streams are 1-D arrays with one value per recorded sample. Timestamps may be datetime64 values
+or seconds, and sampling may be irregular: every sample is weighted by the time until the next
+sample, with gaps longer than max_gap_s (pauses, signal loss) counted as one typical interval.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.vectorized import calculate_power_components
+
+# Edwards TRIMP zones as fractions of maximum heart rate, weighted 1-5
+EDWARDS_ZONE_EDGES = [0.5, 0.6, 0.7, 0.8, 0.9]
+
+DEFAULT_MAX_GAP_S = 30
+
+# Rolling window for Normalized Power and Normalized Graded Pace
+NORMALIZED_WINDOW_S = 30
+
+# Minetti et al. (2002) energy cost of running in J/kg/m as a polynomial of grade (fraction),
+# highest power first; the fit is valid between -45% and +45%
+MINETTI_COST_COEFFICIENTS = [155.4, -30.4, -43.3, 46.3, 19.5, 3.6]
+MINETTI_MAX_GRADE = 0.45
+
+
+def to_seconds(timestamps):
+    """
+    Convert stream timestamps to float seconds.
+
+    Args:
+        timestamps (array-like): datetime64 values or seconds
+
+    Returns:
+        numpy.ndarray: Seconds (relative to the epoch for datetime64 input)
+    """
+    timestamps = np.asarray(timestamps)
+
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        seconds = timestamps.astype("datetime64[ns]").astype(np.int64) / 1e9
+        seconds[np.isnat(timestamps)] = np.nan
+        return seconds
+
+    return timestamps.astype(float)
+
+
+def sample_durations(timestamps, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Time represented by each sample of a stream.
+
+    Args:
+        timestamps (array-like): Sample timestamps, datetime64 or seconds, in recording order
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        numpy.ndarray: Seconds attributed to each sample
+    """
+    seconds = to_seconds(timestamps)
+    if len(seconds) == 0:
+        return np.zeros(0)
+
+    steps = np.diff(seconds)
+    valid = np.isfinite(steps) & (steps > 0)
+    typical = float(np.median(steps[valid])) if valid.any() else 1.0
+
+    # Each sample lasts until the next one; the last sample and gaps get the typical interval
+    durations = np.append(steps, typical)
+    durations[~np.isfinite(durations) | (durations < 0) | (durations > max_gap_s)] = typical
+
+    return durations
+
+
+def calculate_stream_banister_trimp(heart_rate, timestamps, resting_hr, max_hr, gender="Male",
+                                    max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Calculate Banister TRIMP by integrating heart rate sample by sample.
+
+    Args:
+        heart_rate (array-like): Heart rate samples in beats per minute (NaN where missing)
+        timestamps (array-like): Sample timestamps, datetime64 or seconds
+        resting_hr (float): Resting heart rate
+        max_hr (float): Maximum heart rate
+        gender (str, optional): "Male" or "Female". Defaults to "Male".
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        float: TRIMP in arbitrary units
+    """
+    heart_rate = np.asarray(heart_rate, dtype=float)
+    minutes = sample_durations(timestamps, max_gap_s) / 60
+
+    hr_ratio = np.clip((heart_rate - resting_hr) / (max_hr - resting_hr), 0, 1)
+
+    if gender == "Male":
+        intensity_factor = 0.64 * np.exp(1.92 * hr_ratio)
+    else:  # Female
+        intensity_factor = 0.86 * np.exp(1.67 * hr_ratio)
+
+    return float(np.nansum(minutes * hr_ratio * intensity_factor))
+
+
+def calculate_time_in_zones(values, timestamps, zones, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Seconds spent in each zone, bucketing samples with a binary search against the zone edges.
+
+    Zones are taken in order of their lower bounds; a sample belongs to the highest zone whose
+    lower bound it reaches, so values above the top zone count towards the top zone.
+
+    Args:
+        values (array-like): Samples (heart rate, power, speed, ...), NaN where missing
+        timestamps (array-like): Sample timestamps, datetime64 or seconds
+        zones (dict): Zone names mapped to (lower, upper) bounds, e.g. from
+            calculations.calculate_hr_zones_karvonen
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        dict: Seconds per zone name, plus "Below Zones" for samples under the lowest zone
+    """
+    values = np.asarray(values, dtype=float)
+    durations = sample_durations(timestamps, max_gap_s)
+
+    # An open (None) lower bound takes everything below the next zone
+    lower_bounds = {name: -np.inf if bounds[0] is None else float(bounds[0]) for name, bounds in zones.items()}
+    names = sorted(zones, key=lower_bounds.get)
+    lowers = np.array([lower_bounds[name] for name in names])
+
+    recorded = ~np.isnan(values)
+    bucket = np.searchsorted(lowers, values[recorded], side="right")
+    seconds = np.bincount(bucket, weights=durations[recorded], minlength=len(names) + 1)
+
+    result = {"Below Zones": float(seconds[0])}
+    for i, name in enumerate(names, start=1):
+        result[name] = float(seconds[i])
+
+    return result
+
+
+def calculate_stream_edwards_trimp(heart_rate, timestamps, max_hr, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Calculate Edwards TRIMP from heart rate samples.
+
+    Args:
+        heart_rate (array-like): Heart rate samples in beats per minute (NaN where missing)
+        timestamps (array-like): Sample timestamps, datetime64 or seconds
+        max_hr (float): Maximum heart rate
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        dict: "trimp" and "zone_minutes", the minutes in each of the five zones
+    """
+    zones = {
+        f"Zone {i}": (max_hr * edge, None) for i, edge in enumerate(EDWARDS_ZONE_EDGES, start=1)
+    }
+    seconds = calculate_time_in_zones(heart_rate, timestamps, zones, max_gap_s)
+    zone_minutes = [seconds[f"Zone {i}"] / 60 for i in range(1, len(EDWARDS_ZONE_EDGES) + 1)]
+
+    return {
+        "trimp": sum(minutes * weight for weight, minutes in enumerate(zone_minutes, start=1)),
+        "zone_minutes": zone_minutes
+    }
+
+
+def calculate_grade(elevation, distance, window=15):
+    """
+    Smoothed grade from elevation and cumulative distance streams.
+
+    The grade at each sample is the elevation change over the distance covered across a centered
+    window, which filters the GPS and barometer noise that a sample-to-sample slope would amplify.
+
+    Args:
+        elevation (array-like): Elevation in meters
+        distance (array-like): Cumulative distance in meters
+        window (int, optional): Window length in samples. Defaults to 15.
+
+    Returns:
+        numpy.ndarray: Grade in percent (0 where the runner didn't move)
+    """
+    elevation = np.asarray(elevation, dtype=float)
+    distance = np.asarray(distance, dtype=float)
+    n = len(elevation)
+
+    half = window // 2
+    index = np.arange(n)
+    ahead = np.minimum(index + half, n - 1)
+    behind = np.maximum(index - half, 0)
+
+    rise = elevation[ahead] - elevation[behind]
+    run = distance[ahead] - distance[behind]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grade = np.where(run > 0, 100 * rise / run, 0.0)
+
+    return np.nan_to_num(grade)
+
+
+def calculate_power_stream(weight, height, speed_ms, grade_pct=0, wind_speed_kph=0, altitude_m=0,
+                           temperature_c=20, terrain_coef=1.0, footwear_weight_g=250, timestamps=None):
+    """
+    Running power for every sample of an activity, with its component breakdown.
+
+    All streams are evaluated in one vectorized pass of the same model as
+    calculations.calculate_power_components; scalars apply to every sample.
+
+    Args:
+        weight (float): Runner's weight in kilograms
+        height (float): Runner's height in centimeters
+        speed_ms (array-like): Speed in meters per second
+        grade_pct (array-like, optional): Grade in percent, e.g. from calculate_grade. Defaults to 0.
+        wind_speed_kph (array-like, optional): Headwind component in km/h (negative=tailwind). Defaults to 0.
+        altitude_m (array-like, optional): Altitude in meters for air density, e.g. the elevation
+            stream. Defaults to 0.
+        temperature_c (array-like, optional): Temperature in Celsius. Defaults to 20.
+        terrain_coef (array-like, optional): Terrain coefficient (1.0=track/road). Defaults to 1.0.
+        footwear_weight_g (float, optional): Shoe weight in grams. Defaults to 250.
+        timestamps (array-like, optional): Sample timestamps, datetime64 or seconds, to weight the
+            averages. Defaults to one sample per second.
+
+    Returns:
+        dict: Per-sample "gravity", "air", "rolling" and "total" power arrays, "average" power per
+            component (time-weighted) and the total "work_kj"
+    """
+    speed_ms = np.nan_to_num(np.asarray(speed_ms, dtype=float))
+    components = calculate_power_components(
+        weight, height, speed_ms * 3.6, np.nan_to_num(np.asarray(grade_pct, dtype=float)),
+        wind_speed_kph, terrain_coef, altitude_m, temperature_c, footwear_weight_g
+    )
+    components = {name: np.broadcast_to(values, speed_ms.shape) for name, values in components.items()}
+
+    dt = np.ones(len(speed_ms)) if timestamps is None else sample_durations(timestamps)
+    elapsed = dt.sum()
+
+    components["average"] = {
+        name: float((components[name] * dt).sum() / elapsed) if elapsed > 0 else 0.0
+        for name in ["gravity", "air", "rolling", "total"]
+    }
+    components["work_kj"] = float((components["total"] * dt).sum() / 1000)
+
+    return components
+
+
+def grade_cost_factor(grade_pct):
+    """
+    Energy cost of running on a grade relative to flat ground (Minetti et al., 2002).
+
+    Args:
+        grade_pct (array-like): Grade in percent, clipped to the ±45% range of the model
+
+    Returns:
+        numpy.ndarray: Cost multiplier, 1 on the flat, above 1 uphill and on steep descents
+    """
+    grade = np.clip(np.nan_to_num(np.asarray(grade_pct, dtype=float)) / 100,
+                    -MINETTI_MAX_GRADE, MINETTI_MAX_GRADE)
+    return np.polyval(MINETTI_COST_COEFFICIENTS, grade) / MINETTI_COST_COEFFICIENTS[-1]
+
+
+def calculate_grade_adjusted_speed(speed_ms, grade_pct):
+    """
+    Flat-ground speed that would cost the same energy as each sample's speed on its grade.
+
+    Args:
+        speed_ms (array-like): Speed in meters per second
+        grade_pct (array-like): Grade in percent, e.g. from calculate_grade
+
+    Returns:
+        numpy.ndarray: Grade-adjusted speed in meters per second
+    """
+    return np.asarray(speed_ms, dtype=float) * grade_cost_factor(grade_pct)
+
+
+def calculate_normalized(values, timestamps=None, window_s=NORMALIZED_WINDOW_S, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Fourth-power mean of a stream's 30 s rolling average, as in Normalized Power.
+
+    Args:
+        values (array-like): Samples (power, grade-adjusted speed, ...), NaN where missing
+        timestamps (array-like, optional): Sample timestamps, datetime64 or seconds, for irregular
+            recordings. Defaults to one sample per second.
+        window_s (float, optional): Rolling window in seconds. Defaults to 30.
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        float: Normalized value (NaN when the stream has no samples)
+    """
+    values = pd.Series(np.asarray(values, dtype=float))
+
+    if timestamps is None:
+        dt = np.ones(len(values))
+        rolling = values.rolling(int(window_s), min_periods=1).mean()
+    else:
+        dt = sample_durations(timestamps, max_gap_s)
+        values.index = pd.to_timedelta(to_seconds(timestamps) - np.nanmin(to_seconds(timestamps)), unit="s")
+        rolling = values.rolling(pd.Timedelta(seconds=window_s), min_periods=1).mean()
+
+    rolling = rolling.to_numpy()
+    recorded = ~np.isnan(rolling)
+    if not recorded.any():
+        return float("nan")
+
+    return float(np.average(rolling[recorded] ** 4, weights=dt[recorded]) ** 0.25)
+
+
+def calculate_normalized_graded_pace(speed_ms, grade_pct, timestamps=None, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Grade-adjusted pace and Normalized Graded Pace (NGP) of an activity.
+
+    Args:
+        speed_ms (array-like): Speed in meters per second
+        grade_pct (array-like): Grade in percent, e.g. from calculate_grade
+        timestamps (array-like, optional): Sample timestamps, datetime64 or seconds. Defaults to
+            one sample per second.
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        dict: Per-sample "grade_adjusted_speed" (m/s), the average grade-adjusted pace "gap" and
+            "ngp" in minutes per kilometer, and the normalized graded speed "ngs" (m/s)
+    """
+    adjusted = calculate_grade_adjusted_speed(speed_ms, grade_pct)
+    dt = np.ones(len(adjusted)) if timestamps is None else sample_durations(timestamps, max_gap_s)
+
+    recorded = ~np.isnan(adjusted)
+    average = float(np.average(adjusted[recorded], weights=dt[recorded])) if recorded.any() else float("nan")
+    ngs = calculate_normalized(adjusted, timestamps, max_gap_s=max_gap_s)
+
+    def to_pace(speed):
+        return (1000 / 60) / speed if speed > 0 else float("nan")
+
+    return {
+        "grade_adjusted_speed": adjusted,
+        "gap": to_pace(average),
+        "ngp": to_pace(ngs),
+        "ngs": ngs
+    }
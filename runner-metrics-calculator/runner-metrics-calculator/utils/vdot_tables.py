@@ -0,0 +1,165 @@
+"""
+Precomputed VDOT tables for instant race time, training pace and VDOT lookups.
+
+The tables cover VDOT 20-90 in steps of 0.1 for the standard race distances and the
+Daniels training paces. They are built once at import with the array solvers in
+utils.vectorized and queried by linear interpolation: VDOT -> time/pace lookups index the
+uniform grid directly and time -> VDOT lookups binary-search the monotonic time column.
+Queries outside the grid, or for non-standard distances, fall back to the exact formulas.
+"""
+import numpy as np
+
+from utils.vectorized import (
+    calculate_training_paces_from_vdot,
+    calculate_vdot_from_performance,
+    solve_daniels_race_time
+)
+
+VDOT_MIN = 20.0
+VDOT_MAX = 90.0
+VDOT_STEP = 0.1
+
+# Standard race distances in kilometers, matching the Race Time Predictor options
+RACE_DISTANCES = {
+    "1 Mile": 1.60934,
+    "5K": 5,
+    "10K": 10,
+    "15K": 15,
+    "10 Mile": 16.0934,
+    "Half Marathon": 21.0975,
+    "30K": 30,
+    "Marathon": 42.195
+}
+
+VDOT_GRID = np.round(np.arange(VDOT_MIN, VDOT_MAX + VDOT_STEP / 2, VDOT_STEP), 1)
+
+_DISTANCE_KM = np.array(list(RACE_DISTANCES.values()), dtype=float)
+
+# Race times in seconds, shape (len(VDOT_GRID), len(RACE_DISTANCES))
+RACE_TIME_TABLE = solve_daniels_race_time(VDOT_GRID[:, None], _DISTANCE_KM[None, :], tol=1e-6)["time"]
+
+# Training paces in minutes per kilometer, one column per pace type
+TRAINING_PACE_TABLE = calculate_training_paces_from_vdot(VDOT_GRID)
+
+
+def _grid_position(vdot):
+    """
+    Split VDOT values into grid row indices and interpolation weights
+    """
+    position = (vdot - VDOT_MIN) / VDOT_STEP
+    index = np.clip(np.floor(position).astype(int), 0, len(VDOT_GRID) - 2)
+    return index, position - index
+
+
+def _interpolate(column, vdot):
+    """
+    Linearly interpolate a table column at VDOT values inside the grid
+    """
+    index, weight = _grid_position(vdot)
+    return column[index] + (column[index + 1] - column[index]) * weight
+
+
+def _distance_column(distance_km):
+    """
+    Column index of a standard race distance, or None if the distance isn't tabulated
+    """
+    matches = np.flatnonzero(np.abs(_DISTANCE_KM - distance_km) < 1e-6)
+    return int(matches[0]) if len(matches) else None
+
+
+def lookup_race_time(vdot, distance_km):
+    """
+    Look up equivalent race times for VDOT values.
+
+    Args:
+        vdot (array-like): VDOT values
+        distance_km (array-like): Race distances in kilometers
+
+    Returns:
+        numpy.ndarray: Race times in seconds
+    """
+    vdot, distance_km = np.broadcast_arrays(
+        np.asarray(vdot, dtype=float), np.asarray(distance_km, dtype=float)
+    )
+    times = np.empty(vdot.shape)
+    in_grid = (vdot >= VDOT_MIN) & (vdot <= VDOT_MAX)
+    tabulated = np.zeros(vdot.shape, dtype=bool)
+
+    for distance in np.unique(distance_km):
+        column = _distance_column(distance)
+        if column is None:
+            continue
+        mask = in_grid & (distance_km == distance)
+        times[mask] = _interpolate(RACE_TIME_TABLE[:, column], vdot[mask])
+        tabulated |= mask
+
+    if not tabulated.all():
+        missing = ~tabulated
+        times[missing] = solve_daniels_race_time(vdot[missing], distance_km[missing], tol=1e-6)["time"]
+
+    return times
+
+
+def lookup_vdot(distance_km, time_seconds):
+    """
+    Look up VDOT values from race performances.
+
+    Args:
+        distance_km (array-like): Race distances in kilometers
+        time_seconds (array-like): Race times in seconds
+
+    Returns:
+        numpy.ndarray: VDOT values
+    """
+    distance_km, time_seconds = np.broadcast_arrays(
+        np.asarray(distance_km, dtype=float), np.asarray(time_seconds, dtype=float)
+    )
+    vdot = np.empty(time_seconds.shape)
+    tabulated = np.zeros(time_seconds.shape, dtype=bool)
+
+    for distance in np.unique(distance_km):
+        column = _distance_column(distance)
+        if column is None:
+            continue
+
+        # Times fall as VDOT rises, so search the reversed column
+        times = RACE_TIME_TABLE[::-1, column]
+        mask = (distance_km == distance) & (time_seconds >= times[0]) & (time_seconds <= times[-1])
+        t = time_seconds[mask]
+
+        index = np.clip(np.searchsorted(times, t) - 1, 0, len(times) - 2)
+        weight = (t - times[index]) / (times[index + 1] - times[index])
+        grid = VDOT_GRID[::-1]
+        vdot[mask] = grid[index] + (grid[index + 1] - grid[index]) * weight
+        tabulated |= mask
+
+    if not tabulated.all():
+        missing = ~tabulated
+        vdot[missing] = calculate_vdot_from_performance(distance_km[missing], time_seconds[missing])
+
+    return vdot
+
+
+def lookup_training_paces(vdot):
+    """
+    Look up training paces for VDOT values.
+
+    Args:
+        vdot (array-like): VDOT values
+
+    Returns:
+        dict: Arrays of training paces in minutes per kilometer keyed like
+            calculations.calculate_training_paces_from_vdot
+    """
+    vdot = np.asarray(vdot, dtype=float)
+    in_grid = (vdot >= VDOT_MIN) & (vdot <= VDOT_MAX)
+
+    if in_grid.all():
+        return {name: _interpolate(column, vdot) for name, column in TRAINING_PACE_TABLE.items()}
+
+    exact = calculate_training_paces_from_vdot(vdot)
+    clipped = np.clip(vdot, VDOT_MIN, VDOT_MAX)
+    return {
+        name: np.where(in_grid, _interpolate(column, clipped), exact[name])
+        for name, column in TRAINING_PACE_TABLE.items()
+    }
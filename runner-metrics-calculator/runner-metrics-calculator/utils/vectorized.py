@@ -0,0 +1,516 @@
+"""
+Array-native versions of the calculation utilities for batch scoring.
+
+Every function mirrors the function of the same name in utils.calculations but accepts
+NumPy arrays or pandas Series (or scalars) and broadcasts them against each other. Option
+arguments such as gender, formula or method may also be arrays, in which case each element
+picks its own branch. Results are NumPy arrays.
+"""
+import numpy as np
+
+
+def calculate_vo2max_cooper(distance_m, age=None, gender="Male"):
+    """
+    Calculate VO2 Max using the Cooper test formula.
+
+    Args:
+        distance_m (array-like): Distance covered in meters during 12-minute test
+        age (array-like, optional): Age in years (unused by the formula). Defaults to None.
+        gender (str or array-like, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        numpy.ndarray: Estimated VO2 Max in ml/kg/min
+    """
+    vo2max = (np.asarray(distance_m, dtype=float) - 504.9) / 44.73
+    return np.where(np.asarray(gender) == "Female", vo2max * 0.85, vo2max)
+
+
+def calculate_vo2max_bruce(time_min, gender="Male"):
+    """
+    Calculate VO2 Max using the Bruce protocol formula.
+
+    Args:
+        time_min (array-like): Time completed on test in minutes
+        gender (str or array-like, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        numpy.ndarray: Estimated VO2 Max in ml/kg/min
+    """
+    t = np.asarray(time_min, dtype=float)
+    male = 14.8 - (1.379 * t) + (0.451 * t ** 2) - (0.012 * t ** 3)
+    female = 4.38 * t - 3.9
+    return np.where(np.asarray(gender) == "Male", male, female)
+
+
+def percent_vo2max(time_seconds):
+    """
+    Fraction of VO2 Max that can be sustained for a race of the given duration (Daniels/Gilbert).
+
+    Args:
+        time_seconds (array-like): Race time in seconds
+
+    Returns:
+        numpy.ndarray: Sustainable fraction of VO2 Max
+    """
+    t = np.asarray(time_seconds, dtype=float) / 60
+    return 0.8 + 0.1894393 * np.exp(-0.012778 * t) + 0.2989558 * np.exp(-0.1932605 * t)
+
+
+def vo2_from_velocity(velocity):
+    """
+    Oxygen cost of running at a velocity (Daniels/Gilbert).
+
+    Args:
+        velocity (array-like): Velocity in meters per minute
+
+    Returns:
+        numpy.ndarray: VO2 in ml/kg/min
+    """
+    v = np.asarray(velocity, dtype=float)
+    return -4.60 + 0.182258 * v + 0.000104 * v * v
+
+
+def velocity_from_vo2(vo2):
+    """
+    Velocity whose oxygen cost is vo2, the positive root of vo2_from_velocity.
+
+    Args:
+        vo2 (array-like): VO2 in ml/kg/min
+
+    Returns:
+        numpy.ndarray: Velocity in meters per minute
+    """
+    a = 0.000104
+    b = 0.182258
+    c = -4.60 - np.asarray(vo2, dtype=float)
+    return (-b + np.sqrt(b ** 2 - 4 * a * c)) / (2 * a)
+
+
+def calculate_vdot_from_performance(distance_km, time_seconds):
+    """
+    Calculate VDOT values from race performances using Daniels' formula.
+
+    Args:
+        distance_km (array-like): Race distances in kilometers
+        time_seconds (array-like): Race times in seconds
+
+    Returns:
+        numpy.ndarray: VDOT values
+    """
+    time_seconds = np.asarray(time_seconds, dtype=float)
+    velocity = (np.asarray(distance_km, dtype=float) * 1000) / (time_seconds / 60)
+    return vo2_from_velocity(velocity) / percent_vo2max(time_seconds)
+
+
+def calculate_training_paces_from_vdot(vdot):
+    """
+    Calculate training paces from VDOT values.
+
+    Args:
+        vdot (array-like): VDOT values
+
+    Returns:
+        dict: Arrays of training paces keyed like calculations.calculate_training_paces_from_vdot
+    """
+    vdot = np.asarray(vdot, dtype=float)
+
+    return {
+        "easy_min": (180 * (vdot ** -0.79)) * (60 / 1000),
+        "easy_max": (150 * (vdot ** -0.75)) * (60 / 1000),
+        "marathon": (120 * (vdot ** -0.73)) * (60 / 1000),
+        "threshold": (100 * (vdot ** -0.71)) * (60 / 1000),
+        "interval": (77 * (vdot ** -0.67)) * (60 / 1000),
+        "repetition": (64 * (vdot ** -0.65)) * (60 / 1000)
+    }
+
+
+def calculate_max_hr(age, formula="Fox"):
+    """
+    Calculate maximum heart rates from ages.
+
+    Args:
+        age (array-like): Ages in years
+        formula (str or array-like, optional): "Fox", "Tanaka" or "Gellish". Defaults to "Fox".
+
+    Returns:
+        numpy.ndarray: Estimated maximum heart rates
+    """
+    age = np.asarray(age, dtype=float)
+    formula = np.asarray(formula)
+
+    return np.select(
+        [formula == "Tanaka", formula == "Gellish"],
+        [208 - (0.7 * age), 207 - (0.7 * age)],
+        default=220 - age
+    )
+
+
+def calculate_hr_zones_karvonen(max_hr, resting_hr, zone_model="5-Zone"):
+    """
+    Calculate heart rate zones for many athletes using the Karvonen formula.
+
+    Args:
+        max_hr (array-like): Maximum heart rates in beats per minute
+        resting_hr (array-like): Resting heart rates in beats per minute
+        zone_model (str, optional): "5-Zone", "7-Zone" or "3-Zone". Defaults to "5-Zone".
+
+    Returns:
+        dict: Zone names mapped to (lower, upper) integer arrays
+    """
+    max_hr = np.asarray(max_hr, dtype=float)
+    resting_hr = np.asarray(resting_hr, dtype=float)
+    hrr = max_hr - resting_hr
+
+    if zone_model == "5-Zone":
+        names = ["Zone 1 (Recovery)", "Zone 2 (Aerobic)", "Zone 3 (Tempo)",
+                 "Zone 4 (Threshold)", "Zone 5 (Anaerobic)"]
+        edges = [0.5, 0.6, 0.7, 0.8, 0.9]
+    elif zone_model == "7-Zone":
+        names = ["Zone 1 (Recovery)", "Zone 2 (Easy)", "Zone 3 (Aerobic)", "Zone 4 (Tempo)",
+                 "Zone 5 (Threshold)", "Zone 6 (VO2 Max)", "Zone 7 (Anaerobic)"]
+        edges = [0.5, 0.55, 0.65, 0.75, 0.82, 0.89, 0.94]
+    else:  # 3-Zone Polarized
+        names = ["Zone 1 (Easy)", "Zone 2 (Moderate)", "Zone 3 (Hard)"]
+        edges = [0.5, 0.77, 0.87]
+
+    zones = {}
+    for i, name in enumerate(names):
+        lower = resting_hr + (hrr * edges[i])
+        if i > 0:
+            lower = lower + 1
+        upper = resting_hr + (hrr * edges[i + 1]) if i + 1 < len(edges) else max_hr
+        zones[name] = (lower.astype(int), np.asarray(upper).astype(int))
+
+    return zones
+
+
+def _percent_vo2max_slope(time_seconds):
+    """
+    Derivative of percent_vo2max with respect to time in minutes
+    """
+    t = np.asarray(time_seconds, dtype=float) / 60
+    return -0.012778 * 0.1894393 * np.exp(-0.012778 * t) - 0.1932605 * 0.2989558 * np.exp(-0.1932605 * t)
+
+
+def solve_daniels_race_time(vdot, distance_km, initial_time=None, tol=1e-3, max_iter=50):
+    """
+    Solve the Daniels/Gilbert VDOT equation for race time with a safeguarded Newton method.
+
+    Finds the time t at which the oxygen cost of covering the distance in t equals
+    vdot × percent_vo2max(t). The root is always bracketed by the times at which the
+    oxygen cost equals 0.8 × VDOT and 1.2884 × VDOT (the limits of percent_vo2max), so
+    any Newton step that leaves the bracket is replaced by bisection and every element
+    converges, including ultra distances.
+
+    Args:
+        vdot (array-like): VDOT values
+        distance_km (array-like): Race distances in kilometers
+        initial_time (array-like, optional): Starting guesses in seconds, e.g. a Riegel
+            prediction. Defaults to the middle of the bracket.
+        tol (float, optional): Convergence tolerance on the time step in seconds. Defaults to 1e-3.
+        max_iter (int, optional): Maximum number of iterations. Defaults to 50.
+
+    Returns:
+        dict: "time" (seconds), "converged" (bool array), "residual" (ml/kg/min) and
+            "iterations" (number of iterations run)
+    """
+    vdot = np.asarray(vdot, dtype=float)
+    distance_m = np.asarray(distance_km, dtype=float) * 1000
+    vdot, distance_m = np.broadcast_arrays(vdot, distance_m)
+
+    # Times (in minutes) at the extremes of the sustainable fraction of VO2 Max
+    lower = distance_m / velocity_from_vo2(vdot * 1.2884393)
+    upper = distance_m / velocity_from_vo2(vdot * 0.8)
+
+    if initial_time is None:
+        t = (lower + upper) / 2
+    else:
+        t = np.clip(np.broadcast_to(np.asarray(initial_time, dtype=float) / 60, vdot.shape), lower, upper)
+
+    converged = np.zeros(vdot.shape, dtype=bool)
+    iterations = 0
+
+    while iterations < max_iter and not np.all(converged):
+        iterations += 1
+
+        velocity = distance_m / t
+        residual = vo2_from_velocity(velocity) - vdot * percent_vo2max(t * 60)
+
+        # The residual falls as time increases, so its sign tells us which side the root is on
+        lower = np.where(residual > 0, t, lower)
+        upper = np.where(residual > 0, upper, t)
+
+        slope = (0.182258 + 2 * 0.000104 * velocity) * (-distance_m / t ** 2) - vdot * _percent_vo2max_slope(t * 60)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = t - residual / slope
+
+        outside = ~np.isfinite(newton) | (newton <= lower) | (newton >= upper)
+        t_next = np.where(outside, (lower + upper) / 2, newton)
+
+        step = np.abs(t_next - t) * 60
+        t = np.where(converged, t, t_next)
+        converged |= step < tol
+
+    residual = vo2_from_velocity(distance_m / t) - vdot * percent_vo2max(t * 60)
+
+    return {
+        "time": t * 60,
+        "converged": converged,
+        "residual": residual,
+        "iterations": iterations
+    }
+
+
+def predict_race_time(base_distance, base_time, target_distance, method="Riegel"):
+    """
+    Predict race times for target distances from recent performances.
+
+    Args:
+        base_distance (array-like): Recent race distances in kilometers
+        base_time (array-like): Recent race times in seconds
+        target_distance (array-like): Target race distances in kilometers
+        method (str or array-like, optional): "Riegel", "Cameron" or "Daniels". Defaults to "Riegel".
+
+    Returns:
+        numpy.ndarray: Predicted race times in seconds
+    """
+    base_distance = np.asarray(base_distance, dtype=float)
+    base_time = np.asarray(base_time, dtype=float)
+    target_distance = np.asarray(target_distance, dtype=float)
+    method = np.asarray(method)
+
+    ratio = target_distance / base_distance
+    riegel = base_time * ratio ** 1.06
+
+    is_cameron = method == "Cameron"
+    is_daniels = method == "Daniels"
+
+    result = riegel
+    if np.any(is_cameron):
+        fatigue = np.where(base_distance <= 10, 1.07, 1.05)
+        result = np.where(is_cameron, base_time * ratio ** fatigue, result)
+
+    if np.any(is_daniels):
+        vdot = calculate_vdot_from_performance(base_distance, base_time)
+        daniels = solve_daniels_race_time(vdot, target_distance, initial_time=riegel)["time"]
+        result = np.where(is_daniels, daniels, result)
+
+    return np.asarray(result, dtype=float)
+
+
+def calculate_power_components(
+        weight, height, speed_kph, incline_pct=0, wind_speed_kph=0,
+        terrain_coef=1.0, altitude_m=0, temperature_c=20, footwear_weight_g=250
+):
+    """
+    Break running power down into gravitational, aerodynamic and rolling components for many inputs.
+
+    Args:
+        weight (array-like): Runner weights in kilograms
+        height (array-like): Runner heights in centimeters
+        speed_kph (array-like): Running speeds in kilometers per hour
+        incline_pct (array-like, optional): Incline/grade in percent. Defaults to 0.
+        wind_speed_kph (array-like, optional): Wind speed in km/h (positive=headwind). Defaults to 0.
+        terrain_coef (array-like, optional): Terrain coefficient (1.0=track/road). Defaults to 1.0.
+        altitude_m (array-like, optional): Altitude in meters. Defaults to 0.
+        temperature_c (array-like, optional): Temperature in Celsius. Defaults to 20.
+        footwear_weight_g (array-like, optional): Shoe weight in grams. Defaults to 250.
+
+    Returns:
+        dict: Arrays for "gravity", "air", "rolling" and "total" power in watts
+    """
+    weight = np.asarray(weight, dtype=float)
+    height = np.asarray(height, dtype=float)
+    speed_ms = np.asarray(speed_kph, dtype=float) / 3.6
+    wind_ms = np.asarray(wind_speed_kph, dtype=float) / 3.6
+    g = 9.81
+
+    incline_rad = np.arctan(np.asarray(incline_pct, dtype=float) / 100)
+    grav_force = weight * g * np.sin(incline_rad)
+
+    air_density = 1.225 * np.exp(-np.asarray(altitude_m, dtype=float) / 7000) * (
+            273 / (273 + np.asarray(temperature_c, dtype=float)))
+    frontal_area = 0.266 * (weight ** 0.425) * ((height / 100) ** 0.725) / 10000
+    air_resist = 0.5 * air_density * 0.9 * frontal_area * (speed_ms + wind_ms) ** 2
+
+    rolling_resist = 0.01 * np.asarray(terrain_coef, dtype=float) * weight * g * np.cos(incline_rad)
+
+    efficiency = 0.25
+    total = (grav_force + air_resist + rolling_resist) * speed_ms / efficiency
+    total = total * (1 + (np.asarray(footwear_weight_g, dtype=float) / 250 - 1) * 0.03)
+
+    return {
+        "gravity": grav_force * speed_ms / efficiency,
+        "air": air_resist * speed_ms / efficiency,
+        "rolling": rolling_resist * speed_ms / efficiency,
+        "total": total
+    }
+
+
+def calculate_running_power(
+        weight, height, speed_kph, incline_pct=0, wind_speed_kph=0,
+        terrain_coef=1.0, altitude_m=0, temperature_c=20
+):
+    """
+    Calculate running power for many runners or conditions at once.
+
+    Args:
+        weight (array-like): Runner weights in kilograms
+        height (array-like): Runner heights in centimeters
+        speed_kph (array-like): Running speeds in kilometers per hour
+        incline_pct (array-like, optional): Incline/grade in percent. Defaults to 0.
+        wind_speed_kph (array-like, optional): Wind speed in km/h (positive=headwind). Defaults to 0.
+        terrain_coef (array-like, optional): Terrain coefficient (1.0=track/road). Defaults to 1.0.
+        altitude_m (array-like, optional): Altitude in meters. Defaults to 0.
+        temperature_c (array-like, optional): Temperature in Celsius. Defaults to 20.
+
+    Returns:
+        numpy.ndarray: Estimated running power in watts
+    """
+    return calculate_power_components(
+        weight, height, speed_kph, incline_pct, wind_speed_kph,
+        terrain_coef, altitude_m, temperature_c
+    )["total"]
+
+
+def estimate_power_from_critical_velocity(cv_ms, weight, height=175):
+    """
+    Estimate critical power from critical velocity for many runners.
+
+    Args:
+        cv_ms (array-like): Critical velocities in meters per second
+        weight (array-like): Runner weights in kilograms
+        height (array-like, optional): Runner heights in centimeters. Defaults to 175.
+
+    Returns:
+        numpy.ndarray: Estimated power at critical velocity in watts
+    """
+    cv_ms = np.asarray(cv_ms, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    height = np.asarray(height, dtype=float)
+
+    # Flat terrain in still air at sea-level density, as in the scalar function (not the
+    # temperature-corrected density of calculate_running_power)
+    air_density = 1.225
+    frontal_area = 0.266 * (weight ** 0.425) * ((height / 100) ** 0.725) / 10000
+    air_resist = 0.5 * air_density * 0.9 * frontal_area * cv_ms ** 2
+    rolling_resist = 0.01 * weight * 9.81
+
+    efficiency = 0.25
+    return (air_resist + rolling_resist) * cv_ms / efficiency
+
+
+def estimate_ftp_from_race_power(race_power, race_duration_min):
+    """
+    Estimate functional threshold power from average race powers.
+
+    Args:
+        race_power (array-like): Average race powers in watts
+        race_duration_min (array-like): Race durations in minutes
+
+    Returns:
+        numpy.ndarray: Estimated FTP in watts
+    """
+    race_power = np.asarray(race_power, dtype=float)
+    duration = np.asarray(race_duration_min, dtype=float)
+
+    return np.select(
+        [duration <= 20, duration <= 60],
+        [race_power * 0.88, race_power * 0.95],
+        default=race_power * 1.05
+    )
+
+
+def calculate_power_duration_curve(cp, awc, max_power, durations):
+    """
+    Calculate modelled power-duration curves; broadcast athletes against durations.
+
+    Args:
+        cp (array-like): Critical powers in watts, e.g. shape (athletes, 1)
+        awc (array-like): Anaerobic work capacities in joules
+        max_power (array-like): Maximal powers in watts
+        durations (array-like): Durations in seconds
+
+    Returns:
+        numpy.ndarray: Sustainable power in watts
+    """
+    durations = np.asarray(durations, dtype=float)
+    with np.errstate(divide="ignore"):
+        anaerobic = np.where(durations > 0, np.asarray(awc, dtype=float) / durations, 0)
+
+    return np.minimum(max_power, np.asarray(cp, dtype=float) + anaerobic)
+
+
+def calculate_equivalent_race_times(vdot):
+    """
+    Calculate equivalent race times for standard distances from VDOT values.
+
+    Args:
+        vdot (array-like): VDOT values
+
+    Returns:
+        dict: Arrays of predicted times in seconds for "5K", "10K", "Half Marathon" and "Marathon"
+    """
+    vdot = np.asarray(vdot, dtype=float)
+
+    return {
+        "5K": (5000 / 1000) * 60 * (29.87 * (vdot ** -0.29)),
+        "10K": (10000 / 1000) * 60 * (31.72 * (vdot ** -0.294)),
+        "Half Marathon": (21097.5 / 1000) * 60 * (33.71 * (vdot ** -0.298)),
+        "Marathon": (42195 / 1000) * 60 * (35.66 * (vdot ** -0.3))
+    }
+
+
+def calculate_banister_trimp(duration_min, avg_hr, resting_hr, max_hr, gender="Male"):
+    """
+    Calculate Banister TRIMP for many sessions.
+
+    Args:
+        duration_min (array-like): Session durations in minutes
+        avg_hr (array-like): Average session heart rates
+        resting_hr (array-like): Resting heart rates
+        max_hr (array-like): Maximum heart rates
+        gender (str or array-like, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        numpy.ndarray: TRIMP in arbitrary units
+    """
+    resting_hr = np.asarray(resting_hr, dtype=float)
+    hr_ratio = (np.asarray(avg_hr, dtype=float) - resting_hr) / (np.asarray(max_hr, dtype=float) - resting_hr)
+
+    is_male = np.asarray(gender) == "Male"
+    intensity_factor = np.where(is_male, 0.64 * np.exp(1.92 * hr_ratio), 0.86 * np.exp(1.67 * hr_ratio))
+
+    return np.asarray(duration_min, dtype=float) * hr_ratio * intensity_factor
+
+
+def calculate_vo2max_1_5_mile(weight, run_time_min, gender="Male"):
+    """
+    Calculate VO2 Max from 1.5-mile run tests.
+
+    Args:
+        weight (array-like): Body weights in kilograms
+        run_time_min (array-like): Times to complete 1.5 miles in minutes
+        gender (str or array-like, optional): "Male" or "Female". Defaults to "Male".
+
+    Returns:
+        numpy.ndarray: Estimated VO2 Max in ml/kg/min
+    """
+    is_male = (np.asarray(gender) == "Male").astype(float)
+    return (88.02 - (0.1656 * np.asarray(weight, dtype=float))
+            - (2.76 * np.asarray(run_time_min, dtype=float)) + (3.716 * is_male))
+
+
+def calculate_rhr_recovery(today_rhr, baseline_rhr):
+    """
+    Estimate recovery percentages from resting heart rates relative to baseline.
+
+    Args:
+        today_rhr (array-like): Morning resting heart rates
+        baseline_rhr (array-like): Baseline resting heart rates
+
+    Returns:
+        numpy.ndarray: Recovery percentages, limited to 0-110%
+    """
+    recovery = 100 - ((np.asarray(today_rhr, dtype=float) - np.asarray(baseline_rhr, dtype=float)) * 5)
+    return np.clip(recovery, 0, 110)
@@ -0,0 +1,189 @@
+"""
+Time-in-zone distributions for whole training histories.
+
+Samples from many activities are bucketed in one pass: every sample gets a zone index from
+np.digitize against the zone lower bounds, and np.bincount sums the sample durations per
+(activity, zone) pair. Zones are dicts of names to (lower, upper) bounds as returned by the zone
+calculators in utils.calculations, with None marking an open lower or upper end. Pace zones are
+given as speed bounds (m/s) so that, as for heart rate and power, higher zones are faster.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.streams import DEFAULT_MAX_GAP_S, to_seconds
+
+BELOW_ZONES = "Below Zones"
+
+# Share of training time below the first threshold for 80/20 (polarized) compliance
+TARGET_LOW_FRACTION = 0.8
+
+
+def zone_edges(zones):
+    """
+    Zone names in order of intensity with their lower bounds.
+
+    Args:
+        zones (dict): Zone names mapped to (lower, upper) bounds
+
+    Returns:
+        tuple: List of zone names and numpy.ndarray of lower bounds (-inf for an open lower end)
+    """
+    lowers = {name: -np.inf if bounds[0] is None else float(bounds[0]) for name, bounds in zones.items()}
+    names = sorted(zones, key=lowers.get)
+    return names, np.array([lowers[name] for name in names])
+
+
+def _zone_frame(seconds, activities, names):
+    """
+    Wrap an activities × buckets array of seconds in a frame with zone columns
+    """
+    return pd.DataFrame(seconds, index=pd.Index(activities, name="activity"), columns=[BELOW_ZONES] + names)
+
+
+def calculate_zone_seconds(values, timestamps, activity_ids, zones, max_gap_s=DEFAULT_MAX_GAP_S):
+    """
+    Seconds in each zone for every activity, from the concatenated samples of all activities.
+
+    Each sample lasts until the next sample of the same activity; the last sample of an activity
+    and gaps longer than max_gap_s count as that activity's median sampling interval, as in
+    streams.sample_durations. Samples of an activity must be in recording order.
+
+    Args:
+        values (array-like): Samples (heart rate, power, speed, ...), NaN where missing
+        timestamps (array-like): Sample timestamps, datetime64 or seconds
+        activity_ids (array-like): Activity of each sample
+        zones (dict): Zone names mapped to (lower, upper) bounds
+        max_gap_s (float, optional): Longest interval still counted as recording time. Defaults to 30.
+
+    Returns:
+        pandas.DataFrame: Seconds per zone (columns, plus "Below Zones") for every activity (rows)
+    """
+    values = np.asarray(values, dtype=float)
+    seconds = to_seconds(timestamps)
+    codes, activities = pd.factorize(np.asarray(activity_ids), sort=False)
+    names, lowers = zone_edges(zones)
+
+    # Group the samples of each activity together, keeping their order
+    order = np.argsort(codes, kind="stable")
+    values, seconds, codes = values[order], seconds[order], codes[order]
+
+    steps = np.diff(seconds)
+    same_activity = codes[1:] == codes[:-1]
+    valid = same_activity & np.isfinite(steps) & (steps > 0)
+
+    typical = pd.Series(steps[valid]).groupby(codes[:-1][valid]).median()
+    typical = typical.reindex(range(len(activities)), fill_value=1.0).to_numpy()
+
+    durations = np.append(np.where(same_activity, steps, np.nan), np.nan)
+    usable = np.isfinite(durations) & (durations > 0) & (durations <= max_gap_s)
+    durations = np.where(usable, durations, typical[codes])
+
+    recorded = ~np.isnan(values)
+    bucket = np.digitize(values[recorded], lowers)
+    buckets = len(names) + 1
+    totals = np.bincount(codes[recorded] * buckets + bucket, weights=durations[recorded],
+                         minlength=len(activities) * buckets)
+
+    return _zone_frame(totals.reshape(len(activities), buckets), activities, names)
+
+
+def calculate_zone_seconds_from_averages(averages, durations_s, zones, activity_ids=None):
+    """
+    Approximate time in zone for activities without streams from their average values.
+
+    The whole duration of each activity is attributed to the zone of its average, which is the
+    best available estimate for summary-only records such as CSV exports.
+
+    Args:
+        averages (array-like): Average heart rate, power or speed of each activity
+        durations_s (array-like): Duration of each activity in seconds
+        zones (dict): Zone names mapped to (lower, upper) bounds
+        activity_ids (array-like, optional): Row labels. Defaults to 0..n-1.
+
+    Returns:
+        pandas.DataFrame: Seconds per zone for every activity, as calculate_zone_seconds
+    """
+    averages = np.asarray(averages, dtype=float)
+    durations_s = np.nan_to_num(np.asarray(durations_s, dtype=float))
+    names, lowers = zone_edges(zones)
+    activities = np.arange(len(averages)) if activity_ids is None else np.asarray(activity_ids)
+
+    buckets = len(names) + 1
+    recorded = ~np.isnan(averages)
+    rows = np.flatnonzero(recorded)
+    totals = np.bincount(rows * buckets + np.digitize(averages[recorded], lowers),
+                         weights=durations_s[recorded], minlength=len(averages) * buckets)
+
+    return _zone_frame(totals.reshape(len(averages), buckets), activities, names)
+
+
+def rollup_zone_seconds(zone_seconds, dates, freq="W"):
+    """
+    Sum per-activity time in zone into weekly or monthly totals.
+
+    Args:
+        zone_seconds (pandas.DataFrame): Output of calculate_zone_seconds or
+            calculate_zone_seconds_from_averages
+        dates (array-like): Date of each activity (row)
+        freq (str, optional): Pandas period frequency, "W" for weeks or "M" for months. Defaults to "W".
+
+    Returns:
+        pandas.DataFrame: Seconds per zone indexed by period
+    """
+    periods = pd.DatetimeIndex(pd.to_datetime(dates)).to_period(freq)
+    return zone_seconds.groupby(periods.to_numpy()).sum().rename_axis("period")
+
+
+def calculate_polarization(zone_seconds, low_zones=None, high_zones=None, target_low_fraction=TARGET_LOW_FRACTION):
+    """
+    Intensity distribution and polarization index of time-in-zone rows.
+
+    Zones are folded into a three-zone model: the lowest low_zones zones (and time below the zones)
+    are low intensity, the top high_zones zones high intensity and the rest moderate. By default
+    three-zone models keep their zones and larger models count two zones at each end. The
+    polarization index is log10(low / moderate × high × 100) on fractions of time (Treff et al.,
+    2019), with moderate taken as at least 0.01; values above 2.0 indicate a polarized distribution.
+
+    Args:
+        zone_seconds (pandas.DataFrame): Seconds per zone, e.g. from rollup_zone_seconds
+        low_zones (int, optional): Number of zones counted as low intensity. Defaults to 1 for up to
+            three zones and 2 otherwise.
+        high_zones (int, optional): Number of zones counted as high intensity. Defaults to 1 for up to
+            three zones and 2 otherwise.
+        target_low_fraction (float, optional): Low-intensity share for 80/20 compliance. Defaults to 0.8.
+
+    Returns:
+        pandas.DataFrame: "low", "moderate" and "high" fractions of time, "polarization_index" and
+            "compliant" (low-intensity share at or above the target) for every row
+    """
+    zone_columns = [col for col in zone_seconds.columns if col != BELOW_ZONES]
+    seconds = zone_seconds[zone_columns].to_numpy(dtype=float)
+
+    default_split = 1 if len(zone_columns) <= 3 else 2
+    low_zones = default_split if low_zones is None else low_zones
+    high_zones = default_split if high_zones is None else high_zones
+    if low_zones + high_zones > len(zone_columns):
+        raise ValueError(f"{low_zones} low and {high_zones} high-intensity zones overlap "
+                         f"in a {len(zone_columns)}-zone model")
+
+    low = seconds[:, :low_zones].sum(axis=1)
+    if BELOW_ZONES in zone_seconds.columns:
+        low = low + zone_seconds[BELOW_ZONES].to_numpy(dtype=float)
+    high = seconds[:, len(zone_columns) - high_zones:].sum(axis=1)
+    moderate = seconds[:, low_zones:len(zone_columns) - high_zones].sum(axis=1)
+
+    total = low + moderate + high
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = {
+            "low": np.where(total > 0, low / total, np.nan),
+            "moderate": np.where(total > 0, moderate / total, np.nan),
+            "high": np.where(total > 0, high / total, np.nan)
+        }
+        index = np.log10(fractions["low"] / np.fmax(fractions["moderate"], 0.01) * fractions["high"] * 100)
+
+    result = pd.DataFrame(fractions, index=zone_seconds.index)
+    # Undefined without low or high-intensity time
+    result["polarization_index"] = np.where(np.isfinite(index), index, np.nan)
+    result["compliant"] = result["low"] >= target_low_fraction
+
+    return result
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the app's modules package when pytest is run from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,123 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from modules import activity_files
+
+def named_file(name, text):
+    upload = io.BytesIO(text.encode())
+    upload.name = name
+    return upload
+
+def gpx(points):
+    rows = ''.join(f'<trkpt lat="{lat}" lon="{lon}"><ele>10</ele><time>2024-05-01T06:{i // 60:02d}:{i % 60:02d}Z</time></trkpt>'
+                   for i, (lat, lon) in enumerate(points))
+    return f'<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>{rows}</trkseg></trk></gpx>'
+
+def test_gps_jumps_do_not_add_distance():
+    # 3 m/s due north for 10 minutes, with one fix jumping 500 m east
+    points = [(60 + 3 * i / 111195, 10.0) for i in range(600)]
+    clean = activity_files.summarize_activity(activity_files.read_activity(named_file('run.gpx', gpx(points))))
+
+    points[300] = (points[300][0], 10.009)
+    jumpy = activity_files.summarize_activity(activity_files.read_activity(named_file('run.gpx', gpx(points))))
+
+    assert abs(clean['Distance'] - 1.797) < 0.002
+    assert abs(jumpy['Distance'] - clean['Distance']) < 0.002
+    assert abs(jumpy['Pace'] - clean['Pace']) < 0.01
+
+def test_recorded_distance_without_positions_is_used():
+    points = ''.join(f'<Trackpoint><Time>2024-05-01T06:{i // 60:02d}:{i % 60:02d}Z</Time>'
+                     f'<DistanceMeters>{2.5 * i}</DistanceMeters></Trackpoint>' for i in range(600))
+    tcx = f'<TrainingCenterDatabase><Activities><Activity><Lap><Track>{points}</Track></Lap></Activity></Activities></TrainingCenterDatabase>'
+
+    streams = activity_files.read_activity(named_file('treadmill.tcx', tcx))
+    track = activity_files.activity_track(streams)
+    summary = activity_files.summarize_activity(streams)
+
+    assert abs(summary['Distance'] - 1.4975) < 1e-6
+    np.testing.assert_allclose(track['speed'][10:-10], 2.5, rtol=1e-5)
+    assert abs(summary['GAP'] - (1000 / 60) / 2.5) < 1e-3
+
+def test_activity_without_distance_has_no_track():
+    points = ''.join(f'<Trackpoint><Time>2024-05-01T06:00:{i:02d}Z</Time></Trackpoint>' for i in range(30))
+    tcx = f'<TrainingCenterDatabase><Activities><Activity><Lap><Track>{points}</Track></Lap></Activity></Activities></TrainingCenterDatabase>'
+
+    streams = activity_files.read_activity(named_file('hr.tcx', tcx))
+
+    assert activity_files.activity_track(streams) is None
+    assert np.isnan(activity_files.summarize_activity(streams)['Distance'])
+
+def test_uphill_grade_adjusted_pace_is_faster_than_pace():
+    # 3 m/s due north for 10 minutes on a steady 5% climb
+    rows = ''.join(f'<trkpt lat="{60 + 3 * i / 111195}" lon="10.0"><ele>{0.15 * i}</ele>'
+                   f'<time>2024-05-01T06:{i // 60:02d}:{i % 60:02d}Z</time></trkpt>' for i in range(600))
+    text = f'<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>{rows}</trkseg></trk></gpx>'
+
+    summary = activity_files.summarize_activity(activity_files.read_activity(named_file('hill.gpx', text)))
+
+    assert summary['GAP'] < summary['Pace'] * 0.85
+    assert abs(summary['NGP'] - summary['GAP']) < 0.05
+
+def fit_file(messages):
+    """
+    Wrap FIT messages in a 14-byte file header (CRCs are not checked by the parser)
+    """
+    data = b''.join(messages)
+    upload = io.BytesIO(struct.pack('<BBHI4sH', 14, 0x10, 2093, len(data), b'.FIT', 0) + data + b'\0\0')
+    upload.name = 'run.fit'
+    return upload
+
+def fit_definition(local_type, global_type, fields, developer_fields=()):
+    header = 0x40 | local_type | (0x20 if developer_fields else 0)
+    message = struct.pack('<BBBHB', header, 0, 0, global_type, len(fields))
+    message += b''.join(struct.pack('BBB', *field) for field in fields)
+    if developer_fields:
+        message += struct.pack('B', len(developer_fields)) + b''.join(struct.pack('BBB', *field) for field in developer_fields)
+    return message
+
+def test_fit_records_with_compressed_timestamps():
+    # The first timestamp has 30 in its low 5 bits, so the compressed ones roll over
+    start = 1_000_000_000 - 1_000_000_000 % 32 + 30
+    semicircles = 2 ** 31 / 180
+    position = struct.pack('<ii', int(60 * semicircles), int(10 * semicircles))
+
+    messages = [
+        # file_id with a developer field, which isn't a record and must be skipped
+        fit_definition(2, 0, [(4, 4, 0x86)], developer_fields=[(0, 2, 0)]),
+        struct.pack('<BIH', 2, start, 0),
+        # Records with a full timestamp
+        fit_definition(0, 20, [(253, 4, 0x86), (0, 4, 0x85), (1, 4, 0x85), (3, 1, 0x02), (5, 4, 0x86)]),
+        struct.pack('<BI', 0, start) + position + struct.pack('<BI', 140, 0),
+        # Records without a timestamp field, sent with compressed timestamp headers
+        fit_definition(1, 20, [(0, 4, 0x85), (1, 4, 0x85), (3, 1, 0x02), (5, 4, 0x86)])
+    ]
+    offsets = [1, 2, 3, 10]
+    for i, offset in enumerate(offsets):
+        heart_rate = 0xFF if i == 2 else 141 + i
+        messages.append(struct.pack('B', 0x80 | 1 << 5 | (start + offset) & 0x1F) + position
+                        + struct.pack('<BI', heart_rate, 300 * (i + 1)))
+
+    streams = activity_files.read_activity(fit_file(messages))
+
+    seconds = streams['timestamp'].astype('int64') / 1000
+    np.testing.assert_array_equal(seconds, start + activity_files.FIT_EPOCH + np.array([0] + offsets))
+    np.testing.assert_array_equal(streams['heart_rate'], [140, 141, 142, np.nan, 144])
+    np.testing.assert_allclose(streams['distance'], [0, 3, 6, 9, 12])
+    np.testing.assert_allclose(streams['lat'], 60, atol=1e-6)
+    np.testing.assert_allclose(streams['lon'], 10, atol=1e-6)
+    assert np.isnan(streams['power']).all()
+
+def test_truncated_and_foreign_files_are_rejected():
+    upload = fit_file([fit_definition(0, 20, [(3, 1, 0x02)]), b'\x00'])
+    upload = io.BytesIO(upload.getvalue()[:-3])
+    upload.name = 'cut.fit'
+    with pytest.raises(ValueError):
+        activity_files.read_activity(upload)
+
+    upload = io.BytesIO(b'\x0e' + b'not a fit file')
+    upload.name = 'fake.fit'
+    with pytest.raises(ValueError):
+        activity_files.read_activity(upload)
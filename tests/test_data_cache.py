@@ -0,0 +1,67 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import data_cache
+
+def make_frame(rows=100):
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=rows, freq='D'),
+        'Distance': np.linspace(3.0, 21.1, rows),
+        'HeartRate': np.where(np.arange(rows) % 3 == 0, np.nan, 150.0)
+    })
+
+def test_round_trip(tmp_path):
+    df = make_frame()
+    df['Start'] = df['Date'].dt.tz_localize('Europe/Berlin')
+    key = data_cache.make_cache_key(b'upload', {'format': 'garmin'})
+
+    assert data_cache.save_frame(key, df, cache_dir=str(tmp_path))
+    loaded = data_cache.load_frame(key, cache_dir=str(tmp_path))
+
+    pd.testing.assert_frame_equal(loaded, df, check_index_type=False)
+
+def test_missing_and_unsupported_frames(tmp_path):
+    assert data_cache.load_frame('missing', cache_dir=str(tmp_path)) is None
+    assert not data_cache.save_frame('text', pd.DataFrame({'Notes': ['easy']}), cache_dir=str(tmp_path))
+
+def test_cache_key_depends_on_mapping():
+    assert data_cache.make_cache_key(b'upload', {'format': 'garmin'}) != \
+        data_cache.make_cache_key(b'upload', {'format': 'strava'})
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = str(tmp_path)
+    for age, key in enumerate(['newest', 'middle', 'oldest']):
+        data_cache.save_frame(key, make_frame(5000), cache_dir=cache_dir, max_mb=100)
+        stamp = time.time() - 60 * (age + 1)
+        os.utime(os.path.join(cache_dir, key + data_cache.CACHE_EXTENSION), (stamp, stamp))
+
+    entry_mb = os.path.getsize(os.path.join(cache_dir, 'newest' + data_cache.CACHE_EXTENSION)) / 1024 / 1024
+    data_cache.evict(cache_dir, max_mb=2.5 * entry_mb)
+
+    assert sorted(os.listdir(cache_dir)) == ['middle.npz', 'newest.npz']
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk went away")
+
+    monkeypatch.setattr(data_cache.np, 'savez', fail)
+
+    with pytest.raises(RuntimeError):
+        data_cache.save_frame('key', make_frame(), cache_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_stale_temporary_files_are_removed(tmp_path):
+    stale = tmp_path / 'abandoned.tmp'
+    fresh = tmp_path / 'writing.tmp'
+    stale.write_bytes(b'partial')
+    fresh.write_bytes(b'partial')
+    stamp = time.time() - data_cache.STALE_TEMP_SECONDS - 60
+    os.utime(stale, (stamp, stamp))
+
+    data_cache.evict(str(tmp_path))
+
+    assert os.listdir(tmp_path) == ['writing.tmp']
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.metrics_analyzer import (
+    build_aggregates, convert_pace_to_minutes, convert_time_to_minutes, daily_monotony_strain, parse_clock_column,
+    parse_pace_column, parse_time_column, weekly_zone_distribution
+)
+
+def scalar_results(values, converter):
+    return [converter(value) for value in values]
+
+@pytest.mark.parametrize("values", [
+    pd.Series([7, None], dtype=object),
+    pd.Series([7, 42.5, 7], dtype=object),
+    pd.Series([None, np.nan], dtype=object),
+    pd.Series([], dtype=object),
+    pd.Series(["1:02:03", 30.5, "25:30", None, "42.5", "abc", 30.5], dtype=object)
+])
+def test_time_column_matches_scalar_converter(values):
+    parsed = parse_time_column(values)
+
+    np.testing.assert_array_equal(parsed.to_numpy(dtype=float),
+                                  np.array(scalar_results(values, convert_time_to_minutes), dtype=float))
+
+@pytest.mark.parametrize("values", [
+    pd.Series([5, None], dtype=object),
+    pd.Series(["5:30", 5.5, None, "1:02:03"], dtype=object),
+    pd.Series([None, None], dtype=object)
+])
+def test_pace_column_matches_scalar_converter(values):
+    parsed = parse_pace_column(values)
+
+    np.testing.assert_array_equal(parsed.to_numpy(dtype=float),
+                                  np.array(scalar_results(values, convert_pace_to_minutes), dtype=float))
+
+def test_numeric_columns_pass_through():
+    values = pd.Series([30.0, 45.5], name='Time')
+
+    pd.testing.assert_series_equal(parse_clock_column(values), values)
+
+def test_malformed_clock_value_raises_like_scalar_converter():
+    with pytest.raises(ValueError):
+        convert_time_to_minutes("1:xx")
+    with pytest.raises(ValueError):
+        parse_time_column(pd.Series(["1:xx"], dtype=object))
+
+def test_weekly_zone_distribution_counts_each_run_in_its_zone():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-01-03', '2024-01-05', '2024-01-09']),
+        'TimeMinutes': [50.0, 10.0, 40.0, 30.0],
+        'HeartRate': [120.0, 175.0, 150.0, np.nan]
+    })
+
+    weekly, distribution = weekly_zone_distribution(df, 190)
+
+    # 190 bpm: Zone 1 below 129, Zone 3 from 159 to 178
+    assert len(weekly) == 1
+    assert weekly.iloc[0]['Zone 1 (Active Recovery)'] == 3000
+    assert weekly.iloc[0]['Zone 2 (Endurance)'] == 2400
+    assert weekly.iloc[0]['Zone 3 (Tempo)'] == 600
+    assert distribution.iloc[0]['low'] == pytest.approx(0.9)
+    assert distribution.iloc[0]['moderate'] == pytest.approx(0.1)
+
+def test_daily_monotony_strain_fills_rest_days_from_the_daily_rollup():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-03', '2024-01-07', '2024-01-08']),
+        'Distance': [5.0, 3.0, 10.0, 8.0, 6.0],
+        'TimeMinutes': [30.0, 20.0, 60.0, 45.0, 35.0]
+    })
+
+    stats = daily_monotony_strain(build_aggregates(df))
+
+    loads = np.array([50.0, 0, 60, 0, 0, 0, 45, 35])
+    assert list(stats['Load']) == list(loads)
+    for end in (7, 8):
+        week = loads[end - 7:end]
+        monotony = week.mean() / week.std()
+        assert stats['monotony'].iloc[end - 1] == pytest.approx(monotony)
+        assert stats['strain'].iloc[end - 1] == pytest.approx(week.sum() * monotony)
+    assert stats['monotony'].iloc[:6].isna().all()